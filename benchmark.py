@@ -0,0 +1,398 @@
+"""Benchmark the quiz bot's handlers against a fake Telegram bot.
+
+Drives the real handlers (start, join, begin, handle_message and the
+answer paths behind it, show_leaderboard, the speed round) for many
+simulated groups at once, through a stub context.bot that records every
+call and can add latency to it.
+
+    python benchmark.py                                  # default scenarios
+    python benchmark.py --scenarios 1x5,1000x200 --latency 20
+    python benchmark.py --compare benchmark_results/abc1234.json
+
+Each run is saved as JSON (benchmark_results/<commit>.json by default)
+so runs from different commits can be compared with --compare.
+"""
+import argparse
+import asyncio
+import contextvars
+import gc
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from types import SimpleNamespace
+
+ADMIN_ID = 1
+FIRST_PLAYER_ID = 1000
+# Chat whose update is being handled, for calls (get_chat) that don't name one
+current_chat = contextvars.ContextVar("current_chat", default=None)
+
+# The bot reads its configuration at import time
+work_dir = tempfile.mkdtemp(prefix="quiz-bench-")
+os.environ.setdefault("ADMIN_ID", str(ADMIN_ID))
+os.environ["BANK_RELOAD_INTERVAL"] = "0"
+os.environ["QUESTION_BANKS"] = os.path.join(work_dir, "bench_bank.json")
+os.environ["STATE_DB_FILE"] = os.path.join(work_dir, "game_states.db")
+
+import telegram_quiz_bot as bot_module  # noqa: E402
+
+bot_module.STATE_FILE = os.path.join(work_dir, "game_states.pkl")
+bot_module.STATE_JOURNAL_FILE = os.path.join(work_dir, "game_states.journal")
+
+
+class FakeBot:
+    """Stands in for context.bot: records calls and sleeps for `latency` seconds"""
+
+    def __init__(self, latency=0.0, jitter=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = Counter()
+        self.chat_calls = defaultdict(Counter)  # chat_id -> method -> calls
+        self.message_ids = 0
+
+    async def call(self, method, chat_id=None):
+        self.calls[method] += 1
+        self.chat_calls[chat_id if chat_id is not None else current_chat.get()][method] += 1
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def send_message(self, chat_id, text, **kwargs):
+        await self.call("send_message", chat_id)
+        self.message_ids += 1
+        return SimpleNamespace(message_id=self.message_ids, chat_id=chat_id, text=text)
+
+    async def edit_message_text(self, text, chat_id=None, message_id=None, **kwargs):
+        await self.call("edit_message_text", chat_id)
+        return True
+
+    async def get_chat(self, chat_id):
+        await self.call("get_chat")
+        return SimpleNamespace(id=chat_id, first_name=f"Player{chat_id}", username=f"player{chat_id}")
+
+    async def answer_callback_query(self, *args, **kwargs):
+        await self.call("answer_callback_query")
+        return True
+
+
+def make_update(bot, chat_id, user_id, text):
+    return SimpleNamespace(
+        message=SimpleNamespace(text=text, message_id=1),
+        effective_user=SimpleNamespace(id=user_id, first_name=f"Player{user_id}", username=f"player{user_id}"),
+        effective_chat=SimpleNamespace(id=chat_id, type="group"),
+        callback_query=None,
+    )
+
+
+def write_bank(path, questions, tiebreakers):
+    """A synthetic bank big enough that no group runs out of questions"""
+    bank = []
+    for i in range(questions):
+        if i % 8 == 7:
+            bank.append({"type": "paragraph", "question": f"Explain topic {i}", "answer": ""})
+        else:
+            options = [f"Option {i}-{j}" for j in range(4)]
+            bank.append({"type": "mcq", "question": f"Question {i}?", "options": options, "answer": options[i % 4]})
+    for i in range(tiebreakers):
+        options = [f"Speed {i}-{j}" for j in range(4)]
+        bank.append({"type": "mcq", "question": f"Speed question {i}?", "options": options,
+                     "answer": options[i % 4], "is_tiebreaker": True})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(bank, f)
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies):
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "p50_ms": percentile(values, 50) * 1000,
+        "p90_ms": percentile(values, 90) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": (values[-1] if values else 0.0) * 1000,
+    }
+
+
+class Scenario:
+    """One run of `groups` concurrent groups with `players` players each"""
+
+    def __init__(self, index, groups, players, args):
+        self.groups = groups
+        self.players = players
+        self.args = args
+        self.first_chat_id = -(index + 1) * 1_000_000
+        self.bot = FakeBot(args.latency / 1000, args.jitter / 1000)
+        self.context = SimpleNamespace(bot=self.bot, args=[])
+        self.latencies = defaultdict(list)
+        self.turns = 0
+        self.turn_calls = Counter()
+        self.semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def run_update(self, label, handler, chat_id, user_id, text, args=()):
+        """Handle one update the way the bot does: under the chat's lock"""
+        update = make_update(self.bot, chat_id, user_id, text)
+        context = SimpleNamespace(bot=self.bot, args=list(args))
+        current_chat.set(chat_id)
+        async with self.semaphore:
+            started = time.perf_counter()
+            await bot_module.per_chat(handler)(update, context)
+            self.latencies[label].append(time.perf_counter() - started)
+
+    async def play_group(self, chat_id):
+        player_ids = range(FIRST_PLAYER_ID, FIRST_PLAYER_ID + self.players)
+        await self.run_update("start", bot_module.start, chat_id, ADMIN_ID, "/start")
+        for user_id in player_ids:
+            await self.run_update("join", bot_module.join, chat_id, user_id, "/join")
+        await self.run_update("begin", bot_module.begin, chat_id, ADMIN_ID, "/begin")
+
+        game_state = bot_module.game_states[chat_id]
+        bank = bot_module.game_bank(game_state)
+        for _ in range(self.args.turns):
+            if not game_state.in_progress or not game_state.available_questions:
+                break
+            before = self.bot.chat_calls[chat_id].copy()
+            user_id = game_state.active_players[game_state.current_turn_index]
+            number = str(game_state.available_questions.starts[0])
+            await self.run_update("handle_message (pick)", bot_module.handle_message, chat_id, user_id, number)
+            await self.first_countdown_edit(chat_id)
+            if bank.pool[number].type == "mcq":
+                await self.run_update("check_mcq_answer", bot_module.handle_message, chat_id, user_id,
+                                      random.choice("abcd"))
+            else:
+                await self.run_update("handle_message (paragraph)", bot_module.handle_message, chat_id, user_id,
+                                      "A short essay")
+                await self.run_update("approve", bot_module.approve, chat_id, ADMIN_ID, "/approve")
+            self.turns += 1
+            self.turn_calls.update(self.bot.chat_calls[chat_id] - before)
+
+        async with bot_module.chat_lock(chat_id):
+            started = time.perf_counter()
+            await bot_module.show_leaderboard(self.context, chat_id)
+            self.latencies["show_leaderboard"].append(time.perf_counter() - started)
+
+        if self.players >= 2 and self.args.speed_answers:
+            await self.play_speed_round(chat_id, game_state)
+
+    async def first_countdown_edit(self, chat_id):
+        """Yield until the scheduler has sent the question's first countdown edit.
+
+        Nobody answers within the same event loop tick in production, but at
+        zero latency the fake bot never yields, so without this every answer
+        would cancel its timer before the scheduler got to run.
+        """
+        edits = self.bot.chat_calls[chat_id]["edit_message_text"]
+        for _ in range(20):
+            if self.bot.chat_calls[chat_id]["edit_message_text"] > edits:
+                return
+            await asyncio.sleep(0)
+
+    async def play_speed_round(self, chat_id, game_state):
+        """Force a tie, then flood the speed round with wrong answers before the right one"""
+        async with bot_module.chat_lock(chat_id):
+            game_state.in_progress = False
+            tied = game_state.active_players[:2]
+            top = max(game_state.player_scores.values()) + 1
+            for user_id in tied:
+                game_state.player_scores[user_id] = top
+            game_state.score_version += 1
+        await self.run_update("tiebreaker", bot_module.tiebreaker, chat_id, ADMIN_ID, "/tiebreaker")
+        tiebreaker_state = game_state.tiebreaker_state
+        question = bot_module.game_bank(game_state).get(tiebreaker_state.speed_round_question)
+        if question is None or not tiebreaker_state.waiting_for_speed_answer:
+            return
+        for i in range(self.args.speed_answers):
+            await self.run_update("handle_speed_round_answer", bot_module.handle_message, chat_id, tied[i % 2],
+                                  "definitely wrong")
+        letter = next(letter for letter, option in question.options_map.items() if option == question.answer_key)
+        await self.run_update("handle_speed_round_answer", bot_module.handle_message, chat_id, tied[0], letter)
+
+    def measure_save(self):
+        """Cost of one full save_game_state() of every resident chat"""
+        gc.collect()
+        started = time.perf_counter()
+        writer = bot_module.prepare_state_write(None, fsync=False)
+        encoded = time.perf_counter()
+        writer()
+        written = time.perf_counter()
+        if bot_module.STATE_BACKEND == "sqlite":
+            path = bot_module.STATE_DB_FILE
+        elif bot_module.STATE_BACKEND == "journal":
+            path = bot_module.STATE_JOURNAL_FILE
+        else:
+            path = bot_module.STATE_FILE
+        return {
+            "chats": len(bot_module.game_states),
+            "encode_ms": (encoded - started) * 1000,
+            "write_ms": (written - encoded) * 1000,
+            "bytes": os.path.getsize(path) if os.path.exists(path) else 0,
+        }
+
+    async def run(self):
+        gc.collect()
+        rss_before = rss_bytes()
+        bot_module.start_state_flusher()
+        started = time.perf_counter()
+        await asyncio.gather(*(self.play_group(self.first_chat_id - i) for i in range(self.groups)))
+        wall = time.perf_counter() - started
+        await bot_module.stop_state_flusher()
+        rss_after = rss_bytes()
+        resident = list(bot_module.game_states.values())
+        encoded_bytes = sum(len(bot_module.encode_state(state)) for state in resident)
+
+        updates = sum(len(values) for label, values in self.latencies.items() if label != "show_leaderboard")
+        return {
+            "name": f"{self.groups}x{self.players}",
+            "groups": self.groups,
+            "players": self.players,
+            "updates": updates,
+            "turns": self.turns,
+            "wall_s": wall,
+            "updates_per_s": updates / wall if wall else 0.0,
+            "handlers": {label: summarize(values) for label, values in sorted(self.latencies.items())},
+            "calls_per_turn": {method: count / self.turns for method, count in sorted(self.turn_calls.items())}
+            if self.turns else {},
+            "calls_total": dict(self.bot.calls),
+            "save": self.measure_save(),
+            "memory_per_chat_bytes": max(0, rss_after - rss_before) / self.groups,
+            "encoded_bytes_per_chat": encoded_bytes / len(resident) if resident else 0,
+        }
+
+
+def reset_bot_state():
+    bot_module.game_states.clear()
+    bot_module.cold_states.clear()
+    bot_module.chat_last_used.clear()
+    bot_module.dirty_chats.clear()
+    gc.collect()
+
+
+def parse_scenarios(spec):
+    scenarios = []
+    for item in spec.split(","):
+        groups, players = item.lower().split("x")
+        scenarios.append((int(groups), int(players)))
+    return scenarios
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                               text=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_scenario(result):
+    print(f"\n== {result['name']}: {result['groups']} groups x {result['players']} players")
+    print(f"   {result['updates']} updates in {result['wall_s']:.2f}s = {result['updates_per_s']:.0f} updates/s, "
+          f"{result['turns']} turns")
+    for label, stats in result["handlers"].items():
+        print(f"   {label:28} n={stats['count']:<7} p50={stats['p50_ms']:7.2f}ms p90={stats['p90_ms']:7.2f}ms "
+              f"p99={stats['p99_ms']:7.2f}ms max={stats['max_ms']:7.2f}ms")
+    calls = ", ".join(f"{method} {count:.2f}" for method, count in result["calls_per_turn"].items())
+    print(f"   Telegram calls per turn: {calls or 'n/a'}")
+    save = result["save"]
+    print(f"   Full save of {save['chats']} chats: encode {save['encode_ms']:.1f}ms, write {save['write_ms']:.1f}ms, "
+          f"{save['bytes'] / 1024:.1f} KB")
+    print(f"   Memory per chat: {result['memory_per_chat_bytes'] / 1024:.1f} KB RSS, "
+          f"{result['encoded_bytes_per_chat']:.0f} bytes encoded")
+
+
+def print_comparison(baseline, current):
+    """Print the change in throughput and p99 latency against an earlier run"""
+    print(f"\n== Compared with {baseline['commit']} ({baseline['timestamp']})")
+    old_by_name = {scenario["name"]: scenario for scenario in baseline["scenarios"]}
+    for new in current["scenarios"]:
+        old = old_by_name.get(new["name"])
+        if old is None:
+            continue
+        print(f"   {new['name']}: updates/s {old['updates_per_s']:.0f} -> {new['updates_per_s']:.0f} "
+              f"({change(old['updates_per_s'], new['updates_per_s'])})")
+        for label, stats in new["handlers"].items():
+            if label in old["handlers"]:
+                old_p99 = old["handlers"][label]["p99_ms"]
+                print(f"      {label:28} p99 {old_p99:7.2f}ms -> {stats['p99_ms']:7.2f}ms "
+                      f"({change(old_p99, stats['p99_ms'])})")
+        print(f"      {'full save':28} {old['save']['encode_ms'] + old['save']['write_ms']:7.1f}ms -> "
+              f"{new['save']['encode_ms'] + new['save']['write_ms']:7.1f}ms")
+
+
+def change(old, new):
+    return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+
+async def main(args):
+    await bot_module.bootstrap()
+    results = []
+    for index, (groups, players) in enumerate(parse_scenarios(args.scenarios)):
+        reset_bot_state()
+        result = await Scenario(index, groups, players, args).run()
+        print_scenario(result)
+        results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default="1x5,1x200,100x5,100x50,1000x5",
+                        help="comma-separated GROUPSxPLAYERS, e.g. 1x5,100x200,1000x200")
+    parser.add_argument("--turns", type=int, default=20, help="turns played per group")
+    parser.add_argument("--speed-answers", type=int, default=10,
+                        help="wrong speed-round answers sent before the right one (0 = no tiebreaker)")
+    parser.add_argument("--latency", type=float, default=0.0, help="ms added to every fake Telegram call")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random ms per call, up to this much")
+    parser.add_argument("--concurrency", type=int, default=bot_module.CONCURRENT_UPDATES,
+                        help="updates handled at once across groups")
+    parser.add_argument("--questions", type=int, default=0,
+                        help="regular questions in the synthetic bank (default: enough for --turns)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="where to save results (default: benchmark_results/<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    max_players = max(players for _, players in parse_scenarios(args.scenarios))
+    write_bank(os.environ["QUESTION_BANKS"], args.questions or max(args.turns, max_players) + 8, 50)
+
+    commit = git_commit()
+    results = asyncio.run(main(args))
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "state_backend": bot_module.STATE_BACKEND,
+        "args": vars(args),
+        "scenarios": results,
+    }
+    output = args.output or os.path.join("benchmark_results", f"{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved results to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(json.load(f), report)
@@ -0,0 +1,144 @@
+"""Run the sharded bot locally on synthetic updates.
+
+Starts SHARDS worker processes exactly as a sharded deployment does, points
+them at a stub Bot API server running in this process, and feeds every
+shard's queue the updates of many simulated groups (/start, /join, /begin,
+then rounds of answers), routed by chat_id the way route_update does.
+
+    python shard_driver.py --shards 4 --chats 200 --players 5 --rounds 10
+    python shard_driver.py --shards 1 --chats 200        # same load, unsharded
+
+Prints how long the shards took to work through the updates and which
+Bot API calls they made.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ADMIN_ID = 1
+FIRST_PLAYER_ID = 1000
+FIRST_CHAT_ID = -1000
+
+
+class StubBotAPI(BaseHTTPRequestHandler):
+    """Answers every Bot API method with a plausible result and counts the calls"""
+
+    calls = Counter()
+    calls_lock = threading.Lock()
+    message_ids = itertools.count(1)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        params = json.loads(body) if body.startswith(b"{") else {}
+        method = self.path.rsplit("/", 1)[-1]
+        with self.calls_lock:
+            self.calls[method] += 1
+        chat_id = int(params.get("chat_id", 0) or 0)
+        if method == "getMe":
+            result = {"id": 42, "is_bot": True, "first_name": "Quiz", "username": "quiz_bot"}
+        elif method == "getChat":
+            result = {"id": chat_id, "type": "private", "first_name": f"Player{chat_id}"}
+        elif method.startswith(("send", "edit")):
+            result = {
+                "message_id": next(self.message_ids),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "group", "title": f"Group {chat_id}"},
+                "text": params.get("text", ""),
+            }
+        else:
+            result = True
+        data = json.dumps({"ok": True, "result": result}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def message_update(update_id, chat_id, user_id, text):
+    """A Telegram Update dict for a group text message"""
+    message = {
+        "message_id": update_id,
+        "date": int(time.time()),
+        "chat": {"id": chat_id, "type": "group", "title": f"Group {chat_id}"},
+        "from": {"id": user_id, "is_bot": False, "first_name": f"Player{user_id}"},
+        "text": text,
+    }
+    if text.startswith("/"):
+        message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+    return {"update_id": update_id, "message": message}
+
+
+def synthetic_updates(chats, players, rounds):
+    """Every group's updates, interleaved across groups as they would arrive"""
+    update_ids = itertools.count(1)
+    chat_ids = [FIRST_CHAT_ID - n for n in range(chats)]
+    player_ids = range(FIRST_PLAYER_ID, FIRST_PLAYER_ID + players)
+    script = [(ADMIN_ID, "/start")] + [(user_id, "/join") for user_id in player_ids] + [(ADMIN_ID, "/begin")]
+    for _ in range(rounds):
+        # Only the player whose turn it is gets an answer in; the rest is chatter
+        script += [(user_id, "a") for user_id in player_ids] + [(ADMIN_ID, "/approve")]
+    for user_id, text in script:
+        for chat_id in chat_ids:
+            yield message_update(next(update_ids), chat_id, user_id, text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shards", type=int, default=2)
+    parser.add_argument("--chats", type=int, default=100, help="simulated groups")
+    parser.add_argument("--players", type=int, default=5, help="players per group")
+    parser.add_argument("--rounds", type=int, default=10, help="rounds of answers per group")
+    parser.add_argument("--port", type=int, default=0, help="stub Bot API port (default: any free one)")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), StubBotAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    # The bot reads its configuration at import time; the shards inherit it
+    work_dir = tempfile.mkdtemp(prefix="quiz-shards-")
+    os.environ["BOT_TOKEN"] = "123:local"
+    os.environ["TELEGRAM_API_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ["ADMIN_ID"] = str(ADMIN_ID)
+    os.environ["SHARDS"] = str(args.shards)
+    os.environ["BANK_RELOAD_INTERVAL"] = "0"
+    os.environ["STATE_DB_FILE"] = os.path.join(work_dir, "game_states.db")
+    import telegram_quiz_bot as bot
+
+    bot.STATE_FILE = os.path.join(work_dir, "game_states.pkl")
+    bot.STATE_JOURNAL_FILE = os.path.join(work_dir, "game_states.journal")
+    bot.start_shards()
+    started = time.perf_counter()
+    updates = 0
+    for data in synthetic_updates(args.chats, args.players, args.rounds):
+        bot.shard_queues[bot.shard_for(data["message"]["chat"]["id"])].put(data)
+        updates += 1
+    for queue in bot.shard_queues:
+        queue.put(None)
+    for process in bot.shard_processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    failed = [process.name for process in bot.shard_processes if process.exitcode != 0]
+    print(f"{updates} updates for {args.chats} groups across {args.shards} shards in {elapsed:.2f} s "
+          f"({updates / elapsed:.0f} updates/s)")
+    for method, count in StubBotAPI.calls.most_common():
+        print(f"  {method:<24} {count}")
+    print(f"State files in {work_dir}")
+    if failed:
+        sys.exit(f"Shards failed: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
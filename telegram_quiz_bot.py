@@ -2,11 +2,34 @@ import os
 import json
 import random
 import asyncio
+import contextvars
+import cProfile
+import heapq
+import io
+import itertools
+import marshal
+import multiprocessing
 import pickle
+import pstats
+import resource
+import signal
+import sqlite3
+import sys
+import threading
+import time
+import weakref
+from collections import Counter, OrderedDict, defaultdict
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
 from datetime import datetime
-from telegram import Update
+from functools import partial, wraps
+from types import MappingProxyType
+from telegram import Chat, InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram.error import RetryAfter
+from telegram.request import HTTPXRequest
 from telegram.ext import (
-    ApplicationBuilder, CommandHandler, ContextTypes, MessageHandler, filters
+    ApplicationBuilder, BaseUpdateProcessor, CallbackQueryHandler, CommandHandler, ContextTypes, MessageHandler, TypeHandler, filters
 )
 
 BOT_TOKEN = os.getenv("BOT_TOKEN")
@@ -16,12 +39,1212 @@ BACKUP_ADMIN_IDS = [int(x.strip()) for x in os.getenv("BACKUP_ADMIN_IDS", "").sp
 ALL_ADMIN_IDS = [ADMIN_ID] + BACKUP_ADMIN_IDS
 
 QUESTIONS_FILE = "tkh_quiz2.json"
+# Comma-separated bank files; the first one is used by chats that haven't picked one.
+# ".jsonl" banks (see convert_bank) are kept as raw bytes and decoded a question at a time
+QUESTION_BANKS = [p.strip() for p in os.getenv("QUESTION_BANKS", QUESTIONS_FILE).split(",") if p.strip()]
+# Seconds between checks for edited bank files (0 = never reload)
+BANK_RELOAD_INTERVAL = float(os.getenv("BANK_RELOAD_INTERVAL", "5"))
+BANK_INDEX_MAGIC = b"QBANKIX1"  # header of the ".idx" sidecar next to a JSONL bank
+PACKED_CACHE_SIZE = 4096  # decoded questions kept per JSONL bank
 STATE_FILE = "game_states.pkl"
+STATE_MAGIC = b"GS"  # prefix of GameState.to_bytes() payloads
+STATE_FORMAT_VERSION = 9
+STATE_HAS_TIMERS = 1  # flag in the byte after the version: a question is on the clock
+# "pickle" rewrites STATE_FILE on every change; "journal" appends per-chat
+# records to STATE_JOURNAL_FILE and periodically replaces it with a compacted
+# copy holding one record per chat (a STATE_FILE left by the pickle backend
+# is read once and folded in);
+# "sqlite" keeps one row per chat in STATE_DB_FILE and loads chats on demand
+STATE_BACKEND = os.getenv("STATE_BACKEND", "pickle")
+STATE_JOURNAL_FILE = "game_states.journal"
+STATE_DB_FILE = os.getenv("STATE_DB_FILE", "game_states.db")
+JOURNAL_COMPACT_EVERY = int(os.getenv("JOURNAL_COMPACT_EVERY", "500"))
+# Write-behind: seconds between background flushes (0 = write synchronously)
+STATE_FLUSH_INTERVAL = float(os.getenv("STATE_FLUSH_INTERVAL", "0.5"))
+# Minimum seconds between fsyncs of the state files (shutdown always fsyncs)
+STATE_FSYNC_INTERVAL = float(os.getenv("STATE_FSYNC_INTERVAL", "5"))
+# Chats with no game running are moved out of memory once they have been
+# idle for IDLE_CHAT_TTL seconds, or sooner when more than MAX_RESIDENT_CHATS
+# are loaded (but never within MIN_RESIDENT_SECONDS of their last use).
+# The journal and sqlite backends read evicted chats back from disk; the
+# pickle backend rewrites every chat on each save, so it keeps them in memory
+# as compact encoded bytes and memory still grows with every chat ever seen
+# (use one of the others for large deployments)
+IDLE_CHAT_TTL = float(os.getenv("IDLE_CHAT_TTL", "1800"))
+MAX_RESIDENT_CHATS = int(os.getenv("MAX_RESIDENT_CHATS", "1000"))
+MIN_RESIDENT_SECONDS = 60
+QUESTION_SECONDS = 30
+TIMER_TICK = 0.25  # timer events this close together are handled in one batch
+PICKER_MAX_CHARS = 3000  # longest list of question numbers shown in a turn prompt
+# Queue paragraph answers for review (/approve 3 5 7) and keep the game
+# going, instead of pausing every turn until an admin decides
+REVIEW_QUEUE = os.getenv("REVIEW_QUEUE", "0") == "1"
+# "/begin open": every player answers the same MCQ at once. The first N
+# correct answers get N, N-1, ... bonus points on top of the usual one
+OPEN_ROUND_SPEED_BONUS = int(os.getenv("OPEN_ROUND_SPEED_BONUS", "0"))
+OPEN_ROUND_NAMES_SHOWN = 30  # correct answerers named in a round's results
+# MCQs get one button per option; presses arrive as callback queries with
+# "<question id>:<option index>" data instead of as text messages
+INLINE_ANSWERS = os.getenv("INLINE_ANSWERS", "0") == "1"
+ANSWER_BUTTON_PATTERN = r"^\d+:\d+$"
+# Opt-in outbound queue that keeps us under Telegram's flood limits
+OUTBOUND_QUEUE = os.getenv("OUTBOUND_QUEUE", "0") == "1"
+OUTBOUND_GLOBAL_RATE = float(os.getenv("OUTBOUND_GLOBAL_RATE", "30"))  # messages/second, all chats
+OUTBOUND_CHAT_PER_MINUTE = float(os.getenv("OUTBOUND_CHAT_PER_MINUTE", "20"))  # messages/minute, per group
+# Display names are cached so turns and leaderboards don't call get_chat
+NAME_CACHE_SIZE = int(os.getenv("NAME_CACHE_SIZE", "5000"))
+NAME_CACHE_TTL = float(os.getenv("NAME_CACHE_TTL", "3600"))
+# Max get_chat calls in flight at once when rendering a list of players
+NAME_LOOKUP_CONCURRENCY = int(os.getenv("NAME_LOOKUP_CONCURRENCY", "10"))
+# Setting WEBHOOK_URL (the public https:// base URL) serves updates over a
+# local webhook endpoint instead of long polling
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "").rstrip("/")
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "127.0.0.1")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443"))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "telegram")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET") or None  # checked against X-Telegram-Bot-Api-Secret-Token
+# Updates handled at once across all groups (1 = one at a time); a single
+# group's updates are always handled one at a time, in order, and updates
+# waiting behind their group's don't count towards this
+CONCURRENT_UPDATES = int(os.getenv("CONCURRENT_UPDATES", "32"))
+# Updates allowed to wait on their group's lock, as a multiple of CONCURRENT_UPDATES;
+# past that, reading further updates pauses until some finish
+UPDATES_WAITING_FACTOR = int(os.getenv("UPDATES_WAITING_FACTOR", "32"))
+# Connections in the pool every Bot API call shares
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "256"))
+# Point the bot at another Bot API server, e.g. a local one for testing
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "").rstrip("/")
+# SHARDS > 1 runs one worker process per shard; the main process only
+# receives updates and routes each to the shard owning its chat_id.
+# Every shard keeps its own state files (game_states.shard0.pkl, ...).
+# shard_driver.py runs the shards locally on synthetic updates
+SHARDS = int(os.getenv("SHARDS", "1"))
+# Serve Prometheus metrics on this port (0 = off, and nothing is recorded);
+# shard N of a sharded deployment uses METRICS_PORT + N
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_LISTEN = os.getenv("METRICS_LISTEN", "127.0.0.1")
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Sampled profiling of update handlers; admins can change these with /profile
+PROFILE_UPDATES = os.getenv("PROFILE_UPDATES", "0") == "1"
+PROFILE_EVERY = int(os.getenv("PROFILE_EVERY", "100"))  # cProfile every Nth update (0 = never)
+PROFILE_SLOW_SECONDS = float(os.getenv("PROFILE_SLOW_SECONDS", "1"))  # log updates slower than this (0 = never)
+PROFILE_LOG_FILE = os.getenv("PROFILE_LOG_FILE", "slow_updates.log")
+PROFILE_TOP_FUNCTIONS = 15
 
 # Global data structures
-questions_data = []
-question_pool = {}
+question_banks = {}  # bank name -> QuestionBank currently loaded from that file
+bank_mtimes = {}  # bank name -> mtime of the last load attempt
+bank_watcher_task = None
 game_states = {}  # chat_id -> game_state dictionary
+journal_records = 0  # records appended since the last compaction
+state_db = None  # sqlite3 connection when STATE_BACKEND == "sqlite"
+state_db_lock = threading.RLock()
+dirty_chats = set()  # chats saved since the last write-behind flush
+flush_lock = asyncio.Lock()
+state_flusher_task = None
+chat_last_used = OrderedDict()  # chat_id -> monotonic time, least recent first
+cold_states = {}  # chat_id -> encode_state() bytes for evicted chats (pickle backend)
+journal_index = {}  # chat_id -> offset of its newest record in STATE_JOURNAL_FILE (journal backend)
+journal_index_lock = threading.Lock()  # held while the journal is swapped for a compacted one
+chats_being_written = set()  # chats whose flush is still running; not evictable until it is done
+chat_evictor_task = None
+# chat_id -> asyncio.Lock held while a handler or timer expiry for that chat
+# runs; entries disappear once nothing holds or waits on the lock
+chat_locks = weakref.WeakValueDictionary()
+startup_timings = {}  # phase -> seconds, filled in by bootstrap()
+metrics_server = None
+shard_queues = []  # front process: one multiprocessing.Queue of updates per shard
+shard_processes = []
+
+def pack_ids(ids):
+    """Pack Telegram ids (or small ints such as scores) as int64 bytes"""
+    return array("q", ids).tobytes()
+
+def unpack_ids(data):
+    return array("q", data).tolist()
+
+def timer_tuple(handle):
+    """What to save for a chat's timer: its deadline while it is still pending"""
+    return handle.to_tuple() if handle is not None and not handle.done() else None
+
+def dormant_timer(data):
+    return TimerHandle.dormant(data) if data is not None else None
+
+def countdown_steps(duration):
+    """(offset, countdown line) steps for a question timer; None marks expiry"""
+    steps = [(duration - remaining, f"⏳ {remaining} seconds left...") for remaining in range(duration, 0, -10)]
+    steps.append((duration, "⏰ Time's up!"))
+    steps.append((duration + 1, None))
+    return tuple(steps)
+
+class TimerHandle:
+    """A cancellable question countdown; decoded ones stay dormant until resume_timers()"""
+    __slots__ = ("scheduler", "bot", "chat_id", "message_id", "text", "start", "duration",
+                 "deadline", "steps", "step", "on_expire", "markup", "cancelled", "fired", "expired")
+
+    def __init__(self, scheduler, bot, chat_id, message_id, text, start, duration, deadline, on_expire, markup=None):
+        self.scheduler = scheduler
+        self.bot = bot
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.text = text
+        self.start = start  # loop.time() the countdown began
+        self.duration = duration
+        self.deadline = deadline  # time.time() of "Time's up", which survives restarts
+        self.steps = countdown_steps(duration)
+        self.step = 0
+        self.on_expire = on_expire
+        self.markup = markup  # answer buttons, kept on the message until time is up
+        self.cancelled = False
+        self.fired = False  # deadline reached, expiry queued
+        self.expired = False  # on_expire has started
+
+    def to_tuple(self):
+        return (self.deadline, self.duration, self.message_id, self.text)
+
+    @classmethod
+    def dormant(cls, data):
+        deadline, duration, message_id, text = data
+        return cls(None, None, None, message_id, text, None, duration, deadline, None)
+
+    def cancel(self):
+        if self.scheduler is None:
+            self.cancelled = True
+        else:
+            self.scheduler.cancel(self)
+
+    def done(self):
+        return self.cancelled or self.expired
+
+class TimerScheduler:
+    """Runs every question countdown from one heap and one asyncio task"""
+
+    def __init__(self):
+        self.heap = []  # (when, seq, handle): each timer's next edit or expiry
+        self.counter = itertools.count()
+        self.pending = 0  # timers neither cancelled nor expired
+        self.stale = 0  # cancelled entries still in the heap
+        self.wakeup = None
+        self.task = None
+        self.running = set()  # expiry/edit tasks, kept referenced until done
+
+    def schedule(self, bot, chat_id, message_id, text, duration, on_expire, markup=None):
+        """Start a countdown on message_id; on_expire(handle) runs when it ends"""
+        loop = asyncio.get_running_loop()
+        handle = TimerHandle(self, bot, chat_id, message_id, text, loop.time(),
+                             duration, time.time() + duration, on_expire, markup)
+        self.pending += 1
+        self.ensure_running()
+        self.push(handle)
+        return handle
+
+    def resume(self, handle, bot, chat_id, on_expire):
+        """Schedule a dormant handle against its saved deadline; past ones expire at once"""
+        now = asyncio.get_running_loop().time()
+        handle.scheduler, handle.bot, handle.chat_id, handle.on_expire = self, bot, chat_id, on_expire
+        handle.start = now - (handle.duration - (handle.deadline - time.time()))
+        # Countdown edits that fell due while the bot was down are skipped,
+        # but not "Time's up!", which also takes the answer buttons away
+        while handle.steps[handle.step + 1][1] is not None and handle.start + handle.steps[handle.step][0] < now:
+            handle.step += 1
+        self.pending += 1
+        self.ensure_running()
+        self.push(handle)
+
+    def push(self, handle):
+        when = handle.start + handle.steps[handle.step][0]
+        heapq.heappush(self.heap, (when, next(self.counter), handle))
+        if self.heap[0][2] is handle:
+            self.wakeup.set()
+
+    def cancel(self, handle):
+        if handle.cancelled:
+            return
+        # Also set after firing, so an expiry that hasn't started yet is dropped
+        handle.cancelled = True
+        if handle.fired:
+            return
+        self.pending -= 1
+        # Its entry is skipped when popped, unless stale entries come to fill most of the heap
+        self.stale += 1
+        if self.stale > 64 and self.stale * 2 > len(self.heap):
+            self.heap = [entry for entry in self.heap if not entry[2].cancelled]
+            heapq.heapify(self.heap)
+            self.stale = 0
+
+    def ensure_running(self):
+        if self.task is None or self.task.done():
+            self.wakeup = asyncio.Event()
+            self.task = asyncio.create_task(self.run())
+
+    def spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self.running.add(task)
+        task.add_done_callback(self.running.discard)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self.wakeup.clear()
+            wake_timer = None
+            if self.heap:
+                delay = self.heap[0][0] - loop.time()
+                if delay <= 0:
+                    self.run_due(loop.time())
+                    continue
+                wake_timer = loop.call_later(delay, self.wakeup.set)
+            try:
+                await self.wakeup.wait()
+            finally:
+                if wake_timer:
+                    wake_timer.cancel()
+
+    def run_due(self, now):
+        """Fire everything due within this tick; edits go out as one batch"""
+        edits = []
+        while self.heap and self.heap[0][0] <= now + TIMER_TICK:
+            _, _, handle = heapq.heappop(self.heap)
+            if handle.cancelled:
+                self.stale -= 1
+                continue
+            line = handle.steps[handle.step][1]
+            if line is None:
+                handle.fired = True
+                self.pending -= 1
+                self.spawn(self.expire(handle))
+                continue
+            text = f"{handle.text}\n\n{line}"
+            # Editing without reply_markup removes the buttons, which the
+            # last countdown line ("Time's up!") should do
+            markup = handle.markup if handle.steps[handle.step + 1][1] is not None else None
+            if outbound_queue is not None:
+                outbound_queue.edit_countdown(handle.bot, handle.chat_id, handle.message_id, text, markup)
+            else:
+                edits.append(handle.bot.edit_message_text(
+                    chat_id=handle.chat_id,
+                    message_id=handle.message_id,
+                    text=text,
+                    reply_markup=markup
+                ))
+            handle.step += 1
+            self.push(handle)
+        if edits:
+            self.spawn(self.send_edits(edits))
+
+    async def send_edits(self, edits):
+        for result in await asyncio.gather(*edits, return_exceptions=True):
+            if isinstance(result, Exception):
+                print(f"Error updating countdown: {result}")
+
+    async def expire(self, handle):
+        async with chat_lock(handle.chat_id):
+            # An answer handled while we waited for the lock may have cancelled us
+            if handle.cancelled:
+                return
+            handle.expired = True
+            started = time.perf_counter()
+            try:
+                await handle.on_expire(handle)
+            except Exception as e:
+                print(f"Error handling timeout in chat {handle.chat_id}: {e}")
+            if metrics is not None:
+                name = getattr(handle.on_expire, "func", handle.on_expire).__name__
+                metrics.handler_seconds[name].observe(time.perf_counter() - started)
+
+timer_scheduler = TimerScheduler()
+
+PRIORITY_HIGH = 0  # questions, answers and results
+PRIORITY_NORMAL = 1
+PRIORITY_COUNTDOWN = 2  # timer edits - merged, and sent last
+PRIORITY_NAMES = {PRIORITY_HIGH: "high", PRIORITY_NORMAL: "normal", PRIORITY_COUNTDOWN: "countdown"}
+
+class TokenBucket:
+    """Classic token bucket; blocked_until honours Telegram's RetryAfter"""
+    __slots__ = ("rate", "capacity", "tokens", "updated", "blocked_until")
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def delay(self, now):
+        """Seconds until a token is available (0 if one is available now)"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+class OutboundItem:
+    __slots__ = ("method", "kwargs", "chat_id", "priority", "seq", "future", "merge_key", "dropped")
+
+    def __init__(self, method, kwargs, chat_id, priority, seq, future=None, merge_key=None):
+        self.method = method
+        self.kwargs = kwargs
+        self.chat_id = chat_id
+        self.priority = priority
+        self.seq = seq
+        self.future = future
+        self.merge_key = merge_key
+        self.dropped = False  # superseded countdown edit; skipped instead of sent
+
+class OutboundQueue:
+    """Sends Telegram calls by priority, within global and per-chat token buckets and one message per chat at a time"""
+
+    def __init__(self, global_rate, chat_per_minute):
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_rate = chat_per_minute / 60
+        self.chat_burst = chat_per_minute
+        self.chat_buckets = {}
+        self.heap = []  # (priority, seq, item)
+        self.countdowns = {}  # (chat_id, message_id) -> queued countdown item
+        self.countdowns_sending = {}  # (chat_id, message_id) -> countdown item being delivered
+        self.counter = itertools.count()
+        self.wakeup = None
+        self.task = None
+        self.in_flight = set()
+        self.sending_chats = set()  # chats with a message (not a countdown edit) in flight
+        self.sent = 0
+        self.merged = 0
+        self.retried = 0
+        self.failed = 0
+
+    def depth(self):
+        counts = {PRIORITY_HIGH: 0, PRIORITY_NORMAL: 0, PRIORITY_COUNTDOWN: 0}
+        for priority, _, _ in self.heap:
+            counts[priority] += 1
+        return counts
+
+    def ensure_running(self):
+        if self.task is None or self.task.done():
+            self.wakeup = asyncio.Event()
+            self.task = asyncio.create_task(self.run())
+
+    def push(self, item):
+        heapq.heappush(self.heap, (item.priority, item.seq, item))
+        self.ensure_running()
+        self.wakeup.set()
+
+    async def call(self, method, kwargs, chat_id, priority=PRIORITY_NORMAL):
+        """Queue method(**kwargs) for chat_id and wait for Telegram's reply"""
+        future = asyncio.get_running_loop().create_future()
+        self.push(OutboundItem(method, kwargs, chat_id, priority, next(self.counter), future))
+        return await future
+
+    def edit_countdown(self, bot, chat_id, message_id, text, reply_markup=None):
+        """Queue a countdown edit without waiting, replacing any queued one"""
+        key = (chat_id, message_id)
+        queued = self.countdowns.get(key)
+        if queued is not None:
+            queued.kwargs["text"] = text
+            queued.kwargs["reply_markup"] = reply_markup
+            self.merged += 1
+            return
+        kwargs = {"chat_id": chat_id, "message_id": message_id, "text": text, "reply_markup": reply_markup}
+        item = OutboundItem(bot.edit_message_text, kwargs, chat_id, PRIORITY_COUNTDOWN, next(self.counter), merge_key=key)
+        self.countdowns[key] = item
+        self.push(item)
+
+    def drop_countdown(self, chat_id, message_id):
+        """Stop countdown edits to a message whose text is being replaced for good"""
+        key = (chat_id, message_id)
+        for item in (self.countdowns.pop(key, None), self.countdowns_sending.get(key)):
+            if item is not None:
+                item.dropped = True
+
+    def bucket_for(self, chat_id):
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self.chat_buckets) > 10000:
+                # Forget chats whose buckets have refilled - they behave like new ones
+                now = time.monotonic()
+                self.chat_buckets = {cid: b for cid, b in self.chat_buckets.items()
+                                     if b.delay(now) > 0 or b.tokens < b.capacity}
+            bucket = self.chat_buckets[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+        return bucket
+
+    def dispatch(self, now):
+        """Start every send the buckets allow; returns seconds to wait, or None if idle"""
+        deferred = []
+        wait = None
+        while self.heap:
+            global_delay = self.global_bucket.delay(now)
+            if global_delay > 0:
+                wait = global_delay
+                break
+            entry = heapq.heappop(self.heap)
+            item = entry[2]
+            if item.dropped:
+                continue
+            if item.merge_key is None and item.chat_id in self.sending_chats:
+                # deliver() wakes us when the chat's message is done
+                deferred.append(entry)
+                continue
+            bucket = self.bucket_for(item.chat_id)
+            chat_delay = bucket.delay(now)
+            if chat_delay > 0:
+                deferred.append(entry)
+                wait = chat_delay if wait is None else min(wait, chat_delay)
+                continue
+            bucket.take()
+            self.global_bucket.take()
+            if item.merge_key is not None:
+                self.countdowns.pop(item.merge_key, None)
+                self.countdowns_sending[item.merge_key] = item
+            else:
+                self.sending_chats.add(item.chat_id)
+            task = asyncio.create_task(self.deliver(item))
+            self.in_flight.add(task)
+            task.add_done_callback(self.in_flight.discard)
+        for entry in deferred:
+            heapq.heappush(self.heap, entry)
+        return wait
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self.wakeup.clear()
+            wait = self.dispatch(time.monotonic())
+            wake_timer = loop.call_later(wait, self.wakeup.set) if wait is not None else None
+            try:
+                await self.wakeup.wait()
+            finally:
+                if wake_timer:
+                    wake_timer.cancel()
+
+    async def deliver(self, item):
+        try:
+            result = await item.method(**item.kwargs)
+        except RetryAfter as e:
+            self.retried += 1
+            self.bucket_for(item.chat_id).blocked_until = time.monotonic() + float(e.retry_after)
+            if item.merge_key is not None:
+                if item.dropped or item.merge_key in self.countdowns:
+                    return  # a newer countdown or the final text is already queued
+                self.countdowns[item.merge_key] = item
+            # Its seq is older than anything queued since, so it goes back to the head of its chat
+            self.push(item)
+            return
+        except Exception as e:
+            self.failed += 1
+            if item.future is not None:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            else:
+                print(f"Error sending queued update to chat {item.chat_id}: {e}")
+            return
+        finally:
+            if item.merge_key is None:
+                self.sending_chats.discard(item.chat_id)
+                self.wakeup.set()
+            elif self.countdowns_sending.get(item.merge_key) is item:
+                del self.countdowns_sending[item.merge_key]
+        self.sent += 1
+        if item.future is not None and not item.future.done():
+            item.future.set_result(result)
+
+    async def drain(self, timeout=5):
+        """Give queued messages a chance to go out before shutdown"""
+        deadline = time.monotonic() + timeout
+        while (self.heap or self.in_flight) and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+
+outbound_queue = OutboundQueue(OUTBOUND_GLOBAL_RATE, OUTBOUND_CHAT_PER_MINUTE) if OUTBOUND_QUEUE else None
+
+async def queued_call(method, kwargs, chat_id, priority):
+    """outbound_queue.call, counting the wait as the update's Telegram time"""
+    # The queue's worker makes the request, so count the wait for it here
+    timings = current_timings.get()
+    started = time.perf_counter()
+    try:
+        return await outbound_queue.call(method, kwargs, chat_id, priority)
+    finally:
+        if timings is not None:
+            timings.telegram += time.perf_counter() - started
+            timings.telegram_calls += 1
+
+async def send_message(bot, chat_id, text, priority=PRIORITY_NORMAL, **kwargs):
+    """bot.send_message, through the outbound queue when it is enabled"""
+    if outbound_queue is None:
+        return await bot.send_message(chat_id=chat_id, text=text, **kwargs)
+    return await queued_call(bot.send_message, dict(chat_id=chat_id, text=text, **kwargs), chat_id, priority)
+
+async def reply(update, context, text, priority=PRIORITY_NORMAL, **kwargs):
+    """update.message.reply_text, but sent like any other group message through send_message"""
+    chat = update.effective_chat
+    # reply_text only quotes the command outside private chats
+    if chat.type != Chat.PRIVATE:
+        kwargs.setdefault("reply_to_message_id", update.message.message_id)
+    return await send_message(context.bot, chat.id, text, priority, **kwargs)
+
+async def edit_message(bot, chat_id, message_id, text, priority=PRIORITY_HIGH):
+    """Replace a question message's text and buttons, through the outbound queue when it is enabled"""
+    if outbound_queue is None:
+        return await bot.edit_message_text(chat_id=chat_id, message_id=message_id, text=text)
+    # A countdown edit still queued for the message would go out after this and overwrite it
+    outbound_queue.drop_countdown(chat_id, message_id)
+    return await queued_call(bot.edit_message_text, dict(chat_id=chat_id, message_id=message_id, text=text),
+                             chat_id, priority)
+
+async def drop_answer_buttons(bot, timer, text=None):
+    """Take the buttons off a question settled before its time ran out, leaving text (default: the question)"""
+    # An expired countdown's "Time's up!" edit has already removed them
+    if timer is None or not timer.cancelled or timer.fired or timer.markup is None:
+        return
+    timer.markup = None
+    try:
+        await edit_message(bot, timer.chat_id, timer.message_id, text or timer.text)
+    except Exception as e:
+        print(f"Error closing question in chat {timer.chat_id}: {e}")
+
+def answer_keyboard(question):
+    """One button per MCQ option, or None when INLINE_ANSWERS is off"""
+    if not INLINE_ANSWERS or question.type != "mcq":
+        return None
+    return InlineKeyboardMarkup([[
+        InlineKeyboardButton(chr(97 + i), callback_data=f"{question.id}:{i}") for i in range(len(question.options))
+    ]])
+
+def normalize_answer(text):
+    """Players' answers and answer keys are compared without spaces or case"""
+    return text.strip().replace(" ", "").lower()
+
+@dataclass(frozen=True, slots=True)
+class Question:
+    """A question from a bank file, compiled once at load time"""
+    id: int  # position in the bank file
+    type: str
+    text: str
+    options: tuple
+    answer: str
+    answer_key: str  # normalize_answer(answer)
+    options_map: MappingProxyType  # option letter -> normalize_answer(option)
+    options_text: str  # "a) ...", one option per line
+    prompt: str  # sent when a player picks this question
+    is_tiebreaker: bool
+
+    @classmethod
+    def compile(cls, question_id, data):
+        options = tuple(data.get("options", ()))
+        options_text = "\n".join(f"{chr(97 + i)}) {opt}" for i, opt in enumerate(options))
+        if data["type"] == "mcq":
+            prompt = f"{data['question']}\nOptions:\n{options_text}"
+        else:
+            prompt = f"{data['question']} (You have {QUESTION_SECONDS} seconds to respond.)"
+        answer = data.get("answer", "")
+        return cls(
+            id=question_id,
+            type=data["type"],
+            text=data["question"],
+            options=options,
+            answer=answer,
+            answer_key=normalize_answer(answer),
+            options_map=MappingProxyType({chr(97 + i): normalize_answer(opt) for i, opt in enumerate(options)}),
+            options_text=options_text,
+            prompt=prompt,
+            is_tiebreaker=bool(data.get("is_tiebreaker", False)),
+        )
+
+    def resolve(self, response):
+        """Map a reply (an option letter or the answer typed out) to a normalised answer"""
+        key = normalize_answer(response)
+        return self.options_map.get(key, key)
+
+    def is_correct(self, response):
+        return self.resolve(response) == self.answer_key
+
+@dataclass(frozen=True, slots=True)
+class QuestionBank:
+    """One compiled bank file; replaced as a whole when the file changes"""
+    name: str
+    path: str
+    mtime: float
+    # For JSONL banks these are PackedQuestions, PackedPool and int64
+    # memoryviews over the index rather than a list, dict and tuples
+    questions: list  # Question objects; a question's id is its index here
+    pool: dict  # number shown to players -> Question
+    tiebreaker_mcq: tuple  # ids of speed-round questions
+    tiebreaker_paragraph: tuple  # ids of paragraph tiebreaker questions
+
+    def get(self, question_id):
+        if question_id is None or question_id >= len(self.questions):
+            return None
+        return self.questions[question_id]
+
+class Histogram:
+    """Prometheus-style histogram over LATENCY_BUCKETS"""
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)  # last one is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def render(self, name, labels=""):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels}{"," if labels else ""}le="{bound}"}} {cumulative}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {self.total}")
+        lines.append(f"{name}_count{suffix} {self.count}")
+        return lines
+
+class Metrics:
+    """Counters and histograms for the /metrics endpoint; only exists when METRICS_PORT is set"""
+
+    def __init__(self):
+        self.handler_seconds = defaultdict(Histogram)  # handler name -> Histogram
+        self.handler_errors = Counter()
+        self.api_seconds = defaultdict(Histogram)  # Bot API method -> Histogram
+        self.api_errors = Counter()
+        self.save_seconds = Histogram()
+        self.save_bytes = 0
+
+    def render(self):
+        """Everything in Prometheus text format; gauges are read from the live state"""
+        lines = [
+            "# HELP quiz_handler_seconds Time to handle an update or timer expiry, by handler",
+            "# TYPE quiz_handler_seconds histogram",
+        ]
+        for handler, histogram in sorted(self.handler_seconds.items()):
+            lines += histogram.render("quiz_handler_seconds", f'handler="{handler}"')
+        lines += ["# HELP quiz_handler_errors_total Handlers that raised", "# TYPE quiz_handler_errors_total counter"]
+        lines += [f'quiz_handler_errors_total{{handler="{h}"}} {n}' for h, n in sorted(self.handler_errors.items())]
+        lines += [
+            "# HELP quiz_telegram_request_seconds Bot API request latency, by method",
+            "# TYPE quiz_telegram_request_seconds histogram",
+        ]
+        for method, histogram in sorted(self.api_seconds.items()):
+            lines += histogram.render("quiz_telegram_request_seconds", f'method="{method}"')
+        lines += [
+            "# HELP quiz_telegram_request_errors_total Failed Bot API requests, by method",
+            "# TYPE quiz_telegram_request_errors_total counter",
+        ]
+        lines += [f'quiz_telegram_request_errors_total{{method="{m}"}} {n}' for m, n in sorted(self.api_errors.items())]
+        lines += ["# HELP quiz_state_save_seconds Time to encode and write state", "# TYPE quiz_state_save_seconds histogram"]
+        lines += self.save_seconds.render("quiz_state_save_seconds")
+        lines += [
+            "# HELP quiz_state_save_bytes_total Bytes of state written",
+            "# TYPE quiz_state_save_bytes_total counter",
+            f"quiz_state_save_bytes_total {self.save_bytes}",
+        ]
+        running = [state for state in game_states.values() if state.in_progress or state.tiebreaker_state.in_progress]
+        gauges = (
+            ("quiz_active_games", "Groups with a game or tiebreaker running", len(running)),
+            ("quiz_players_in_game", "Players in running games", sum(len(state.active_players) for state in running)),
+            ("quiz_pending_timers", "Question timers waiting to fire", timer_scheduler.pending),
+            ("quiz_resident_chats", "Groups whose state is in memory", len(game_states)),
+            ("quiz_parked_chats", "Idle groups parked as encoded bytes", len(cold_states)),
+        )
+        for name, help_text, value in gauges:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"]
+        if outbound_queue is not None:
+            lines += ["# HELP quiz_outbound_queued Calls waiting in the outbound queue", "# TYPE quiz_outbound_queued gauge"]
+            for priority, queued in outbound_queue.depth().items():
+                lines.append(f'quiz_outbound_queued{{priority="{PRIORITY_NAMES[priority]}"}} {queued}')
+            lines += ["# HELP quiz_outbound_calls_total Outbound queue calls by outcome", "# TYPE quiz_outbound_calls_total counter"]
+            for outcome in ("sent", "merged", "retried", "failed"):
+                lines.append(f'quiz_outbound_calls_total{{outcome="{outcome}"}} {getattr(outbound_queue, outcome)}')
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics() if METRICS_PORT else None
+
+def instrumented(handler):
+    """Time a handler into metrics; returns it unchanged when metrics are off"""
+    if metrics is None:
+        return handler
+    name = handler.__name__
+
+    @wraps(handler)
+    async def wrapper(update, context):
+        started = time.perf_counter()
+        try:
+            return await handler(update, context)
+        except Exception:
+            metrics.handler_errors[name] += 1
+            raise
+        finally:
+            metrics.handler_seconds[name].observe(time.perf_counter() - started)
+    return wrapper
+
+class InstrumentedRequest(HTTPXRequest):
+    """HTTPXRequest that times every Bot API call into metrics and the profiled update"""
+
+    async def do_request(self, url, method, *args, **kwargs):
+        api_method = url.rsplit("/", 1)[-1]
+        timings = current_timings.get()
+        started = time.perf_counter()
+        try:
+            return await super().do_request(url, method, *args, **kwargs)
+        except Exception:
+            if metrics is not None:
+                metrics.api_errors[api_method] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            if metrics is not None:
+                metrics.api_seconds[api_method].observe(elapsed)
+            if timings is not None:
+                timings.telegram += elapsed
+                timings.telegram_calls += 1
+
+async def serve_metrics(reader, writer):
+    """Answer any HTTP request with the current metrics"""
+    try:
+        await reader.readuntil(b"\r\n\r\n")
+        body = metrics.render().encode()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n"
+            b"Content-Length: %d\r\nConnection: close\r\n\r\n" % len(body) + body
+        )
+        await writer.drain()
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+class UpdateTimings:
+    """Where a profiled update's time went, filled in while its handler runs"""
+    __slots__ = ("telegram", "telegram_calls", "save", "saves", "lock")
+
+    def __init__(self):
+        self.telegram = 0.0  # awaiting Bot API calls, including the outbound queue
+        self.telegram_calls = 0
+        self.save = 0.0  # inside save_game_state
+        self.saves = 0
+        self.lock = 0.0  # waiting for the chat lock
+
+current_timings = contextvars.ContextVar("current_timings", default=None)
+
+def await_chain(coro):
+    """Where a suspended coroutine is stuck, outermost frame first"""
+    lines = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        lines.append(f"    {frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}")
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    if coro is not None:
+        lines.append(f"    awaiting {coro!r}"[:300])
+    return lines
+
+def append_profile_log(text):
+    with open(PROFILE_LOG_FILE, "a", encoding="utf-8") as f:
+        f.write(text)
+
+class UpdateProfiler:
+    """Opt-in profiling: cProfile every Nth update, and a stack sample of any slower than the threshold"""
+
+    def __init__(self):
+        self.enabled = PROFILE_UPDATES
+        self.every = PROFILE_EVERY
+        self.slow_seconds = PROFILE_SLOW_SECONDS
+        self.seen = 0
+        self.logged = 0
+        self.profiling = False
+
+    async def run(self, name, handler, update, context):
+        self.seen += 1
+        timings = UpdateTimings()
+        token = current_timings.set(timings)
+        profile = None
+        # cProfile sees every task the loop runs while it is on, so one update at a time
+        if self.every and self.seen % self.every == 0 and not self.profiling:
+            self.profiling = True
+            profile = cProfile.Profile()
+        samples = []
+        watchdog = None
+        if self.slow_seconds > 0:
+            task = asyncio.current_task()
+            due = time.perf_counter() + self.slow_seconds
+
+            def sample():
+                # A late callback means the loop itself was blocked
+                late = time.perf_counter() - due
+                samples.append(f"  still running after {self.slow_seconds:g}s (loop {late * 1000:.0f} ms late), waiting at:")
+                samples.extend(await_chain(task.get_coro()))
+            watchdog = asyncio.get_running_loop().call_later(self.slow_seconds, sample)
+
+        started = time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            return await handler(update, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            if profile is not None:
+                profile.disable()
+                self.profiling = False
+            if watchdog is not None:
+                watchdog.cancel()
+            current_timings.reset(token)
+            if profile is not None or 0 < self.slow_seconds <= elapsed:
+                record = self.format(name, update, elapsed, timings, samples, profile)
+                self.logged += 1
+                try:
+                    await asyncio.to_thread(append_profile_log, record)
+                except OSError as e:
+                    print(f"Error writing {PROFILE_LOG_FILE}: {e}")
+
+    def format(self, name, update, elapsed, timings, samples, profile):
+        chat_id = update.effective_chat.id if update.effective_chat else None
+        other = max(elapsed - timings.telegram - timings.save - timings.lock, 0.0)
+        lines = [
+            f"{datetime.now().isoformat(timespec='seconds')} chat={chat_id} handler={name} "
+            f"{'sampled' if profile is not None else 'slow'} total={elapsed * 1000:.1f}ms "
+            f"telegram={timings.telegram * 1000:.1f}ms ({timings.telegram_calls} calls) "
+            f"save_game_state={timings.save * 1000:.1f}ms ({timings.saves} calls) "
+            f"lock_wait={timings.lock * 1000:.1f}ms cpu_and_loop={other * 1000:.1f}ms"
+        ]
+        lines += samples
+        if profile is not None:
+            out = io.StringIO()
+            pstats.Stats(profile, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+            lines += ["  " + line for line in out.getvalue().strip().splitlines()]
+        return "\n".join(lines) + "\n\n"
+
+profiler = UpdateProfiler()
+
+def profiled(handler):
+    """Run a handler through the profiler while profiling is switched on"""
+    name = handler.__name__
+
+    @wraps(handler)
+    async def wrapper(update, context):
+        if not profiler.enabled:
+            return await handler(update, context)
+        return await profiler.run(name, handler, update, context)
+    return wrapper
+
+class QuestionRanges:
+    """Question numbers 1..total still available, kept as sorted disjoint runs"""
+    __slots__ = ("total", "starts", "ends", "count")
+
+    def __init__(self, total=0, starts=(), ends=()):
+        self.total = total
+        self.starts = list(starts)
+        self.ends = list(ends)
+        self.count = sum(end - start + 1 for start, end in zip(self.starts, self.ends))
+
+    @classmethod
+    def full(cls, total):
+        return cls(total, [1], [total]) if total else cls()
+
+    @classmethod
+    def from_answered(cls, total, answered):
+        """Build from the set of answered numbers stored by older versions"""
+        ranges = cls.full(total)
+        for number in answered:
+            if str(number).isdigit():
+                ranges.remove(int(number))
+        return ranges
+
+    def __len__(self):
+        return self.count
+
+    def run_index(self, number):
+        i = bisect_right(self.starts, number) - 1
+        return i if i >= 0 and number <= self.ends[i] else -1
+
+    def __contains__(self, number):
+        return self.run_index(number) >= 0
+
+    def first(self):
+        return self.starts[0] if self.starts else None
+
+    def remove(self, number):
+        """Take a number out of the set; False if it was not available"""
+        i = self.run_index(number)
+        if i < 0:
+            return False
+        start, end = self.starts[i], self.ends[i]
+        if start == end:
+            del self.starts[i], self.ends[i]
+        elif number == start:
+            self.starts[i] = number + 1
+        elif number == end:
+            self.ends[i] = number - 1
+        else:
+            self.ends[i] = number - 1
+            self.starts.insert(i + 1, number + 1)
+            self.ends.insert(i + 1, end)
+        self.count -= 1
+        return True
+
+    def render(self, max_chars=PICKER_MAX_CHARS):
+        """'1-40, 43, 47-120', cut short with a remainder count past max_chars"""
+        parts = []
+        size = shown = 0
+        for start, end in zip(self.starts, self.ends):
+            part = str(start) if start == end else f"{start}-{end}"
+            size += len(part) + 2
+            if size > max_chars:
+                parts.append(f"… ({self.count - shown} more)")
+                break
+            parts.append(part)
+            shown += end - start + 1
+        return ", ".join(parts)
+
+    def to_tuple(self):
+        return (self.total, pack_ids(self.starts), pack_ids(self.ends))
+
+    @classmethod
+    def from_tuple(cls, data):
+        total, starts, ends = data
+        return cls(total, unpack_ids(starts), unpack_ids(ends))
+
+@dataclass(slots=True)
+class TiebreakerState:
+    """Per-chat tiebreaker progress"""
+    in_progress: bool = False
+    tied_players: list = field(default_factory=list)
+    current_phase: str | None = None
+    speed_round_question: int | None = None  # Question.id
+    waiting_for_speed_answer: bool = False
+    first_responder: int | None = None
+    speed_timer: TimerHandle | None = None  # saved as its deadline
+    locked_out: set = field(default_factory=set)  # pressed a wrong answer button; never persisted
+
+    def to_tuple(self):
+        return (self.in_progress, pack_ids(self.tied_players), self.current_phase,
+                self.speed_round_question, self.waiting_for_speed_answer, self.first_responder,
+                timer_tuple(self.speed_timer))
+
+    @classmethod
+    def from_tuple(cls, data):
+        # Timers are saved since version 6
+        in_progress, tied_players, current_phase, question, waiting, first_responder, *timer = data
+        return cls(in_progress, unpack_ids(tied_players), current_phase, question, waiting, first_responder,
+                   dormant_timer(timer[0] if timer else None))
+
+@dataclass(slots=True)
+class OpenRound:
+    """Open-round mode: the question the whole lobby is answering"""
+    question_id: int | None = None  # Question.id; None between questions
+    answered: set = field(default_factory=set)  # players whose first answer is in
+    correct: list = field(default_factory=list)  # (user_id, points), fastest first
+    timer: TimerHandle | None = None  # saved as its deadline
+
+    def to_tuple(self):
+        return (self.question_id, pack_ids(self.answered),
+                pack_ids(uid for uid, _ in self.correct), pack_ids(points for _, points in self.correct),
+                timer_tuple(self.timer))
+
+    @classmethod
+    def from_tuple(cls, data):
+        question_id, answered, correct_ids, points, timer = data
+        return cls(question_id, set(unpack_ids(answered)),
+                   list(zip(unpack_ids(correct_ids), unpack_ids(points))), dormant_timer(timer))
+
+@dataclass(slots=True)
+class ReviewState:
+    """A paragraph answer waiting for /approve or /reject"""
+    awaiting_admin_review: bool = False
+    responding_user_id: int | None = None
+    paragraph_answer: str | None = None
+
+    def to_tuple(self):
+        return (self.awaiting_admin_review, self.responding_user_id, self.paragraph_answer)
+
+    @classmethod
+    def from_tuple(cls, data):
+        return cls(*data)
+
+@dataclass(slots=True)
+class QueuedReview:
+    """A paragraph answer in the review queue"""
+    user_id: int
+    question_id: int | None  # Question.id
+    answer: str
+
+    def to_tuple(self):
+        return (self.user_id, self.question_id, self.answer)
+
+    @classmethod
+    def from_tuple(cls, data):
+        return cls(*data)
+
+@dataclass(slots=True)
+class PlayerSession:
+    """Per-player data for the question they are currently answering"""
+    waiting_for_paragraph: bool = False
+    current_question: int | None = None  # Question.id
+    paragraph_timer: TimerHandle | None = None  # saved as its deadline
+
+    def to_tuple(self):
+        return (self.waiting_for_paragraph, self.current_question, timer_tuple(self.paragraph_timer))
+
+    @classmethod
+    def from_tuple(cls, data):
+        waiting, question, *timer = data  # timers are saved since version 6
+        return cls(waiting, question, dormant_timer(timer[0] if timer else None))
+
+@dataclass(slots=True)
+class GameState:
+    """Everything the bot tracks for one chat"""
+    active_players: list = field(default_factory=list)
+    player_scores: dict = field(default_factory=dict)
+    available_questions: QuestionRanges = field(default_factory=QuestionRanges)
+    current_turn_index: int = 0
+    in_progress: bool = False
+    waiting_for_mcq_answer: bool = False
+    game_started: bool = False  # Track if /start has been called
+    current_question_player: int | None = None  # Track which player should answer current question
+    tiebreaker_state: TiebreakerState = field(default_factory=TiebreakerState)
+    used_tiebreaker_mcq: int = 0  # bitset of Question.ids already asked as speed rounds
+    speed_round_deck: list | None = None  # shuffled unused speed-round ids; never persisted
+    review_state: ReviewState = field(default_factory=ReviewState)
+    review_queue: dict = field(default_factory=dict)  # review id -> QueuedReview, oldest first
+    next_review_id: int = 1
+    user_data: dict = field(default_factory=dict)  # user_id -> PlayerSession
+    bank_name: str | None = None  # picked with /bank; None = the default bank
+    game_bank_name: str | None = None  # bank the running game began with; bank_name may have changed since
+    bank: QuestionBank | None = None  # snapshot taken by /begin; never persisted
+    mcq_timer: TimerHandle | None = None  # saved as its deadline
+    open_round: OpenRound | None = None  # set for games begun with "/begin open"
+    # Bumped on every change to player_scores; rendered_scores holds
+    # kind -> (score_version, lines) so unchanged boards aren't rebuilt
+    score_version: int = 0
+    rendered_scores: dict = field(default_factory=dict)
+
+    def to_bytes(self):
+        """Encode as STATE_MAGIC + version byte + flags byte + marshalled field tuple"""
+        body = (
+            pack_ids(self.active_players),
+            pack_ids(self.player_scores.keys()),
+            pack_ids(self.player_scores.values()),
+            self.available_questions.to_tuple(),
+            self.current_turn_index,
+            self.in_progress,
+            self.waiting_for_mcq_answer,
+            self.game_started,
+            self.current_question_player,
+            self.tiebreaker_state.to_tuple(),
+            self.review_state.to_tuple(),
+            {uid: session.to_tuple() for uid, session in self.user_data.items()},
+            self.used_tiebreaker_mcq,
+            self.bank_name,
+            timer_tuple(self.mcq_timer),
+            {review_id: review.to_tuple() for review_id, review in self.review_queue.items()},
+            self.next_review_id,
+            self.open_round.to_tuple() if self.open_round else None,
+            self.game_bank_name,
+        )
+        flags = STATE_HAS_TIMERS if self.has_pending_timer() else 0
+        return STATE_MAGIC + bytes([STATE_FORMAT_VERSION, flags]) + marshal.dumps(body, 4)
+
+    def has_pending_timer(self):
+        handles = [self.mcq_timer, self.tiebreaker_state.speed_timer, self.open_round and self.open_round.timer]
+        handles += [session.paragraph_timer for session in self.user_data.values()]
+        return any(timer_tuple(handle) is not None for handle in handles)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:len(STATE_MAGIC)] != STATE_MAGIC:
+            raise ValueError("Not an encoded game state")
+        version = data[len(STATE_MAGIC)]
+        if not 1 <= version <= STATE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported game state version {version}")
+        # Versions before 6 had no flags byte
+        fields = marshal.loads(data[len(STATE_MAGIC) + (2 if version >= 6 else 1):])
+        if version < 3:
+            fields += (0,)  # used speed-round questions were not saved before version 3
+        if version < 5:
+            fields += (None,)  # nor was the chat's question bank before version 5
+        if version < 6:
+            fields += (None,)  # nor the question timer before version 6
+        if version < 7:
+            fields += ({}, 1)  # nor the review queue before version 7
+        if version < 8:
+            fields += (None,)  # nor open rounds before version 8
+        if version < 9:
+            fields += (fields[13],)  # nor the running game's bank, which was assumed to be the current pick
+        (players, score_ids, scores, available, turn_index, in_progress, waiting_for_mcq,
+         game_started, question_player, tiebreaker, review, user_data, used_tiebreaker_mcq,
+         bank_name, mcq_timer, review_queue, next_review_id, open_round, game_bank_name) = fields
+        if version == 1:
+            # Version 1 stored question dicts and answer strings instead of ids
+            tiebreaker = tiebreaker[:3] + (legacy_question_id(tiebreaker[3]),) + tiebreaker[4:]
+            user_data = {
+                uid: (waiting, legacy_session_question_id(answer, options_map))
+                for uid, (waiting, answer, options_map) in user_data.items()
+            }
+        return cls(
+            active_players=unpack_ids(players),
+            player_scores=dict(zip(unpack_ids(score_ids), unpack_ids(scores))),
+            available_questions=(
+                QuestionRanges.from_tuple(available) if version >= 4
+                else QuestionRanges.from_answered(len(current_bank().pool), available)
+            ),
+            current_turn_index=turn_index,
+            in_progress=in_progress,
+            waiting_for_mcq_answer=waiting_for_mcq,
+            game_started=game_started,
+            current_question_player=question_player,
+            tiebreaker_state=TiebreakerState.from_tuple(tiebreaker),
+            used_tiebreaker_mcq=used_tiebreaker_mcq,
+            review_state=ReviewState.from_tuple(review),
+            review_queue={review_id: QueuedReview.from_tuple(queued) for review_id, queued in review_queue.items()},
+            next_review_id=next_review_id,
+            user_data={uid: PlayerSession.from_tuple(session) for uid, session in user_data.items()},
+            bank_name=bank_name,
+            game_bank_name=game_bank_name,
+            mcq_timer=dormant_timer(mcq_timer),
+            open_round=OpenRound.from_tuple(open_round) if open_round else None,
+        )
+
+    @classmethod
+    def from_dict(cls, state):
+        """Upgrade a dict-based state written by older versions of the bot"""
+        tiebreaker = state.get("tiebreaker_state", {})
+        review = state.get("review_state", {})
+        return cls(
+            active_players=state.get("active_players", []),
+            player_scores=state.get("player_scores", {}),
+            available_questions=QuestionRanges.from_answered(
+                len(current_bank().pool), state.get("answered_questions", [])
+            ),
+            current_turn_index=state.get("current_turn_index", 0),
+            in_progress=state.get("in_progress", False),
+            waiting_for_mcq_answer=state.get("waiting_for_mcq_answer", False),
+            game_started=state.get("game_started", False),
+            current_question_player=state.get("current_question_player", None),
+            tiebreaker_state=TiebreakerState(
+                in_progress=tiebreaker.get("in_progress", False),
+                tied_players=tiebreaker.get("tied_players", []),
+                current_phase=tiebreaker.get("current_phase", None),
+                speed_round_question=legacy_question_id(tiebreaker.get("speed_round_question", None)),
+                waiting_for_speed_answer=tiebreaker.get("waiting_for_speed_answer", False),
+                first_responder=tiebreaker.get("first_responder", None),
+            ),
+            review_state=ReviewState(
+                awaiting_admin_review=review.get("awaiting_admin_review", False),
+                responding_user_id=review.get("responding_user_id", None),
+                paragraph_answer=review.get("paragraph_answer", None),
+            ),
+            user_data={
+                uid: PlayerSession(
+                    waiting_for_paragraph=data.get("waiting_for_paragraph", False),
+                    current_question=legacy_session_question_id(
+                        data.get("current_answer", ""), data.get("options_map", {})
+                    ),
+                )
+                for uid, data in state.get("user_data", {}).items()
+            },
+        )
 
 def is_admin(user_id):
     """Check if user is an admin"""
@@ -29,136 +1252,926 @@ def is_admin(user_id):
 
 def get_game_state(chat_id):
     """Get or create game state for a specific chat"""
+    chat_last_used[chat_id] = time.monotonic()
+    chat_last_used.move_to_end(chat_id)
+    if chat_id in game_states:
+        return game_states[chat_id]
+
+    if chat_id in cold_states:
+        try:
+            game_states[chat_id] = decode_state(cold_states.pop(chat_id))
+        except Exception as e:
+            print(f"Error loading game state for chat {chat_id}: {e}")
+    elif STATE_BACKEND == "sqlite":
+        # Hydrate lazily - only chats that are actually touched get loaded
+        state = load_chat_from_db(chat_id)
+        if state is not None:
+            game_states[chat_id] = state
+    elif chat_id in journal_index:
+        state = load_chat_from_journal(chat_id)
+        if state is not None:
+            game_states[chat_id] = state
+    if len(game_states) >= MAX_RESIDENT_CHATS:
+        evict_idle_chats()
     if chat_id not in game_states:
-        game_states[chat_id] = {
-            "active_players": [],
-            "player_scores": {},
-            "answered_questions": set(),
-            "current_turn_index": 0,
-            "in_progress": False,
-            "waiting_for_mcq_answer": False,
-            "mcq_timer_task": None,
-            "game_started": False,  # NEW: Track if /start has been called
-            "current_question_player": None,  # NEW: Track which player should answer current question
-            "tiebreaker_state": {
-                "in_progress": False,
-                "tied_players": [],
-                "current_phase": None,
-                "speed_round_question": None,
-                "waiting_for_speed_answer": False,
-                "first_responder": None,
-                "speed_timer_task": None
-            },
-            "used_tiebreaker_mcq": set(),   # track already-asked speed-round questions
-            "review_state": {
-                "awaiting_admin_review": False,
-                "responding_user_id": None,
-                "paragraph_answer": None
-            },
-            "user_data": {}  # user_id -> user_specific_data
-        }
+        game_states[chat_id] = GameState()
     return game_states[chat_id]
 
+def has_saved_state(chat_id):
+    """Whether get_game_state() would find anything for a chat besides a fresh GameState"""
+    # Running games are never evicted and the sqlite backend loads them all at
+    # startup, so a sqlite chat that isn't in memory has no game to answer
+    return chat_id in game_states or chat_id in cold_states or chat_id in journal_index
+
+def chat_lock(chat_id):
+    """The lock that serialises everything that touches one chat's state"""
+    lock = chat_locks.get(chat_id)
+    if lock is None:
+        lock = chat_locks[chat_id] = asyncio.Lock()
+    return lock
+
+# (chat_id, task, seconds waited) once ChatUpdateProcessor holds a chat's lock for an update
+held_chat_lock = contextvars.ContextVar("held_chat_lock", default=None)
+
+def per_chat(handler):
+    """Run an update handler under its chat's lock, unless ChatUpdateProcessor already holds it"""
+    # Handlers and timer expiries hold the lock across all their awaits;
+    # asyncio.Lock is FIFO, so a chat's updates run in arrival order
+    @wraps(handler)
+    async def wrapper(update, context):
+        if update.effective_chat is None:
+            return await handler(update, context)
+        chat_id = update.effective_chat.id
+        timings = current_timings.get()
+        held = held_chat_lock.get()
+        if held is not None and held[0] == chat_id and held[1] is asyncio.current_task():
+            if timings is not None:
+                timings.lock += held[2]
+            return await handler(update, context)
+        waiting = time.perf_counter()
+        async with chat_lock(chat_id):
+            if timings is not None:
+                timings.lock += time.perf_counter() - waiting
+            return await handler(update, context)
+    return wrapper
+
+def is_chatter(update):
+    """A plain text message that handle_message would ignore whatever it waited for"""
+    message = update.message
+    if message is None or message.text is None or message.text.startswith("/") or update.effective_user is None:
+        return False
+    chat_id = update.effective_chat.id
+    state = game_states.get(chat_id)
+    if state is None:
+        return not has_saved_state(chat_id)
+    user_id = update.effective_user.id
+    # Only players (and tied players) ever get an answer or a pick in
+    return user_id not in state.player_scores and user_id not in state.tiebreaker_state.tied_players
+
+class ChatUpdateProcessor(BaseUpdateProcessor):
+    """Runs at most `running` updates at once, each only once it holds its chat's lock"""
+
+    def __init__(self, running, waiting):
+        # PTB's own semaphore only bounds how many updates may wait on chat
+        # locks; the slots that count are taken after the lock, so updates
+        # queued behind a busy chat never hold up other groups
+        super().__init__(waiting)
+        self.running = asyncio.BoundedSemaphore(running)
+
+    async def do_process_update(self, update, coroutine):
+        chat = update.effective_chat if isinstance(update, Update) else None
+        if chat is None:
+            async with self.running:
+                await coroutine
+            return
+        waiting = time.perf_counter()
+        async with chat_lock(chat.id):
+            # Decided under the lock: an update ahead of this one may have made its sender a player
+            if is_chatter(update):
+                coroutine.close()
+                return
+            async with self.running:
+                token = held_chat_lock.set((chat.id, asyncio.current_task(), time.perf_counter() - waiting))
+                try:
+                    await coroutine
+                finally:
+                    held_chat_lock.reset(token)
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+def is_chat_evictable(chat_id, state):
+    """A chat can leave memory when no game, timer, handler or unsaved change needs it"""
+    lock = chat_locks.get(chat_id)
+    return not (
+        state.in_progress
+        or state.tiebreaker_state.in_progress
+        or state.review_state.awaiting_admin_review
+        or state.review_queue
+        or chat_id in dirty_chats
+        or chat_id in chats_being_written
+        or (lock is not None and lock.locked())
+    )
+
+def evict_idle_chats():
+    """Move idle chats to persistent storage; returns how many were evicted"""
+    now = time.monotonic()
+    over_cap = len(game_states) - MAX_RESIDENT_CHATS + 1
+    evicted = 0
+    for chat_id, last_used in list(chat_last_used.items()):
+        idle_for = now - last_used
+        if idle_for < MIN_RESIDENT_SECONDS or (idle_for < IDLE_CHAT_TTL and evicted >= over_cap):
+            # chat_last_used is oldest-first, so nothing later qualifies either
+            break
+        state = game_states.get(chat_id)
+        if state is None:
+            del chat_last_used[chat_id]
+            continue
+        if not is_chat_evictable(chat_id, state):
+            continue
+        if STATE_BACKEND == "pickle":
+            # Every snapshot rewrites all chats, so keep a compact copy
+            cold_states[chat_id] = encode_state(state)
+        del game_states[chat_id]
+        del chat_last_used[chat_id]
+        evicted += 1
+    return evicted
+
+async def chat_evictor():
+    """Periodically evict idle chats"""
+    while True:
+        await asyncio.sleep(min(IDLE_CHAT_TTL, 60))
+        evicted = evict_idle_chats()
+        if evicted:
+            print(f"Evicted {evicted} idle groups ({len(game_states)} still in memory)")
+
 def get_user_data(chat_id, user_id):
     """Get or create user data for a specific user in a specific chat"""
     game_state = get_game_state(chat_id)
-    if user_id not in game_state["user_data"]:
-        game_state["user_data"][user_id] = {}
-    return game_state["user_data"][user_id]
-
-def save_game_state():
-    """Save current game states to file"""
-    # Convert sets to lists for JSON serialization
-    serializable_states = {}
-    for chat_id, state in game_states.items():
-        serializable_states[str(chat_id)] = {
-            "active_players": state["active_players"],
-            "player_scores": state["player_scores"],
-            "answered_questions": list(state["answered_questions"]),
-            "current_turn_index": state["current_turn_index"],
-            "in_progress": state["in_progress"],
-            "waiting_for_mcq_answer": state["waiting_for_mcq_answer"],
-            "game_started": state["game_started"],
-            "current_question_player": state["current_question_player"],
-            "tiebreaker_state": {
-                "in_progress": state["tiebreaker_state"]["in_progress"],
-                "tied_players": state["tiebreaker_state"]["tied_players"],
-                "current_phase": state["tiebreaker_state"]["current_phase"],
-                "speed_round_question": state["tiebreaker_state"]["speed_round_question"],
-                "waiting_for_speed_answer": state["tiebreaker_state"]["waiting_for_speed_answer"],
-                "first_responder": state["tiebreaker_state"]["first_responder"]
-            },
-            "review_state": state["review_state"].copy(),
-            "user_data": state["user_data"],
-            "timestamp": datetime.now().isoformat()
-        }
-    
+    if user_id not in game_state.user_data:
+        game_state.user_data[user_id] = PlayerSession()
+    return game_state.user_data[user_id]
+
+@dataclass(slots=True, frozen=True)
+class CachedUser:
+    """The bits of a Telegram user/chat the bot displays"""
+    id: int
+    first_name: str
+    username: str | None = None
+
+class NameCache:
+    """Bounded LRU cache of display names with a TTL and single-flight lookups"""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()  # user_id -> (expires_at, CachedUser)
+        self.in_flight = {}  # user_id -> Task fetching it
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0  # misses that joined a lookup already in flight
+
+    def remember(self, user):
+        """Cache a telegram User/Chat we got for free from an update"""
+        if user is None:
+            return
+        self.store(CachedUser(user.id, user.first_name or "", getattr(user, "username", None)))
+
+    def store(self, cached):
+        self.entries[cached.id] = (time.monotonic() + self.ttl, cached)
+        self.entries.move_to_end(cached.id)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def peek(self, user_id):
+        entry = self.entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, cached = entry
+        if expires_at < time.monotonic():
+            del self.entries[user_id]
+            return None
+        self.entries.move_to_end(user_id)
+        return cached
+
+    async def fetch(self, bot, user_id):
+        try:
+            chat = await bot.get_chat(user_id)
+            cached = CachedUser(chat.id, chat.first_name or "", getattr(chat, "username", None))
+            self.store(cached)
+            return cached
+        finally:
+            self.in_flight.pop(user_id, None)
+
+    async def get(self, bot, user_id):
+        """Return the cached user, calling get_chat at most once per miss"""
+        cached = self.peek(user_id)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        task = self.in_flight.get(user_id)
+        if task is None:
+            task = asyncio.ensure_future(self.fetch(bot, user_id))
+            self.in_flight[user_id] = task
+        else:
+            self.coalesced += 1
+        # shield() so one cancelled waiter doesn't abort the lookup for the rest
+        return await asyncio.shield(task)
+
+name_cache = NameCache(NAME_CACHE_SIZE, NAME_CACHE_TTL)
+
+async def get_user(bot, user_id):
+    """Look up a user's display name, from the cache when possible"""
+    return await name_cache.get(bot, user_id)
+
+async def get_users(bot, user_ids):
+    """Look up many users concurrently; failed lookups come back as None"""
+    semaphore = asyncio.Semaphore(NAME_LOOKUP_CONCURRENCY)
+
+    async def lookup(user_id):
+        async with semaphore:
+            try:
+                return await get_user(bot, user_id)
+            except Exception:
+                return None
+
+    return await asyncio.gather(*(lookup(uid) for uid in user_ids))
+
+async def display_names(bot, user_ids):
+    """First names for user_ids, falling back to "User <id>" """
+    users = await get_users(bot, user_ids)
+    return [user.first_name if user else f"User {uid}" for uid, user in zip(user_ids, users)]
+
+def add_score(game_state, user_id, points=1):
+    game_state.player_scores[user_id] += points
+    game_state.score_version += 1
+
+SCORE_LINE_FORMATS = {
+    "leaderboard": "{rank}. {name} — {score} point(s)",
+    "status": "• {name}: {score}",
+}
+
+async def render_score_lines(bot, game_state, kind):
+    """Scores high to low as text lines, with answers still under review; reused until the scores change"""
+    version = game_state.score_version
+    cached = game_state.rendered_scores.get(kind)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    ranking = sorted(game_state.player_scores.items(), key=lambda x: x[1], reverse=True)
+    names = await display_names(bot, [uid for uid, _ in ranking])
+    line_format = SCORE_LINE_FORMATS[kind]
+    queued = Counter(review.user_id for review in game_state.review_queue.values())
+    lines = [
+        line_format.format(rank=i + 1, name=name, score=score)
+        + (f" (+{queued[uid]} awaiting review)" if queued[uid] else "")
+        for i, ((uid, score), name) in enumerate(zip(ranking, names))
+    ]
+    # Keyed by the version we started from, so scores changing while the
+    # names were being fetched just means the next call re-renders
+    game_state.rendered_scores[kind] = (version, lines)
+    return lines
+
+def encode_state(state):
+    """Encode one chat's GameState for storage"""
+    return state.to_bytes()
+
+def decode_state(data):
+    """Inverse of encode_state(); also upgrades pickled dicts from older versions"""
+    if isinstance(data, bytes) and data.startswith(STATE_MAGIC):
+        return GameState.from_bytes(data)
+    if isinstance(data, bytes):
+        data = pickle.loads(data)
+    return GameState.from_dict(data)
+
+def payload_has_timers(payload):
+    """Check an encoded state's flags without decoding it"""
+    header = len(STATE_MAGIC)
+    return (isinstance(payload, bytes) and payload.startswith(STATE_MAGIC)
+            and payload[header] >= 6 and bool(payload[header + 1] & STATE_HAS_TIMERS))
+
+def db_row(chat_id, state):
+    """Build a game_states table row for a GameState"""
+    # in_progress covers tiebreakers too: these rows are hydrated at startup
+    in_progress = state.in_progress or state.tiebreaker_state.in_progress
+    return (int(chat_id), state.to_bytes(), int(in_progress),
+            len(state.active_players), datetime.now().isoformat())
+
+def sync_file(f, fsync):
+    f.flush()
+    if fsync:
+        os.fsync(f.fileno())
+
+# The writers below only ever see bytes, so they are safe to run in an
+# executor while handlers keep mutating game_states on the event loop
+
+def write_snapshot_file(snapshot, fsync=True):
+    """Atomically replace STATE_FILE"""
+    # Write to a temp file first so a crash never leaves a half-written snapshot
+    tmp_file = STATE_FILE + ".tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(snapshot)
+        sync_file(f, fsync)
+    os.replace(tmp_file, STATE_FILE)
+    return len(snapshot)
+
+def compact_journal_file(records, fsync=True):
+    """Atomically rewrite the journal as records (chat_id, state) plus every other chat's newest record"""
+    # One file holds every chat, so there is no moment at which a crash
+    # could pair a new snapshot with an older journal
+    tmp_file = STATE_JOURNAL_FILE + ".tmp"
+    offsets = {}
+    with open(tmp_file, "wb") as f:
+        for chat_id, payload in records:
+            offsets[chat_id] = f.tell()
+            pickle.dump((str(chat_id), payload), f)
+        # Appends and compactions never overlap, so the index can't change under us
+        with journal_index_lock:
+            on_disk = sorted((offset, chat_id) for chat_id, offset in journal_index.items() if chat_id not in offsets)
+        if on_disk:
+            with open(STATE_JOURNAL_FILE, "rb") as old:
+                for offset, chat_id in on_disk:
+                    old.seek(offset)
+                    record = pickle.load(old)
+                    offsets[chat_id] = f.tell()
+                    pickle.dump(record, f)
+        sync_file(f, fsync)
+        written = f.tell()
+    with journal_index_lock:
+        os.replace(tmp_file, STATE_JOURNAL_FILE)
+        journal_index.clear()
+        journal_index.update(offsets)
+    if os.path.exists(STATE_FILE):
+        os.remove(STATE_FILE)  # a pickle-backend snapshot, folded in above
+    return written
+
+def append_journal_file(records, fsync=True):
+    """Append (chat_id, encoded state) records to the journal"""
+    offsets = {}
+    with open(STATE_JOURNAL_FILE, "ab") as f:
+        for chat_id, payload in records:
+            offsets[chat_id] = f.tell()
+            pickle.dump((str(chat_id), payload), f)
+        sync_file(f, fsync)
+    with journal_index_lock:
+        journal_index.update(offsets)
+    return sum(len(payload) for _, payload in records)
+
+def load_chat_from_journal(chat_id):
+    """Load an evicted chat's newest record from the journal, or None"""
+    try:
+        with journal_index_lock:
+            offset = journal_index.get(chat_id)
+            if offset is None:
+                return None
+            # An open file keeps reading the old journal if compaction replaces it
+            f = open(STATE_JOURNAL_FILE, "rb")
+        with f:
+            f.seek(offset)
+            return decode_state(pickle.load(f)[1])
+    except Exception as e:
+        print(f"Error loading game state for chat {chat_id}: {e}")
+    return None
+
+def write_rows_to_db(rows):
+    """Upsert game_states rows in a single transaction"""
+    with state_db_lock:
+        db = open_state_db()
+        with db:
+            db.executemany(
+                "INSERT OR REPLACE INTO game_states (chat_id, state, in_progress, players, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+    return sum(len(row[1]) for row in rows)
+
+def prepare_state_write(chat_ids=None, fsync=True):
+    """Encode state now (chat_ids=None: every resident chat) and return a blocking callable that writes it"""
+    # Encoding has to happen on the event loop thread, as the states are live objects
+    global journal_records
+    if STATE_BACKEND == "sqlite":
+        ids = list(game_states) if chat_ids is None else chat_ids
+        rows = [db_row(cid, game_states[cid]) for cid in ids if cid in game_states]
+        return lambda: write_rows_to_db(rows)
+
+    if STATE_BACKEND == "journal":
+        if chat_ids is not None:
+            records = [(cid, encode_state(game_states[cid])) for cid in chat_ids if cid in game_states]
+            journal_records += len(records)
+            if journal_records < JOURNAL_COMPACT_EVERY:
+                return lambda: append_journal_file(records, fsync)
+        # Compaction, or an explicit full save; evicted chats are copied from disk
+        journal_records = 0
+        records = [(cid, encode_state(state)) for cid, state in game_states.items()]
+        return lambda: compact_journal_file(records, fsync)
+
+    states = {str(cid): payload for cid, payload in cold_states.items()}
+    states.update((str(cid), encode_state(state)) for cid, state in game_states.items())
+    snapshot = pickle.dumps(states)
+    return lambda: write_snapshot_file(snapshot, fsync)
+
+def scan_journal():
+    """Index the journal without keeping its records: (newest offsets, running timers' payloads, records read)"""
+    offsets, timers, records = {}, {}, 0
+    if not os.path.exists(STATE_JOURNAL_FILE):
+        return offsets, timers, records
+    with open(STATE_JOURNAL_FILE, "rb") as f:
+        while True:
+            offset = f.tell()
+            try:
+                chat_id_str, payload = pickle.load(f)
+            except EOFError:
+                break
+            except Exception as e:
+                # A crash mid-append leaves a torn last record - keep what we have,
+                # and count it so startup compacts it away before appending more
+                print(f"Stopping journal replay at damaged record: {e}")
+                records += 1
+                break
+            chat_id = int(chat_id_str)
+            offsets[chat_id] = offset
+            if payload_has_timers(payload):
+                timers[chat_id] = payload
+            else:
+                timers.pop(chat_id, None)
+            records += 1
+    return offsets, timers, records
+
+def read_journal_states():
+    """read_game_states() for the journal backend: index the journal, compacting it if needed"""
+    offsets, timers, records = scan_journal()
+    journal_index.update(offsets)
+    snapshot = {}
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE, "rb") as f:
+            snapshot = {int(cid): payload for cid, payload in pickle.load(f).items() if int(cid) not in offsets}
+    if snapshot or records > len(offsets):
+        # Fold in a pickle-backend snapshot and drop superseded or torn records
+        compact_journal_file(list(snapshot.items()))
+        timers.update((cid, payload) for cid, payload in snapshot.items() if payload_has_timers(payload))
+    if journal_index:
+        print(f"Game states loaded for {len(journal_index)} groups")
+    return list(timers.items())
+
+def open_state_db():
+    """Open (and create if needed) the per-chat SQLite state store"""
+    global state_db
+    with state_db_lock:
+        if state_db is None:
+            is_new = not os.path.exists(STATE_DB_FILE)
+            # Writes come from the flusher's executor thread, reads from the loop
+            state_db = sqlite3.connect(STATE_DB_FILE, check_same_thread=False)
+            state_db.execute("PRAGMA journal_mode=WAL")
+            state_db.execute("PRAGMA synchronous=NORMAL")
+            state_db.execute(
+                "CREATE TABLE IF NOT EXISTS game_states ("
+                "chat_id INTEGER PRIMARY KEY, "
+                "state BLOB NOT NULL, "
+                "in_progress INTEGER NOT NULL DEFAULT 0, "
+                "players INTEGER NOT NULL DEFAULT 0, "
+                "updated_at TEXT NOT NULL)"
+            )
+            state_db.commit()
+            if is_new and os.path.exists(STATE_FILE):
+                # One-off migration from the old pickle file
+                with open(STATE_FILE, "rb") as f:
+                    serializable_states = pickle.load(f)
+                write_rows_to_db([db_row(cid, decode_state(state)) for cid, state in serializable_states.items()])
+                print(f"Migrated {len(serializable_states)} groups from {STATE_FILE} to {STATE_DB_FILE}")
+        return state_db
+
+def load_chat_from_db(chat_id):
+    """Load one chat's state from SQLite, or None if it was never saved"""
     try:
-        with open(STATE_FILE, "wb") as f:
-            pickle.dump(serializable_states, f)
+        with state_db_lock:
+            row = open_state_db().execute(
+                "SELECT state FROM game_states WHERE chat_id = ?", (chat_id,)
+            ).fetchone()
+        if row:
+            return decode_state(row[0])
+    except Exception as e:
+        print(f"Error loading game state for chat {chat_id}: {e}")
+    return None
+
+def save_game_state(chat_id=None):
+    """Save game state - only the given chat in journal and sqlite modes"""
+    timings = current_timings.get()
+    if timings is not None:
+        timings.saves += 1
+    if state_flusher_task is not None:
+        # Write-behind: just remember what changed, the flusher does the I/O
+        if chat_id is None:
+            dirty_chats.update(game_states)
+        else:
+            dirty_chats.add(chat_id)
+        return
+
+    try:
+        started = time.perf_counter()
+        written = prepare_state_write(None if chat_id is None else [chat_id])()
+        elapsed = time.perf_counter() - started
+        if metrics is not None:
+            metrics.save_seconds.observe(elapsed)
+            metrics.save_bytes += written
+        if timings is not None:
+            timings.save += elapsed
     except Exception as e:
         print(f"Error saving game state: {e}")
 
-def load_game_state():
-    """Load game states from file"""
-    global game_states
-    
+async def flush_game_state(fsync=True):
+    """Write every dirty chat now, doing the file I/O in an executor"""
+    async with flush_lock:
+        if not dirty_chats:
+            return
+        chat_ids = list(dirty_chats)
+        dirty_chats.clear()
+        # Until the write lands, disk may hold an older state than memory
+        chats_being_written.update(chat_ids)
+        try:
+            started = time.perf_counter()
+            writer = prepare_state_write(chat_ids, fsync)
+            written = await asyncio.get_running_loop().run_in_executor(None, writer)
+            if metrics is not None:
+                metrics.save_seconds.observe(time.perf_counter() - started)
+                metrics.save_bytes += written
+        except Exception as e:
+            print(f"Error saving game state: {e}")
+            dirty_chats.update(chat_ids)  # retry on the next flush
+        finally:
+            chats_being_written.difference_update(chat_ids)
+
+async def state_flusher():
+    """Coalesce bursts of save_game_state() calls into one write per interval"""
+    last_fsync = time.monotonic()
+    while True:
+        await asyncio.sleep(STATE_FLUSH_INTERVAL)
+        if not dirty_chats:
+            continue
+        fsync = time.monotonic() - last_fsync >= STATE_FSYNC_INTERVAL
+        await flush_game_state(fsync)
+        if fsync:
+            last_fsync = time.monotonic()
+
+def start_state_flusher():
+    """Switch save_game_state() to write-behind mode (needs a running loop)"""
+    global state_flusher_task
+    if STATE_FLUSH_INTERVAL > 0 and state_flusher_task is None:
+        state_flusher_task = asyncio.create_task(state_flusher())
+
+async def stop_state_flusher():
+    """Stop the flusher and force out anything still dirty"""
+    global state_flusher_task
+    if state_flusher_task is not None:
+        state_flusher_task.cancel()
+        try:
+            await state_flusher_task
+        except asyncio.CancelledError:
+            pass
+        state_flusher_task = None
+    await flush_game_state(fsync=True)
+
+def read_game_states():
+    """Read saved chats without decoding them (blocking); returns only those hydrate_game_states() needs now"""
+    # That is chats with a question timer running (sqlite: every running
+    # game); the rest are decoded by get_game_state() when first touched
+    if STATE_BACKEND == "sqlite":
+        try:
+            with state_db_lock:
+                return open_state_db().execute(
+                    "SELECT chat_id, state FROM game_states WHERE in_progress = 1"
+                ).fetchall()
+        except Exception as e:
+            print(f"Error opening state database: {e}")
+            return []
+
     try:
+        if STATE_BACKEND == "journal":
+            return read_journal_states()
+
+        serializable_states = {}
         if os.path.exists(STATE_FILE):
             with open(STATE_FILE, "rb") as f:
                 serializable_states = pickle.load(f)
-            
-            game_states = {}
-            for chat_id_str, state in serializable_states.items():
-                chat_id = int(chat_id_str)
-                game_states[chat_id] = {
-                    "active_players": state.get("active_players", []),
-                    "player_scores": state.get("player_scores", {}),
-                    "answered_questions": set(state.get("answered_questions", [])),
-                    "current_turn_index": state.get("current_turn_index", 0),
-                    "in_progress": state.get("in_progress", False),
-                    "waiting_for_mcq_answer": state.get("waiting_for_mcq_answer", False),
-                    "mcq_timer_task": None,  # Don't restore timer tasks
-                    "game_started": state.get("game_started", False),
-                    "current_question_player": state.get("current_question_player", None),
-                    "tiebreaker_state": {
-                        "in_progress": state.get("tiebreaker_state", {}).get("in_progress", False),
-                        "tied_players": state.get("tiebreaker_state", {}).get("tied_players", []),
-                        "current_phase": state.get("tiebreaker_state", {}).get("current_phase", None),
-                        "speed_round_question": state.get("tiebreaker_state", {}).get("speed_round_question", None),
-                        "waiting_for_speed_answer": state.get("tiebreaker_state", {}).get("waiting_for_speed_answer", False),
-                        "first_responder": state.get("tiebreaker_state", {}).get("first_responder", None),
-                        "speed_timer_task": None  # Don't restore timer tasks
-                    },
-                    "review_state": state.get("review_state", {
-                        "awaiting_admin_review": False,
-                        "responding_user_id": None,
-                        "paragraph_answer": None
-                    }),
-                    "user_data": state.get("user_data", {})
-                }
-            
-            print(f"Game states loaded for {len(game_states)} groups")
-            return True
+
+        rows = []
+        for chat_id_str, payload in serializable_states.items():
+            if payload_has_timers(payload):
+                # resume_timers() needs these decoded at startup
+                rows.append((int(chat_id_str), payload))
+            else:
+                cold_states[int(chat_id_str)] = payload
+        if serializable_states:
+            print(f"Game states loaded for {len(serializable_states)} groups")
+        return rows
     except Exception as e:
         print(f"Error loading game state: {e}")
-    return False
+    return []
 
-# Load questions from JSON
-def load_questions():
-    with open(QUESTIONS_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def build_regular_question_pool():
-    """Build question pool excluding tiebreaker questions"""
-    regular_questions = [q for q in questions_data if not q.get("is_tiebreaker", False)]
-    return {str(i+1): q for i, q in enumerate(regular_questions)}
+def hydrate_game_states(rows):
+    """Decode the running games returned by read_game_states()"""
+    for chat_id, payload in rows:
+        try:
+            game_states[chat_id] = decode_state(payload)
+            chat_last_used[chat_id] = time.monotonic()
+        except Exception as e:
+            print(f"Error loading game state for chat {chat_id}: {e}")
+    if STATE_BACKEND == "sqlite":
+        print(f"Game states loaded for {len(rows)} active groups")
+
+def legacy_question_id(question):
+    """Id of a question stored as a dict by older versions of the bot"""
+    if not question:
+        return None
+    for q in current_bank().questions:
+        if q.text == question.get("question"):
+            return q.id
+    return None
+
+def legacy_session_question_id(answer, options_map):
+    """Id of the MCQ an older PlayerSession held as an answer string and options map"""
+    if not answer:
+        return None
+    answer_key = normalize_answer(answer)
+    options = {letter: normalize_answer(opt) for letter, opt in options_map.items() if letter.islower()}
+    for q in current_bank().questions:
+        if q.type == "mcq" and q.answer_key == answer_key and dict(q.options_map) == options:
+            return q.id
+    return None
 
-questions_data = load_questions()
-question_pool = build_regular_question_pool()
+# Load questions from JSON
+def load_questions(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [Question.compile(i, q) for i, q in enumerate(json.load(f))]
+
+def build_question_pools(questions):
+    """Split a bank into the numbered regular pool and the tiebreaker id pools"""
+    regular_questions = [q for q in questions if not q.is_tiebreaker]
+    speed = tuple(q.id for q in questions if q.is_tiebreaker and q.type == "mcq")
+    paragraph = tuple(q.id for q in questions if q.is_tiebreaker and q.type == "paragraph")
+    return {str(i+1): q for i, q in enumerate(regular_questions)}, speed, paragraph
+
+def write_bank_index(path):
+    """Scan a JSONL bank once and write its ".idx" sidecar (blocking)"""
+    # BANK_INDEX_MAGIC, then int64s: the question count and the three pool sizes, every line's offset
+    # plus the end offset, then each pool's ids
+    offsets, regular, speed, paragraph = array("q"), array("q"), array("q"), array("q")
+    offset = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                question_id = len(offsets)
+                data = json.loads(line)
+                offsets.append(offset)
+                if not data.get("is_tiebreaker", False):
+                    regular.append(question_id)
+                elif data["type"] == "mcq":
+                    speed.append(question_id)
+                elif data["type"] == "paragraph":
+                    paragraph.append(question_id)
+            offset += len(line)
+    offsets.append(offset)
+    tmp_path = path + ".idx.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(BANK_INDEX_MAGIC)
+        array("q", [len(offsets) - 1, len(regular), len(speed), len(paragraph)]).tofile(f)
+        for ids in (offsets, regular, speed, paragraph):
+            ids.tofile(f)
+    os.replace(tmp_path, path + ".idx")
+
+def convert_bank(json_path, jsonl_path):
+    """Rewrite a QUESTIONS_FILE-style JSON bank as JSONL and index it"""
+    with open(json_path, "r", encoding="utf-8") as f:
+        questions = json.load(f)
+    tmp_path = jsonl_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for q in questions:
+            f.write(json.dumps(q, ensure_ascii=False) + "\n")
+    # Replace rather than rewrite, so a reload never sees a half-written file
+    os.replace(tmp_path, jsonl_path)
+    write_bank_index(jsonl_path)
+    return len(questions)
+
+class PackedQuestions:
+    """The questions of a JSONL bank, decoded from its raw bytes when first used"""
+    __slots__ = ("data", "offsets", "cache")
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+        self.cache = {}
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, question_id):
+        if not 0 <= question_id < len(self):
+            raise IndexError(question_id)
+        question = self.cache.get(question_id)
+        if question is None:
+            if len(self.cache) >= PACKED_CACHE_SIZE:
+                self.cache.clear()
+            line = self.data[self.offsets[question_id]:self.offsets[question_id + 1]]
+            question = self.cache[question_id] = Question.compile(question_id, json.loads(line))
+        return question
+
+class PackedPool:
+    """The "number shown to players -> Question" mapping of a JSONL bank"""
+    __slots__ = ("questions", "ids")
+
+    def __init__(self, questions, ids):
+        self.questions = questions
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return (str(number) for number in range(1, len(self.ids) + 1))
+
+    def __contains__(self, number):
+        return number.isdecimal() and str(int(number)) == number and 0 < int(number) <= len(self.ids)
+
+    def __getitem__(self, number):
+        if number not in self:
+            raise KeyError(number)
+        return self.questions[self.ids[int(number) - 1]]
+
+def read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def read_bank_index(index_path):
+    """(question count, pool sizes, int64 view of the offsets and pool ids) from a ".idx" sidecar"""
+    index = read_file(index_path)
+    if index[:len(BANK_INDEX_MAGIC)] != BANK_INDEX_MAGIC:
+        raise ValueError(f"{index_path} is not a question bank index")
+    header = len(BANK_INDEX_MAGIC)
+    count, regular, speed, paragraph = memoryview(index)[header:header + 32].cast("q")
+    return count, regular, speed, paragraph, memoryview(index)[header + 32:].cast("q")
+
+def load_packed_bank(path, mtime):
+    """Load a JSONL bank and its index; questions are only decoded when used"""
+    # A private copy rather than a mapping: games keep their /begin snapshot,
+    # so the file must not change under them if it is edited in place
+    data = read_file(path)
+    index_path = path + ".idx"
+    if not os.path.exists(index_path) or os.path.getmtime(index_path) < mtime:
+        write_bank_index(path)
+    count, regular, speed, paragraph, ids = read_bank_index(index_path)
+    if ids[count] != len(data):
+        # The index is for another version of the file, e.g. one rewritten within the mtime resolution
+        write_bank_index(path)
+        data = read_file(path)
+        count, regular, speed, paragraph, ids = read_bank_index(index_path)
+        if ids[count] != len(data):
+            raise ValueError(f"{path} changed while it was being loaded")
+    questions = PackedQuestions(data, ids[:count + 1])
+    ids = ids[count + 1:]
+    return QuestionBank(
+        bank_name_for(path), path, mtime, questions,
+        PackedPool(questions, ids[:regular]),
+        ids[regular:regular + speed],
+        ids[regular + speed:regular + speed + paragraph],
+    )
 
-# Load game state on startup
-load_game_state()
+def bank_name_for(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+def load_bank(path, mtime):
+    """Read and compile one bank file (blocking)"""
+    if path.endswith(".jsonl"):
+        return load_packed_bank(path, mtime)
+    questions = load_questions(path)
+    pool, speed, paragraph = build_question_pools(questions)
+    return QuestionBank(bank_name_for(path), path, mtime, questions, pool, speed, paragraph)
+
+async def load_banks():
+    """Load every file in QUESTION_BANKS concurrently; the default bank must load"""
+    loop = asyncio.get_running_loop()
+
+    async def load(path):
+        mtime = os.path.getmtime(path)
+        bank_mtimes[bank_name_for(path)] = mtime
+        return await loop.run_in_executor(None, load_bank, path, mtime)
+
+    results = await asyncio.gather(*(load(path) for path in QUESTION_BANKS), return_exceptions=True)
+    for i, (path, result) in enumerate(zip(QUESTION_BANKS, results)):
+        if not isinstance(result, Exception):
+            question_banks[result.name] = result
+        elif i == 0:
+            raise result
+        else:
+            print(f"Error loading question bank {path}: {result}")
+
+def current_bank(name=None):
+    """The latest version of a bank, falling back to the default one"""
+    return question_banks.get(name) or question_banks[bank_name_for(QUESTION_BANKS[0])]
+
+def game_bank(game_state):
+    """The bank a chat's questions come from: the /begin snapshot, else its current pick"""
+    if game_state.bank is None and game_state.game_bank_name is not None:
+        # Snapshots aren't saved, so after a restart or eviction the game takes
+        # the latest version of the bank it began with
+        game_state.bank = current_bank(game_state.game_bank_name)
+    return game_state.bank or current_bank(game_state.bank_name)
+
+async def bank_watcher():
+    """Reload bank files whose mtime changed; compiling runs off the event loop"""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(BANK_RELOAD_INTERVAL)
+        for path in QUESTION_BANKS:
+            name = bank_name_for(path)
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            if mtime == bank_mtimes.get(name):
+                continue
+            bank_mtimes[name] = mtime
+            try:
+                bank = await loop.run_in_executor(None, load_bank, path, mtime)
+            except Exception as e:
+                print(f"Error reloading question bank {path}: {e}")
+                continue
+            # Swap in the new version; running games keep the snapshot they began with
+            question_banks[name] = bank
+            print(f"Reloaded question bank {name}: {len(bank.questions)} questions")
+
+async def bootstrap():
+    """Load question banks and saved chats, timing each phase into startup_timings"""
+    started = time.perf_counter()
+
+    async def timed(phase, awaitable):
+        phase_start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            startup_timings[phase] = time.perf_counter() - phase_start
+
+    banks = timed("question banks", load_banks())
+    saved = timed("saved state", asyncio.to_thread(read_game_states))
+    if STATE_BACKEND == "sqlite" and not os.path.exists(STATE_DB_FILE):
+        # The one-off migration from STATE_FILE decodes every chat, which needs the banks
+        await banks
+        rows = await saved
+    else:
+        # Otherwise the banks and the saved state don't depend on each other
+        _, rows = await asyncio.gather(banks, saved)
+    # Decoding can upgrade old payloads, which looks questions up in the default bank
+    phase_start = time.perf_counter()
+    hydrate_game_states(rows)
+    startup_timings["running games"] = time.perf_counter() - phase_start
+    startup_timings["total"] = time.perf_counter() - started
+    print("Startup: " + ", ".join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in startup_timings.items()))
+
+def resumed_timer_markup(game_state, attr):
+    """The answer buttons a saved timer's question message had"""
+    if attr == "mcq_timer":
+        session = game_state.user_data.get(game_state.current_question_player)
+        question_id = session.current_question if session else None
+    elif attr == "speed_timer":
+        question_id = game_state.tiebreaker_state.speed_round_question
+    elif attr == "timer":
+        question_id = game_state.open_round.question_id
+    else:
+        return None
+    question = game_bank(game_state).get(question_id)
+    return answer_keyboard(question) if question else None
+
+def resume_timers(app):
+    """Hand every saved question timer back to the scheduler; answered questions' timers are dropped"""
+    # bootstrap() has decoded every chat saved with a pending timer
+    resumed = 0
+    for chat_id, game_state in game_states.items():
+        context = ContextTypes.DEFAULT_TYPE(app, chat_id=chat_id)
+        tiebreaker = game_state.tiebreaker_state
+        timers = [
+            (game_state, "mcq_timer", game_state.waiting_for_mcq_answer, handle_mcq_timeout),
+            (tiebreaker, "speed_timer", tiebreaker.waiting_for_speed_answer, handle_speed_round_timeout),
+        ]
+        if game_state.open_round is not None:
+            timers.append((game_state.open_round, "timer", game_state.open_round.question_id is not None,
+                           handle_open_round_timeout))
+        timers += [
+            (session, "paragraph_timer", session.waiting_for_paragraph, handle_paragraph_timeout)
+            for session in game_state.user_data.values()
+        ]
+        for owner, attr, waiting, on_timeout in timers:
+            handle = getattr(owner, attr)
+            if handle is None or handle.scheduler is not None:
+                continue
+            if not waiting or handle.cancelled:
+                setattr(owner, attr, None)
+                continue
+            handle.markup = resumed_timer_markup(game_state, attr)
+            timer_scheduler.resume(handle, app.bot, chat_id, partial(on_timeout, context, chat_id))
+            resumed += 1
+    return resumed
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not update.message or not update.effective_user:
@@ -166,23 +2179,23 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     # Only admins can use /start
     if not is_admin(update.effective_user.id):
-        await update.message.reply_text("Only admins can start a new quiz session.")
+        await reply(update, context, "Only admins can start a new quiz session.")
         return
     
     chat_id = update.effective_chat.id
     game_state = get_game_state(chat_id)
     
     # Check if there's already an active session or players waiting
-    if (game_state["in_progress"] or 
-        game_state["tiebreaker_state"]["in_progress"] or 
-        game_state["active_players"]):
-        await update.message.reply_text("Cannot start a new quiz. There's already a game in progress or players waiting to start. Use /stop first if you need to reset.")
+    if (game_state.in_progress or 
+        game_state.tiebreaker_state.in_progress or 
+        game_state.active_players):
+        await reply(update, context, "Cannot start a new quiz. There's already a game in progress or players waiting to start. Use /stop first if you need to reset.")
         return
     
-    game_state["game_started"] = True  # Mark that /start has been called
-    save_game_state()
+    game_state.game_started = True  # Mark that /start has been called
+    save_game_state(chat_id)
     
-    await update.message.reply_text("Welcome to the Bible Study Quiz! Type /join to participate. The admin will close entry soon.")
+    await reply(update, context, "Welcome to the Bible Study Quiz! Type /join to participate. The admin will close entry soon.")
 
 async def join(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not update.message or not update.effective_user:
@@ -191,64 +2204,68 @@ async def join(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
     game_state = get_game_state(chat_id)
     user = update.effective_user
+    name_cache.remember(user)
     
     # Check if /start has been called
-    if not game_state["game_started"]:
-        await update.message.reply_text("Please wait for the admin to start the quiz with /start first.")
+    if not game_state.game_started:
+        await reply(update, context, "Please wait for the admin to start the quiz with /start first.")
         return
     
-    if user.id not in game_state["active_players"] and not game_state["in_progress"]:
-        game_state["active_players"].append(user.id)
-        game_state["player_scores"][user.id] = 0
-        save_game_state()
-        await update.message.reply_text(f"{user.first_name} has joined the quiz!")
-    elif game_state["in_progress"]:
-        await update.message.reply_text("The quiz is already in progress. Wait for the next one.")
+    if user.id not in game_state.active_players and not game_state.in_progress:
+        game_state.active_players.append(user.id)
+        game_state.player_scores[user.id] = 0
+        game_state.score_version += 1
+        save_game_state(chat_id)
+        await reply(update, context, f"{user.first_name} has joined the quiz!")
+    elif game_state.in_progress:
+        await reply(update, context, "The quiz is already in progress. Wait for the next one.")
 
 async def begin(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not update.message or not update.effective_user:
         return
     if not is_admin(update.effective_user.id):
-        await update.message.reply_text("Only admins can start the quiz.")
+        await reply(update, context, "Only admins can start the quiz.")
         return
 
     chat_id = update.effective_chat.id
     game_state = get_game_state(chat_id)
 
-    if not game_state["active_players"]:
-        await update.message.reply_text("No players have joined.")
+    if not game_state.active_players:
+        await reply(update, context, "No players have joined.")
         return
 
-    # Rebuild question pool to exclude tiebreaker questions
-    if not question_pool:
-        await update.message.reply_text("No regular questions available! Please add non-tiebreaker questions to the quiz.")
+    # The game keeps this version of the bank even if the file is reloaded
+    bank = current_bank(game_state.bank_name)
+    if not bank.pool:
+        await reply(update, context, "No regular questions available! Please add non-tiebreaker questions to the quiz.")
         return
 
-    game_state["in_progress"] = True
-    game_state["current_turn_index"] = 0
-    game_state["answered_questions"] = set()
-    game_state["current_question_player"] = None
+    game_state.bank = bank
+    game_state.game_bank_name = bank.name
+    game_state.in_progress = True
+    game_state.open_round = OpenRound() if [arg.lower() for arg in context.args] == ["open"] else None
+    game_state.current_turn_index = 0
+    game_state.available_questions = QuestionRanges.full(len(bank.pool))
+    game_state.current_question_player = None
     
     # Reset review state
-    game_state["review_state"] = {
-        "awaiting_admin_review": False,
-        "responding_user_id": None,
-        "paragraph_answer": None
-    }
+    game_state.review_state = ReviewState()
+    game_state.review_queue.clear()
+    game_state.next_review_id = 1
     
     # Reset tiebreaker state
-    game_state["tiebreaker_state"] = {
-        "in_progress": False,
-        "tied_players": [],
-        "current_phase": None,
-        "speed_round_question": None,
-        "waiting_for_speed_answer": False,
-        "first_responder": None,
-        "speed_timer_task": None
-    }
-
-    save_game_state()
-    await context.bot.send_message(chat_id=chat_id, text="Quiz starting now!")
+    game_state.tiebreaker_state = TiebreakerState()
+
+    save_game_state(chat_id)
+    if game_state.open_round is not None:
+        await send_message(
+            context.bot,
+            chat_id=chat_id,
+            text="Quiz starting now! Open rounds: everyone answers every question, and only your first answer counts."
+        )
+        await next_open_question(context, chat_id)
+        return
+    await send_message(context.bot, chat_id=chat_id, text="Quiz starting now!")
     await next_turn(context, chat_id)
 
 async def stop(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -256,54 +2273,59 @@ async def stop(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
         
     if not is_admin(update.effective_user.id):
-        await update.message.reply_text("Only admins can stop the quiz.")
+        await reply(update, context, "Only admins can stop the quiz.")
         return
 
     chat_id = update.effective_chat.id
     game_state = get_game_state(chat_id)
+    speed_question = game_bank(game_state).get(game_state.tiebreaker_state.speed_round_question)
+    question_timers = [
+        (game_state.mcq_timer, None),
+        (game_state.open_round.timer if game_state.open_round else None, None),
+        # The speed round's own text is Markdown, which edit_message doesn't send
+        (game_state.tiebreaker_state.speed_timer, speed_question.prompt if speed_question else None),
+    ]
 
     # Cancel any running timers
-    if game_state["mcq_timer_task"] and not game_state["mcq_timer_task"].done():
-        game_state["mcq_timer_task"].cancel()
+    if game_state.mcq_timer and not game_state.mcq_timer.done():
+        game_state.mcq_timer.cancel()
     
-    if game_state["tiebreaker_state"].get("speed_timer_task") and not game_state["tiebreaker_state"]["speed_timer_task"].done():
-        game_state["tiebreaker_state"]["speed_timer_task"].cancel()
+    if game_state.tiebreaker_state.speed_timer and not game_state.tiebreaker_state.speed_timer.done():
+        game_state.tiebreaker_state.speed_timer.cancel()
+
+    if game_state.open_round and game_state.open_round.timer and not game_state.open_round.timer.done():
+        game_state.open_round.timer.cancel()
     
     # Cancel paragraph timers for all users
-    for user_id, user_data in game_state["user_data"].items():
-        if user_data.get("paragraph_timer_task") and not user_data["paragraph_timer_task"].done():
-            user_data["paragraph_timer_task"].cancel()
+    for user_id, user_data in game_state.user_data.items():
+        if user_data.paragraph_timer and not user_data.paragraph_timer.done():
+            user_data.paragraph_timer.cancel()
 
     # Reset game state for this chat
-    game_state["in_progress"] = False
-    game_state["waiting_for_mcq_answer"] = False
-    game_state["active_players"].clear()
-    game_state["player_scores"].clear()
-    game_state["answered_questions"].clear()
-    game_state["current_turn_index"] = 0
-    game_state["user_data"].clear()
-    game_state["game_started"] = False
-    game_state["current_question_player"] = None
+    game_state.in_progress = False
+    game_state.waiting_for_mcq_answer = False
+    game_state.active_players.clear()
+    game_state.player_scores.clear()
+    game_state.score_version += 1
+    game_state.available_questions = QuestionRanges()
+    game_state.bank = None
+    game_state.game_bank_name = None
+    game_state.current_turn_index = 0
+    game_state.user_data.clear()
+    game_state.game_started = False
+    game_state.current_question_player = None
     
     # Reset states
-    game_state["review_state"] = {
-        "awaiting_admin_review": False,
-        "responding_user_id": None,
-        "paragraph_answer": None
-    }
-    
-    game_state["tiebreaker_state"] = {
-        "in_progress": False,
-        "tied_players": [],
-        "current_phase": None,
-        "speed_round_question": None,
-        "waiting_for_speed_answer": False,
-        "first_responder": None,
-        "speed_timer_task": None
-    }
-    
-    save_game_state()
-    await context.bot.send_message(chat_id=chat_id, text="Quiz has been stopped.")
+    game_state.review_state = ReviewState()
+    game_state.review_queue.clear()
+    game_state.open_round = None
+    
+    game_state.tiebreaker_state = TiebreakerState()
+    
+    save_game_state(chat_id)
+    await send_message(context.bot, chat_id=chat_id, text="Quiz has been stopped.")
+    for timer, text in question_timers:
+        await drop_answer_buttons(context.bot, timer, text)
 
 async def skip(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Admin command to skip current turn"""
@@ -311,52 +2333,59 @@ async def skip(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
         
     if not is_admin(update.effective_user.id):
-        await update.message.reply_text("Only admins can skip turns.")
+        await reply(update, context, "Only admins can skip turns.")
         return
     
     chat_id = update.effective_chat.id
     game_state = get_game_state(chat_id)
     
-    if not game_state["in_progress"]:
-        await update.message.reply_text("No quiz is currently in progress.")
+    if not game_state.in_progress:
+        await reply(update, context, "No quiz is currently in progress.")
+        return
+
+    if game_state.open_round is not None:
+        # No turns to skip: close the question now
+        await close_open_round(context, chat_id)
         return
     
     # Cancel any active timers
-    if game_state["mcq_timer_task"] and not game_state["mcq_timer_task"].done():
-        game_state["mcq_timer_task"].cancel()
+    if game_state.mcq_timer and not game_state.mcq_timer.done():
+        game_state.mcq_timer.cancel()
         
     # Cancel paragraph timer for current user
-    if game_state["current_turn_index"] < len(game_state["active_players"]):
-        current_user_id = game_state["active_players"][game_state["current_turn_index"]]
+    if game_state.current_turn_index < len(game_state.active_players):
+        current_user_id = game_state.active_players[game_state.current_turn_index]
         user_data = get_user_data(chat_id, current_user_id)
-        if user_data.get("paragraph_timer_task") and not user_data["paragraph_timer_task"].done():
-            user_data["paragraph_timer_task"].cancel()
+        if user_data.paragraph_timer and not user_data.paragraph_timer.done():
+            user_data.paragraph_timer.cancel()
     
     # Reset waiting states
-    game_state["waiting_for_mcq_answer"] = False
-    game_state["current_question_player"] = None
+    game_state.waiting_for_mcq_answer = False
+    game_state.current_question_player = None
     
     # Clear user waiting states
-    for user_data in game_state["user_data"].values():
-        user_data["waiting_for_paragraph"] = False
+    for user_data in game_state.user_data.values():
+        user_data.waiting_for_paragraph = False
     
     # Clear review state if waiting
-    if game_state["review_state"]["awaiting_admin_review"]:
-        game_state["review_state"]["awaiting_admin_review"] = False
-        game_state["review_state"]["responding_user_id"] = None
-        game_state["review_state"]["paragraph_answer"] = None
+    if game_state.review_state.awaiting_admin_review:
+        game_state.review_state.awaiting_admin_review = False
+        game_state.review_state.responding_user_id = None
+        game_state.review_state.paragraph_answer = None
     
     # Get current player name for message
-    if game_state["current_turn_index"] < len(game_state["active_players"]):
-        user_id = game_state["active_players"][game_state["current_turn_index"]]
-        user = await context.bot.get_chat(user_id)
-        await context.bot.send_message(
+    if game_state.current_turn_index < len(game_state.active_players):
+        user_id = game_state.active_players[game_state.current_turn_index]
+        user = await get_user(context.bot, user_id)
+        await send_message(
+            context.bot,
             chat_id=chat_id, 
             text=f"⏭️ Admin skipped {user.first_name}'s turn."
         )
     
-    game_state["current_turn_index"] += 1
-    save_game_state()
+    game_state.current_turn_index += 1
+    save_game_state(chat_id)
+    await drop_answer_buttons(context.bot, game_state.mcq_timer)
     await next_turn(context, chat_id)
 
 async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -366,92 +2395,219 @@ async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     # Only admins can use /status
     if not is_admin(update.effective_user.id):
-        await update.message.reply_text("Only admins can check game status.")
+        await reply(update, context, "Only admins can check game status.")
         return
     
     chat_id = update.effective_chat.id
     game_state = get_game_state(chat_id)
     
     status_lines = ["📊 **Game Status**"]
+
+    tiebreaker = game_state.tiebreaker_state
+    tied_ids = list(tiebreaker.tied_players) if tiebreaker.in_progress else []
+    turn_ids = []
+    if (game_state.in_progress and not tiebreaker.in_progress and game_state.open_round is None
+            and game_state.current_turn_index < len(game_state.active_players)):
+        turn_ids = [game_state.active_players[game_state.current_turn_index]]
+
+    # Resolve every name the status needs in one concurrent batch
+    score_lines, users = await asyncio.gather(
+        render_score_lines(context.bot, game_state, "status"),
+        get_users(context.bot, tied_ids + turn_ids + ALL_ADMIN_IDS)
+    )
+    tied_users = users[:len(tied_ids)]
+    turn_users = users[len(tied_ids):len(tied_ids) + len(turn_ids)]
+    admin_users = users[len(tied_ids) + len(turn_ids):]
     
-    if not game_state["in_progress"] and not game_state["tiebreaker_state"]["in_progress"]:
+    if not game_state.in_progress and not game_state.tiebreaker_state.in_progress:
         status_lines.append("• No quiz in progress")
-        if game_state["active_players"]:
-            status_lines.append(f"• {len(game_state['active_players'])} players waiting to start")
+        if game_state.active_players:
+            status_lines.append(f"• {len(game_state.active_players)} players waiting to start")
         else:
             status_lines.append("• No players joined")
-    elif game_state["tiebreaker_state"]["in_progress"]:
+    elif game_state.tiebreaker_state.in_progress:
         status_lines.append("🏆 **Tiebreaker in Progress**")
-        tied_names = []
-        for uid in game_state["tiebreaker_state"]["tied_players"]:
-            try:
-                user = await context.bot.get_chat(uid)
-                tied_names.append(user.first_name)
-            except:
-                tied_names.append(f"User {uid}")
+        tied_names = [user.first_name if user else f"User {uid}" for uid, user in zip(tied_ids, tied_users)]
         status_lines.append(f"• Tied players: {', '.join(tied_names)}")
-        status_lines.append(f"• Phase: {game_state['tiebreaker_state']['current_phase']}")
-        if game_state["tiebreaker_state"]["waiting_for_speed_answer"]:
+        status_lines.append(f"• Phase: {game_state.tiebreaker_state.current_phase}")
+        if game_state.tiebreaker_state.waiting_for_speed_answer:
             status_lines.append("• Waiting for speed round answers")
     else:
         status_lines.append("• Quiz in progress")
-        status_lines.append(f"• Players: {len(game_state['active_players'])}")
-        status_lines.append(f"• Questions answered: {len(game_state['answered_questions'])}/{len(question_pool)}")
+        status_lines.append(f"• Players: {len(game_state.active_players)}")
+        available = game_state.available_questions
+        status_lines.append(f"• Questions answered: {available.total - len(available)}/{available.total}")
         
-        if game_state["current_turn_index"] < len(game_state["active_players"]):
-            current_user_id = game_state["active_players"][game_state["current_turn_index"]]
-            try:
-                current_user = await context.bot.get_chat(current_user_id)
+        for current_user_id, current_user in zip(turn_ids, turn_users):
+            if current_user:
                 status_lines.append(f"• Current turn: {current_user.first_name}")
-            except:
+            else:
                 status_lines.append(f"• Current turn: User {current_user_id}")
         
-        if game_state["waiting_for_mcq_answer"]:
+        if game_state.open_round is not None:
+            status_lines.append(
+                f"• Open round: {len(game_state.open_round.answered)}/{len(game_state.active_players)} players answered"
+            )
+        elif game_state.waiting_for_mcq_answer:
             status_lines.append("• Waiting for MCQ answer")
-        elif any(user_data.get("waiting_for_paragraph") for user_data in game_state["user_data"].values()):
+        elif any(user_data.waiting_for_paragraph for user_data in game_state.user_data.values()):
             status_lines.append("• Waiting for paragraph answer")
-        elif game_state["review_state"]["awaiting_admin_review"]:
+        elif game_state.review_state.awaiting_admin_review:
             status_lines.append("• Waiting for admin review")
         else:
             status_lines.append("• Waiting for question selection")
+    if game_state.review_queue:
+        status_lines.append(
+            f"• Answers awaiting review: {', '.join(f'#{review_id}' for review_id in game_state.review_queue)}"
+        )
     
     # Show current scores
-    if game_state["player_scores"]:
+    if game_state.player_scores:
         status_lines.append("\n📈 **Current Scores:**")
-        sorted_scores = sorted(game_state["player_scores"].items(), key=lambda x: x[1], reverse=True)
-        for uid, score in sorted_scores:
-            try:
-                user = await context.bot.get_chat(uid)
-                status_lines.append(f"• {user.first_name}: {score}")
-            except:
-                status_lines.append(f"• User {uid}: {score}")
+        status_lines.extend(score_lines)
     
     # Show admin info - get names instead of IDs
     admin_names = []
-    for admin_id in ALL_ADMIN_IDS:
-        try:
-            admin = await context.bot.get_chat(admin_id)
-            # Use username if available, otherwise first_name
-            if hasattr(admin, 'username') and admin.username:
-                admin_names.append(f"@{admin.username}")
-            else:
-                admin_names.append(admin.first_name)
-        except:
+    for admin in admin_users:
+        if admin is None:
             # If we can't get the name, use a generic label (not the ID)
             admin_names.append("Admin")
+        elif admin.username:
+            # Use username if available, otherwise first_name
+            admin_names.append(f"@{admin.username}")
+        else:
+            admin_names.append(admin.first_name)
     
     status_lines.append(f"\n👑 **Admins:** {', '.join(admin_names)}")
     
-    await update.message.reply_text("\n".join(status_lines), parse_mode="Markdown")
+    await reply(update, context, "\n".join(status_lines), parse_mode="Markdown")
+
+async def memory(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show how much per-chat state is held in memory - ADMIN ONLY"""
+    if not update.message or not update.effective_user:
+        return
+
+    if not is_admin(update.effective_user.id):
+        await reply(update, context, "Only admins can check memory usage.")
+        return
+
+    running = sum(1 for cid, state in game_states.items() if not is_chat_evictable(cid, state))
+    player_sessions = sum(len(state.user_data) for state in game_states.values())
+    resident_bytes = sum(len(encode_state(state)) for state in game_states.values())
+    cold_bytes = sum(len(payload) for payload in cold_states.values())
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    report_lines = [
+        "🧠 **Memory Report**",
+        f"• Groups in memory: {len(game_states)} ({running} with a game running)",
+        f"• Player sessions in memory: {player_sessions}",
+        f"• Encoded size of groups in memory: {resident_bytes / 1024:.1f} KB",
+    ]
+    if STATE_BACKEND == "sqlite":
+        report_lines.append(f"• Idle groups are kept in {STATE_DB_FILE}")
+    elif STATE_BACKEND == "journal":
+        report_lines.append(f"• Groups saved in {STATE_JOURNAL_FILE}: {len(journal_index)}")
+    else:
+        report_lines.append(f"• Idle groups parked: {len(cold_states)} ({cold_bytes / 1024:.1f} KB)")
+    report_lines.append(f"• Eviction: idle after {IDLE_CHAT_TTL:.0f}s, at most {MAX_RESIDENT_CHATS} groups")
+    report_lines.append(
+        f"• Name cache: {len(name_cache.entries)} names, {name_cache.hits} hits, "
+        f"{name_cache.misses} misses ({name_cache.coalesced} coalesced)"
+    )
+    report_lines.append(
+        f"• Question banks: {len(question_banks)} loaded, "
+        f"{sum(len(bank.questions) for bank in question_banks.values())} questions"
+    )
+    report_lines.append(f"• Pending timers: {timer_scheduler.pending}")
+    if outbound_queue is not None:
+        depth = outbound_queue.depth()
+        report_lines.append(
+            f"• Outbound queue: {depth[PRIORITY_HIGH]} high / {depth[PRIORITY_NORMAL]} normal / "
+            f"{depth[PRIORITY_COUNTDOWN]} countdown queued, {outbound_queue.sent} sent, "
+            f"{outbound_queue.merged} merged, {outbound_queue.retried} retried, {outbound_queue.failed} failed"
+        )
+    if startup_timings:
+        report_lines.append(
+            "• Startup: " + ", ".join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in startup_timings.items())
+        )
+    report_lines.append(f"• Peak RSS: {peak_rss_mb:.1f} MB")
+
+    await reply(update, context, "\n".join(report_lines), parse_mode="Markdown")
+
+async def select_bank(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """List question banks or pick one for this chat - ADMIN ONLY"""
+    if not update.message or not update.effective_user:
+        return
+
+    if not is_admin(update.effective_user.id):
+        await reply(update, context, "Only admins can change the question bank.")
+        return
+
+    chat_id = update.effective_chat.id
+    game_state = get_game_state(chat_id)
+
+    if not context.args:
+        current = current_bank(game_state.bank_name).name
+        lines = ["📚 Question banks:"]
+        for name, bank in question_banks.items():
+            marker = " ← this group" if name == current else ""
+            lines.append(f"• {name}: {len(bank.pool)} questions, "
+                         f"{len(bank.tiebreaker_mcq) + len(bank.tiebreaker_paragraph)} tiebreakers{marker}")
+        lines.append("Use /bank <name> to switch.")
+        await reply(update, context, "\n".join(lines))
+        return
+
+    name = context.args[0]
+    if name not in question_banks:
+        await reply(update, context, f"Unknown bank. Available: {', '.join(question_banks)}")
+        return
+
+    game_state.bank_name = name
+    save_game_state(chat_id)
+    if game_state.in_progress:
+        await reply(update, context, f"This group will use {name} from the next /begin.")
+    else:
+        await reply(update, context, f"This group will use {name}.")
+
+async def profile_updates(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """/profile [on|off|every N|slow SECONDS] - ADMIN ONLY; lasts until restart, and only on this group's shard"""
+    if not update.message or not update.effective_user:
+        return
+
+    if not is_admin(update.effective_user.id):
+        await reply(update, context, "Only admins can change profiling.")
+        return
+
+    args = [arg.lower() for arg in context.args]
+    try:
+        if args == ["on"] or args == ["off"]:
+            profiler.enabled = args[0] == "on"
+        elif len(args) == 2 and args[0] == "every":
+            profiler.every = max(int(args[1]), 0)
+        elif len(args) == 2 and args[0] == "slow":
+            profiler.slow_seconds = max(float(args[1]), 0.0)
+        elif args:
+            raise ValueError
+    except ValueError:
+        await reply(update, context, "Usage: /profile [on|off|every N|slow SECONDS]")
+        return
+
+    await reply(
+        update, context,
+        f"⏱ Profiling is {'on' if profiler.enabled else 'off'}: "
+        f"{f'cProfile every {profiler.every} updates' if profiler.every else 'no cProfile samples'}, "
+        f"log updates slower than {profiler.slow_seconds:g}s to {PROFILE_LOG_FILE}.\n"
+        f"{profiler.seen} updates seen, {profiler.logged} logged."
+    )
 
 def detect_tie(chat_id):
     """Detect if there's a tie in the current scores"""
     game_state = get_game_state(chat_id)
-    if not game_state["player_scores"]:
+    if not game_state.player_scores:
         return []
     
-    max_score = max(game_state["player_scores"].values())
-    tied_players = [uid for uid, score in game_state["player_scores"].items() if score == max_score]
+    max_score = max(game_state.player_scores.values())
+    tied_players = [uid for uid, score in game_state.player_scores.items() if score == max_score]
     
     return tied_players if len(tied_players) > 1 else []
 
@@ -462,38 +2618,34 @@ async def tiebreaker(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
         
     if not is_admin(update.effective_user.id):
-        await update.message.reply_text("Only admins can start tiebreaker.")
+        await reply(update, context, "Only admins can start tiebreaker.")
         return
     
     chat_id = update.effective_chat.id
     game_state = get_game_state(chat_id)
     
-    if game_state["tiebreaker_state"]["in_progress"]:
-        await update.message.reply_text("Tiebreaker already in progress.")
+    if game_state.tiebreaker_state.in_progress:
+        await reply(update, context, "Tiebreaker already in progress.")
         return
     
     tied_players = detect_tie(chat_id)
     if not tied_players:
-        await update.message.reply_text("No tie detected. Cannot start tiebreaker.")
+        await reply(update, context, "No tie detected. Cannot start tiebreaker.")
         return
     
-    game_state["used_tiebreaker_mcq"].clear() 
-    game_state["tiebreaker_state"]["in_progress"] = True
-    game_state["tiebreaker_state"]["tied_players"] = tied_players
-    game_state["tiebreaker_state"]["current_phase"] = "speed_round"
+    game_state.used_tiebreaker_mcq = 0
+    game_state.speed_round_deck = None
+    game_state.tiebreaker_state.in_progress = True
+    game_state.tiebreaker_state.tied_players = tied_players
+    game_state.tiebreaker_state.current_phase = "speed_round"
     
-    save_game_state()
+    save_game_state(chat_id)
     
     # Get tied player names
-    tied_names = []
-    for uid in tied_players:
-        try:
-            user = await context.bot.get_chat(uid)
-            tied_names.append(user.first_name)
-        except:
-            tied_names.append(f"User {uid}")
+    tied_names = await display_names(context.bot, tied_players)
     
-    await context.bot.send_message(
+    await send_message(
+        context.bot,
         chat_id=chat_id,
         text=f"🏆 **TIEBREAKER ROUND**\n\nTied players: {', '.join(tied_names)}\n\nStarting speed round..."
     )
@@ -504,14 +2656,18 @@ async def start_speed_round(context: ContextTypes.DEFAULT_TYPE, chat_id: int):
     """Pick an *unused* tie-breaker MCQ; if none left → paragraph phase."""
     game_state = get_game_state(chat_id)
 
-    # 1. Collect *unused* MCQ questions
-    available = [
-        q for q in questions_data
-        if q.get("is_tiebreaker") and q["type"] == "mcq" and json.dumps(q) not in game_state["used_tiebreaker_mcq"]
-    ]
-
-    if not available:                       # <-- no more speed questions
-        await context.bot.send_message(
+    # 1. Shuffle the *unused* MCQ questions once per tiebreaker, then draw from the end
+    bank = game_bank(game_state)
+    deck = game_state.speed_round_deck
+    if deck is None:
+        used = game_state.used_tiebreaker_mcq
+        deck = [qid for qid in bank.tiebreaker_mcq if not used >> qid & 1]
+        random.shuffle(deck)
+        game_state.speed_round_deck = deck
+
+    if not deck:                            # <-- no more speed questions
+        await send_message(
+            context.bot,
             chat_id=chat_id,
             text="All speed-round questions exhausted. Moving to paragraph phase…"
         )
@@ -519,115 +2675,102 @@ async def start_speed_round(context: ContextTypes.DEFAULT_TYPE, chat_id: int):
         return
 
     # 2. Pick & mark as used
-    question = random.choice(available)
-    game_state["used_tiebreaker_mcq"].add(json.dumps(question))  # JSON string is hashable
-    game_state["tiebreaker_state"]["speed_round_question"] = question
-    game_state["tiebreaker_state"]["waiting_for_speed_answer"] = True
-    game_state["tiebreaker_state"]["first_responder"] = None
+    question = bank.questions[deck.pop()]
+    game_state.used_tiebreaker_mcq |= 1 << question.id
+    game_state.tiebreaker_state.speed_round_question = question.id
+    game_state.tiebreaker_state.waiting_for_speed_answer = True
+    game_state.tiebreaker_state.first_responder = None
+    game_state.tiebreaker_state.locked_out.clear()
 
     # 3. Send to group
-    options = question["options"]
-    lettered_options = [f"{chr(97 + i)}) {opt}" for i, opt in enumerate(options)]
-    txt = (f"⚡ **SPEED ROUND** ({len(available)-1} left)\n"
-           f"{question['question']}\n" +
-           "\n".join(lettered_options) +
+    txt = (f"⚡ **SPEED ROUND** ({len(deck)} left)\n"
+           f"{question.text}\n" +
+           question.options_text +
            "\n\n**First correct answer wins!**")
-    msg = await context.bot.send_message(chat_id=chat_id, text=txt, parse_mode="Markdown")
+    markup = answer_keyboard(question)
+    msg = await send_message(context.bot, chat_id=chat_id, text=txt, parse_mode="Markdown", reply_markup=markup,
+                             priority=PRIORITY_HIGH)
 
     # 4. Start 30-s timer
-    game_state["tiebreaker_state"]["speed_timer_task"] = asyncio.create_task(
-        handle_speed_round_timeout(context, chat_id, msg.message_id, txt)
+    game_state.tiebreaker_state.speed_timer = timer_scheduler.schedule(
+        context.bot, chat_id, msg.message_id, txt, QUESTION_SECONDS,
+        partial(handle_speed_round_timeout, context, chat_id), markup
     )
-    save_game_state()
+    save_game_state(chat_id)
 
-async def handle_speed_round_timeout(context: ContextTypes.DEFAULT_TYPE, chat_id: int, message_id: int, original_text: str):
+async def handle_speed_round_timeout(context: ContextTypes.DEFAULT_TYPE, chat_id: int, timer: TimerHandle):
     """Handle speed round timeout"""
     game_state = get_game_state(chat_id)
-    try:
-        await show_timer(context, chat_id, message_id, 30, original_text)
-        await asyncio.sleep(1)
-        
-        if game_state["tiebreaker_state"]["waiting_for_speed_answer"]:
-            # ⏰ Time's up, next speed question
-            game_state["tiebreaker_state"]["waiting_for_speed_answer"] = False
-            await context.bot.send_message(
-                chat_id=chat_id,
-                text="⏰ Time's up! Next speed-round question..."
-            )
-            await start_speed_round(context, chat_id)
-    except asyncio.CancelledError:
-        pass
+    if game_state.tiebreaker_state.waiting_for_speed_answer:
+        # ⏰ Time's up, next speed question
+        game_state.tiebreaker_state.waiting_for_speed_answer = False
+        await send_message(
+            context.bot,
+            chat_id=chat_id,
+            text="⏰ Time's up! Next speed-round question...",
+            priority=PRIORITY_HIGH
+        )
+        await start_speed_round(context, chat_id)
 
 async def start_paragraph_tiebreaker(context: ContextTypes.DEFAULT_TYPE, chat_id: int):
     """Start the paragraph phase of tiebreaker"""
     game_state = get_game_state(chat_id)
     
-    # Find tiebreaker paragraph questions
-    tiebreaker_questions = [q for q in questions_data if q.get("is_tiebreaker") and q["type"] == "paragraph"]
-    
-    if not tiebreaker_questions:
+    # No paragraph tiebreaker questions in the bank → shared win
+    bank = game_bank(game_state)
+    if not bank.tiebreaker_paragraph:
         await declare_shared_winners(context, chat_id)
         return
     
-    question = random.choice(tiebreaker_questions)
-    game_state["tiebreaker_state"]["current_phase"] = "paragraph"
+    question = bank.questions[random.choice(bank.tiebreaker_paragraph)]
+    game_state.tiebreaker_state.current_phase = "paragraph"
     
     # Get tied player names
-    tied_names = []
-    for uid in game_state["tiebreaker_state"]["tied_players"]:
-        try:
-            user = await context.bot.get_chat(uid)
-            tied_names.append(user.first_name)
-        except:
-            tied_names.append(f"User {uid}")
+    tied_names = await display_names(context.bot, game_state.tiebreaker_state.tied_players)
     
-    question_text = f"📝 **PARAGRAPH TIEBREAKER**\n\n{question['question']}\n\nTied players ({', '.join(tied_names)}), please submit your answers. Admin will judge the best response."
+    question_text = f"📝 **PARAGRAPH TIEBREAKER**\n\n{question.text}\n\nTied players ({', '.join(tied_names)}), please submit your answers. Admin will judge the best response."
     
-    await context.bot.send_message(chat_id=chat_id, text=question_text, parse_mode="Markdown")
-    save_game_state()
+    await send_message(context.bot, chat_id=chat_id, text=question_text, parse_mode="Markdown", priority=PRIORITY_HIGH)
+    save_game_state(chat_id)
 
 async def declare_shared_winners(context: ContextTypes.DEFAULT_TYPE, chat_id: int):
     """Declare shared winners when tiebreaker is exhausted"""
     game_state = get_game_state(chat_id)
     
-    tied_names = []
-    for uid in game_state["tiebreaker_state"]["tied_players"]:
-        try:
-            user = await context.bot.get_chat(uid)
-            tied_names.append(user.first_name)
-        except:
-            tied_names.append(f"User {uid}")
+    tied_names = await display_names(context.bot, game_state.tiebreaker_state.tied_players)
     
-    await context.bot.send_message(
+    await send_message(
+        context.bot,
         chat_id=chat_id,
         text=f"🏆 **SHARED VICTORY!**\n\nCongratulations to our co-winners: {', '.join(tied_names)}\n\nThe prize will be split among the winners!"
     )
     
     # Reset tiebreaker state
-    game_state["tiebreaker_state"]["in_progress"] = False
-    save_game_state()
+    game_state.tiebreaker_state.in_progress = False
+    save_game_state(chat_id)
 
 async def next_turn(context: ContextTypes.DEFAULT_TYPE, chat_id: int):
     game_state = get_game_state(chat_id)
 
-    if game_state["current_turn_index"] >= len(game_state["active_players"]):
+    if game_state.current_turn_index >= len(game_state.active_players):
         # Show leaderboard after each complete round
         await show_leaderboard(context, chat_id, is_final=False)
         
         # Check if we should end the quiz or continue
-        if len(game_state["answered_questions"]) >= len(question_pool):
+        if not game_state.available_questions:
             await end_quiz(context, chat_id)
             return
         
         # Reset for next round
-        game_state["current_turn_index"] = 0
+        game_state.current_turn_index = 0
 
-    user_id = game_state["active_players"][game_state["current_turn_index"]]
-    user = await context.bot.get_chat(user_id)
-    available = [k for k in question_pool if k not in game_state["answered_questions"]]
+    user_id = game_state.active_players[game_state.current_turn_index]
+    user = await get_user(context.bot, user_id)
+    available = game_state.available_questions
 
-    if len(available) < len(game_state["active_players"]) - game_state["current_turn_index"]:
-        await context.bot.send_message(
+    if len(available) < len(game_state.active_players) - game_state.current_turn_index:
+        await send_message(
+            context.bot,
             chat_id=chat_id,
             text="Not enough questions left for every remaining player. Quiz ends now!"
         )
@@ -639,253 +2782,474 @@ async def next_turn(context: ContextTypes.DEFAULT_TYPE, chat_id: int):
         return
 
     mention = f"[{user.first_name}](tg://user?id={user.id})"
-    await context.bot.send_message(
+    await send_message(
+        context.bot,
         chat_id=chat_id,
-        text=f"Your turn, {mention}! Pick a number from {available}",
-        parse_mode="Markdown"
+        text=f"Your turn, {mention}! Pick a number from {available.render()}",
+        parse_mode="Markdown",
+        priority=PRIORITY_HIGH
+    )
+    save_game_state(chat_id)
+
+async def next_open_question(context: ContextTypes.DEFAULT_TYPE, chat_id: int):
+    """Open rounds: put the next MCQ to the whole lobby, or end the quiz"""
+    game_state = get_game_state(chat_id)
+    bank = game_bank(game_state)
+    available = game_state.available_questions
+    question = None
+    # Questions are asked in bank order; paragraph questions need a single
+    # answerer and an admin, so open rounds pass over them
+    while question is None and (number := available.first()) is not None:
+        available.remove(number)
+        if bank.pool[str(number)].type == "mcq":
+            question = bank.pool[str(number)]
+    if question is None or not game_state.active_players:
+        await end_quiz(context, chat_id)
+        return
+
+    open_round = game_state.open_round
+    open_round.question_id = question.id
+    open_round.answered.clear()
+    open_round.correct.clear()
+    text = f"🌐 Question {number} — everyone answers!\n\n{question.prompt}"
+    markup = answer_keyboard(question)
+    msg = await send_message(context.bot, chat_id=chat_id, text=text, reply_markup=markup, priority=PRIORITY_HIGH)
+    open_round.timer = timer_scheduler.schedule(
+        context.bot, chat_id, msg.message_id, text, QUESTION_SECONDS,
+        partial(handle_open_round_timeout, context, chat_id), markup
     )
-    save_game_state()
+    save_game_state(chat_id)
+
+async def handle_open_answer(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """A text answer to the open question"""
+    chat_id = update.effective_chat.id
+    open_round = get_game_state(chat_id).open_round
+    # Group message ids increase, so this was sent before the question went
+    # out - a late answer to the previous one
+    if open_round.timer is not None and update.message.message_id < open_round.timer.message_id:
+        return
+    await record_open_answer(context, chat_id, update.effective_user.id, update.message.text)
+
+async def record_open_answer(context: ContextTypes.DEFAULT_TYPE, chat_id: int, user_id: int, response: str):
+    """Score a player's first answer to the open question; O(1), nothing is sent"""
+    game_state = get_game_state(chat_id)
+    open_round = game_state.open_round
+    # player_scores has every player in the game, as a dict
+    if open_round.question_id is None or user_id in open_round.answered or user_id not in game_state.player_scores:
+        return
+
+    open_round.answered.add(user_id)
+    question = game_bank(game_state).get(open_round.question_id)
+    if question is not None and question.is_correct(response):
+        points = 1 + max(OPEN_ROUND_SPEED_BONUS - len(open_round.correct), 0)
+        open_round.correct.append((user_id, points))
+        add_score(game_state, user_id, points)
+    save_game_state(chat_id)
+
+    if len(open_round.answered) >= len(game_state.player_scores):
+        await close_open_round(context, chat_id)
+
+async def handle_open_round_timeout(context: ContextTypes.DEFAULT_TYPE, chat_id: int, timer: TimerHandle):
+    """Handle open-round timeout"""
+    game_state = get_game_state(chat_id)
+    if game_state.in_progress and game_state.open_round is not None and game_state.open_round.timer is timer:
+        await close_open_round(context, chat_id)
+
+async def close_open_round(context: ContextTypes.DEFAULT_TYPE, chat_id: int):
+    """Announce the open question's results once, then ask the next one"""
+    game_state = get_game_state(chat_id)
+    open_round = game_state.open_round
+    if open_round.question_id is None:
+        return
+    if open_round.timer and not open_round.timer.done():
+        open_round.timer.cancel()
+    question = game_bank(game_state).get(open_round.question_id)
+    open_round.question_id = None
+    await drop_answer_buttons(context.bot, open_round.timer)
+
+    lines = [f"⏰ Time's up! The correct answer was: {question.answer if question else 'unknown'}"]
+    shown = open_round.correct[:OPEN_ROUND_NAMES_SHOWN]
+    if shown:
+        names = await display_names(context.bot, [uid for uid, _ in shown])
+        winners = ", ".join(f"{name} (+{points})" for name, (_, points) in zip(names, shown))
+        if len(open_round.correct) > len(shown):
+            winners += f" and {len(open_round.correct) - len(shown)} more"
+        lines.append(f"✅ {winners}")
+    else:
+        lines.append("Nobody got it right.")
+    wrong = len(open_round.answered) - len(open_round.correct)
+    silent = max(len(game_state.player_scores) - len(open_round.answered), 0)
+    lines.append(f"{len(open_round.correct)} correct, {wrong} wrong, {silent} no answer")
+    await send_message(context.bot, chat_id=chat_id, text="\n".join(lines), priority=PRIORITY_HIGH)
+    save_game_state(chat_id)
+    await next_open_question(context, chat_id)
+
+async def answer_query(query, text):
+    """Show text to whoever pressed the button; an expired query only loses the popup"""
+    try:
+        await query.answer(text)
+    except Exception as e:
+        print(f"Error answering button press: {e}")
+
+async def handle_answer_button(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """An answer button pressed under an MCQ; feedback goes to the presser only"""
+    query = update.callback_query
+    if not query or not query.message or not update.effective_user:
+        return
+
+    user = update.effective_user
+    name_cache.remember(user)
+    chat_id = update.effective_chat.id
+    question_id, index = map(int, query.data.split(":"))
+    # As in handle_message: chats that are neither loaded nor parked have no game
+    game_state = get_game_state(chat_id) if has_saved_state(chat_id) else None
+    question = game_bank(game_state).get(question_id) if game_state else None
+    if question is None or index >= len(question.options):
+        await answer_query(query, "This question is closed.")
+        return
+    letter = chr(97 + index)
+
+    tiebreaker = game_state.tiebreaker_state
+    if tiebreaker.waiting_for_speed_answer and tiebreaker.speed_round_question == question_id:
+        if user.id not in tiebreaker.tied_players:
+            await answer_query(query, "Only the tied players can answer.")
+        elif user.id in tiebreaker.locked_out:
+            await answer_query(query, "You already answered this one.")
+        elif question.is_correct(letter):
+            await answer_query(query, "⚡ Correct!")
+            await win_speed_round(context, chat_id, user)
+        else:
+            # With buttons a retry is just another guess, so one press each
+            tiebreaker.locked_out.add(user.id)
+            await answer_query(query, "❌ Wrong - you're out for this question.")
+        return
+
+    if not game_state.in_progress:
+        await answer_query(query, "This question is closed.")
+        return
+
+    open_round = game_state.open_round
+    if open_round is not None and open_round.question_id == question_id:
+        if user.id not in game_state.player_scores:
+            await answer_query(query, "Only players in this game can answer.")
+        elif user.id in open_round.answered:
+            await answer_query(query, "Only your first answer counts.")
+        else:
+            await answer_query(query, "Answer recorded - results when time's up.")
+        await record_open_answer(context, chat_id, user.id, letter)
+        return
+
+    mcq_timer = game_state.mcq_timer
+    if not (game_state.waiting_for_mcq_answer and mcq_timer is not None and mcq_timer.message_id == query.message.message_id):
+        await answer_query(query, "This question is closed.")
+        return
+    if user.id != game_state.current_question_player:
+        await answer_query(query, "It's not your turn.")
+        return
+
+    # The turn is settled before anything is sent, so a failed call can't leave it half done
+    if not mcq_timer.done():
+        mcq_timer.cancel()
+    mcq_timer.markup = None  # the verdict edit below removes the buttons
+    correct = question.is_correct(letter)
+    if correct:
+        add_score(game_state, user.id)
+        verdict = f"✅ {user.first_name} answered {letter}) - correct!"
+    else:
+        verdict = f"❌ {user.first_name} answered {letter}) - the correct answer was: {question.answer}"
+    game_state.waiting_for_mcq_answer = False
+    game_state.current_question_player = None
+    game_state.current_turn_index += 1
+    save_game_state(chat_id)
+
+    await answer_query(query, "✅ Correct!" if correct else "❌ Wrong")
+    # The verdict replaces the buttons on the question, instead of a new message
+    try:
+        await edit_message(context.bot, chat_id, query.message.message_id, f"{question.prompt}\n\n{verdict}")
+    except Exception as e:
+        print(f"Error showing answer in chat {chat_id}: {e}")
+    await next_turn(context, chat_id)
 
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not update.message or not update.effective_user:
         return
 
+    name_cache.remember(update.effective_user)
     chat_id = update.effective_chat.id
+    # Running games are never evicted, so a chat that is neither in memory nor
+    # parked since startup has nothing for a plain message to do - don't
+    # create state for chatter
+    if not has_saved_state(chat_id):
+        return
     game_state = get_game_state(chat_id)
-    user_data = get_user_data(chat_id, update.effective_user.id)
+    # Read-only view; per-user data is only created for the player picking below
+    user_data = game_state.user_data.get(update.effective_user.id) or PlayerSession()
 
     # Handle tiebreaker speed round answers
-    if game_state["tiebreaker_state"]["waiting_for_speed_answer"] and update.effective_user.id in game_state["tiebreaker_state"]["tied_players"]:
+    if game_state.tiebreaker_state.waiting_for_speed_answer and update.effective_user.id in game_state.tiebreaker_state.tied_players:
         await handle_speed_round_answer(update, context)
         return
 
     # Handle tiebreaker paragraph answers
-    if game_state["tiebreaker_state"]["in_progress"] and game_state["tiebreaker_state"]["current_phase"] == "paragraph" and update.effective_user.id in game_state["tiebreaker_state"]["tied_players"]:
+    if game_state.tiebreaker_state.in_progress and game_state.tiebreaker_state.current_phase == "paragraph" and update.effective_user.id in game_state.tiebreaker_state.tied_players:
         await handle_tiebreaker_paragraph(update, context)
         return
 
-    if not game_state["in_progress"]:
+    if not game_state.in_progress:
+        return
+
+    if game_state.open_round is not None:
+        await handle_open_answer(update, context)
         return
 
     # Handle MCQ answers - ONLY from the player whose turn it is AND who is expected to answer
-    if (game_state["waiting_for_mcq_answer"] and 
-        game_state["current_question_player"] and 
-        update.effective_user.id == game_state["current_question_player"]):
+    if (game_state.waiting_for_mcq_answer and 
+        game_state.current_question_player and 
+        update.effective_user.id == game_state.current_question_player):
         
         # Cancel the timer since user answered
-        if game_state["mcq_timer_task"] and not game_state["mcq_timer_task"].done():
-            game_state["mcq_timer_task"].cancel()
+        if game_state.mcq_timer and not game_state.mcq_timer.done():
+            game_state.mcq_timer.cancel()
         
         await check_mcq_answer(update, context)
-        game_state["waiting_for_mcq_answer"] = False
-        game_state["current_question_player"] = None
-        game_state["current_turn_index"] += 1
-        save_game_state()
+        game_state.waiting_for_mcq_answer = False
+        game_state.current_question_player = None
+        game_state.current_turn_index += 1
+        save_game_state(chat_id)
+        await drop_answer_buttons(context.bot, game_state.mcq_timer)
         await next_turn(context, chat_id)
         return
 
     # Handle paragraph answers - ONLY from the player whose turn it is AND who is expected to answer
-    if (user_data.get("waiting_for_paragraph") and 
-        game_state["current_question_player"] and 
-        update.effective_user.id == game_state["current_question_player"]):
+    if (user_data.waiting_for_paragraph and 
+        game_state.current_question_player and 
+        update.effective_user.id == game_state.current_question_player):
         
         # Cancel the paragraph timer since user answered
-        if user_data.get("paragraph_timer_task") and not user_data["paragraph_timer_task"].done():
-            user_data["paragraph_timer_task"].cancel()
+        if user_data.paragraph_timer and not user_data.paragraph_timer.done():
+            user_data.paragraph_timer.cancel()
+
+        if REVIEW_QUEUE:
+            await queue_paragraph_answer(update, context, user_data)
+            return
         
         # Store answer in review state
-        game_state["review_state"]["paragraph_answer"] = update.message.text
-        game_state["review_state"]["responding_user_id"] = update.effective_user.id
-        game_state["review_state"]["awaiting_admin_review"] = True
+        game_state.review_state.paragraph_answer = update.message.text
+        game_state.review_state.responding_user_id = update.effective_user.id
+        game_state.review_state.awaiting_admin_review = True
         
-        user_data["waiting_for_paragraph"] = False
-        save_game_state()
+        user_data.waiting_for_paragraph = False
+        save_game_state(chat_id)
         
         # Send to admin for review
-        await context.bot.send_message(
+        await send_message(
+            context.bot,
             chat_id=chat_id,
             text=f"Admin, please review {update.effective_user.first_name}'s answer: \"{update.message.text}\"\n\nReply with /approve or /reject."
         )
         return
 
     # Handle additional responses from users who already answered paragraph questions
-    if (game_state["review_state"]["awaiting_admin_review"] and 
-        update.effective_user.id == game_state["review_state"]["responding_user_id"] and
-        update.effective_user.id in game_state["active_players"]):  # Only if still active
-        await context.bot.send_message(
+    if (game_state.review_state.awaiting_admin_review and 
+        update.effective_user.id == game_state.review_state.responding_user_id and
+        update.effective_user.id in game_state.active_players):  # Only if still active
+        await send_message(
+            context.bot,
             chat_id=chat_id,
             text=f"{update.effective_user.first_name}, only your first response is considered. Please wait for admin review."
         )
         return
 
     # Ignore messages from users who are not active players
-    if update.effective_user.id not in game_state["active_players"]:
+    if update.effective_user.id not in game_state.active_players:
         return
 
     # Handle wrong user trying to answer MCQ
-    if game_state["waiting_for_mcq_answer"] and update.effective_user.id != game_state["current_question_player"]:
+    if game_state.waiting_for_mcq_answer and update.effective_user.id != game_state.current_question_player:
         # Don't respond to prevent confusion - ignore the message
         return
 
     # Handle wrong user trying to answer paragraph question
-    if any(user_data.get("waiting_for_paragraph") for user_data in game_state["user_data"].values()) and update.effective_user.id != game_state["current_question_player"]:
+    if any(user_data.waiting_for_paragraph for user_data in game_state.user_data.values()) and update.effective_user.id != game_state.current_question_player:
         # Don't respond to prevent confusion - ignore the message
         return
 
     # Handle question selection (only if it's the user's turn and we're not waiting for an answer)
-    if (game_state["current_turn_index"] >= len(game_state["active_players"]) or 
-        update.effective_user.id != game_state["active_players"][game_state["current_turn_index"]] or 
-        game_state["waiting_for_mcq_answer"] or
-        game_state["current_question_player"]):
+    if (game_state.current_turn_index >= len(game_state.active_players) or 
+        update.effective_user.id != game_state.active_players[game_state.current_turn_index] or 
+        game_state.waiting_for_mcq_answer or
+        game_state.current_question_player):
         return
 
     chosen = update.message.text.strip()
-    if chosen not in question_pool or chosen in game_state["answered_questions"]:
-        await context.bot.send_message(chat_id=chat_id, text="Invalid or already used number. Try again.")
+    bank = game_bank(game_state)
+    if chosen not in bank.pool or int(chosen) not in game_state.available_questions:
+        await send_message(context.bot, chat_id=chat_id, text="Invalid or already used number. Try again.")
         return
 
-    question = question_pool[chosen]
-    game_state["answered_questions"].add(chosen)
-    game_state["current_question_player"] = update.effective_user.id  # Set who should answer this question
+    question = bank.pool[chosen]
+    user_data = get_user_data(chat_id, update.effective_user.id)
+    game_state.available_questions.remove(int(chosen))
+    game_state.current_question_player = update.effective_user.id  # Set who should answer this question
 
-    if question["type"] == "mcq":
-        options = question["options"]
-        lettered_options = [f"{chr(97 + i)}) {opt}" for i, opt in enumerate(options)]
-        question_text = f"{question['question']}\nOptions:\n" + "\n".join(lettered_options)
-        msg = await context.bot.send_message(chat_id=chat_id, text=question_text)
+    if question.type == "mcq":
+        markup = answer_keyboard(question)
+        msg = await send_message(context.bot, chat_id=chat_id, text=question.prompt, reply_markup=markup,
+                                 priority=PRIORITY_HIGH)
         
-        # Set up answer checking data for the CURRENT player only
-        user_data["current_answer"] = question["answer"].strip().lower()
-        user_data["options_map"] = {
-            chr(97 + i): opt.strip().lower() for i, opt in enumerate(options)
-        }
-        # Also include uppercase letters for user input flexibility
-        user_data["options_map"].update({
-            chr(65 + i): opt.strip().lower() for i, opt in enumerate(options)
-        })
+        # Answer checking for the CURRENT player only
+        user_data.current_question = question.id
         
         # Set state to wait for MCQ answer
-        game_state["waiting_for_mcq_answer"] = True
+        game_state.waiting_for_mcq_answer = True
         
         # Start timer
-        game_state["mcq_timer_task"] = asyncio.create_task(handle_mcq_timeout(context, chat_id, msg.message_id, question_text))
+        game_state.mcq_timer = timer_scheduler.schedule(
+            context.bot, chat_id, msg.message_id, question.prompt, QUESTION_SECONDS,
+            partial(handle_mcq_timeout, context, chat_id), markup
+        )
 
-    elif question["type"] == "paragraph":
-        question_text = f"{question['question']} (You have 30 seconds to respond.)"
-        msg = await context.bot.send_message(chat_id=chat_id, text=question_text)
+    elif question.type == "paragraph":
+        msg = await send_message(context.bot, chat_id=chat_id, text=question.prompt, priority=PRIORITY_HIGH)
         
         # Set up paragraph answer waiting for the CURRENT player only
-        user_data["waiting_for_paragraph"] = True
+        user_data.current_question = question.id
+        user_data.waiting_for_paragraph = True
         
         # Start paragraph timer
-        user_data["paragraph_timer_task"] = asyncio.create_task(
-            handle_paragraph_timeout(context, chat_id, msg.message_id, question_text)
+        user_data.paragraph_timer = timer_scheduler.schedule(
+            context.bot, chat_id, msg.message_id, question.prompt, QUESTION_SECONDS,
+            partial(handle_paragraph_timeout, context, chat_id)
         )
     
-    save_game_state()
+    save_game_state(chat_id)
 
 async def handle_speed_round_answer(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle speed-round answer: keep timer running until correct."""
     chat_id = update.effective_chat.id
     game_state = get_game_state(chat_id)
 
-    if not game_state["tiebreaker_state"]["waiting_for_speed_answer"]:
+    if not game_state.tiebreaker_state.waiting_for_speed_answer:
         return
 
-    question = game_state["tiebreaker_state"]["speed_round_question"]
+    question = game_bank(game_state).get(game_state.tiebreaker_state.speed_round_question)
+    if question is None:
+        return
     user = update.effective_user
-    user_response = update.message.text.strip()
 
-    # Normalise the response exactly like before
-    options = question["options"]
-    options_map = {chr(97 + i): opt.strip().lower() for i, opt in enumerate(options)}
-    options_map.update({chr(65 + i): opt.strip().lower() for i, opt in enumerate(options)})
+    if question.is_correct(update.message.text):
+        await win_speed_round(context, chat_id, user)
+        return
 
-    normalised = user_response.replace(" ", "").lower()
-    chosen = options_map.get(normalised, normalised)
-    correct = question["answer"].strip().lower()
+    # ❌ Wrong answer → timer continues, nothing else happens
+    await send_message(
+        context.bot,
+        chat_id=chat_id,
+        text=f"❌ {user.first_name}, that's wrong – keep trying!",
+        priority=PRIORITY_HIGH
+    )
 
-    if chosen == correct:
-        # ✅ First correct answer → stop everything
-        if game_state["tiebreaker_state"]["speed_timer_task"] and not game_state["tiebreaker_state"]["speed_timer_task"].done():
-            game_state["tiebreaker_state"]["speed_timer_task"].cancel()
+async def queue_paragraph_answer(update: Update, context: ContextTypes.DEFAULT_TYPE, user_data: PlayerSession):
+    """Review-queue mode: file the answer for the admins and move on to the next turn"""
+    chat_id = update.effective_chat.id
+    game_state = get_game_state(chat_id)
+    user = update.effective_user
 
-        game_state["tiebreaker_state"]["waiting_for_speed_answer"] = False
-        game_state["tiebreaker_state"]["in_progress"] = False
+    review_id = game_state.next_review_id
+    game_state.next_review_id += 1
+    game_state.review_queue[review_id] = QueuedReview(user.id, user_data.current_question, update.message.text)
+    game_state.score_version += 1  # the board shows queued answers
+    user_data.waiting_for_paragraph = False
 
-        await context.bot.send_message(
-            chat_id=chat_id,
-            text=f"⚡ **{user.first_name}** got it first and wins the speed round!"
-        )
-        save_game_state()
-        return
+    question = game_bank(game_state).get(user_data.current_question)
+    question_line = f"Q: {question.text}\n" if question else ""
+    await send_message(
+        context.bot,
+        chat_id=chat_id,
+        text=f"📝 Review #{review_id} — {user.first_name}'s answer:\n{question_line}A: \"{update.message.text}\"\n\n"
+             f"Admins: /approve {review_id} or /reject {review_id}. The game carries on meanwhile."
+    )
 
-    # ❌ Wrong answer → timer continues, nothing else happens
-    await context.bot.send_message(
+    game_state.current_question_player = None
+    game_state.current_turn_index += 1
+    save_game_state(chat_id)
+    await next_turn(context, chat_id)
+
+async def win_speed_round(context: ContextTypes.DEFAULT_TYPE, chat_id: int, user):
+    """First correct speed-round answer: stop everything"""
+    game_state = get_game_state(chat_id)
+    if game_state.tiebreaker_state.speed_timer and not game_state.tiebreaker_state.speed_timer.done():
+        game_state.tiebreaker_state.speed_timer.cancel()
+
+    game_state.tiebreaker_state.waiting_for_speed_answer = False
+    game_state.tiebreaker_state.in_progress = False
+
+    await send_message(
+        context.bot,
         chat_id=chat_id,
-        text=f"❌ {user.first_name}, that's wrong – keep trying!"
+        text=f"⚡ **{user.first_name}** got it first and wins the speed round!",
+        priority=PRIORITY_HIGH
     )
+    save_game_state(chat_id)
+    question = game_bank(game_state).get(game_state.tiebreaker_state.speed_round_question)
+    # The speed round's own text is Markdown, which edit_message doesn't send
+    await drop_answer_buttons(context.bot, game_state.tiebreaker_state.speed_timer, question.prompt if question else None)
 
 async def handle_tiebreaker_paragraph(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle paragraph answer during tiebreaker"""
     chat_id = update.effective_chat.id
-    await context.bot.send_message(
+    await send_message(
+        context.bot,
         chat_id=chat_id,
         text=f"📝 {update.effective_user.first_name}'s tiebreaker answer received: \"{update.message.text}\"\n\nAdmin can use /approve {update.effective_user.first_name} to declare them the winner, or wait for other answers."
     )
 
-async def handle_paragraph_timeout(context: ContextTypes.DEFAULT_TYPE, chat_id: int, message_id: int, original_text: str):
+async def handle_paragraph_timeout(context: ContextTypes.DEFAULT_TYPE, chat_id: int, timer: TimerHandle):
     """Handle paragraph timeout"""
     game_state = get_game_state(chat_id)
-    try:
-        await show_timer(context, chat_id, message_id, 30, original_text)
-        await asyncio.sleep(1)
+
+    # Find the user who was supposed to answer using current_question_player
+    if game_state.current_question_player:
+        # Clear waiting state for this user
+        user_data = get_user_data(chat_id, game_state.current_question_player)
+        user_data.waiting_for_paragraph = False
+
+        user = await get_user(context.bot, game_state.current_question_player)
+        await send_message(
+            context.bot,
+            chat_id=chat_id, 
+            text=f"⏰ Time's up, {user.first_name}! Moving to next turn.",
+            priority=PRIORITY_HIGH
+        )
+    
+    game_state.current_question_player = None
+    game_state.current_turn_index += 1
+    save_game_state(chat_id)
+    await next_turn(context, chat_id)
+
+async def handle_mcq_timeout(context: ContextTypes.DEFAULT_TYPE, chat_id: int, timer: TimerHandle):
+    """Handle MCQ timeout"""
+    game_state = get_game_state(chat_id)
+    if game_state.waiting_for_mcq_answer:
+        game_state.waiting_for_mcq_answer = False
         
         # Find the user who was supposed to answer using current_question_player
-        if game_state["current_question_player"]:
-            user = await context.bot.get_chat(game_state["current_question_player"])
-            await context.bot.send_message(
+        if game_state.current_question_player:
+            user = await get_user(context.bot, game_state.current_question_player)
+            user_data = get_user_data(chat_id, game_state.current_question_player)
+            question = game_bank(game_state).get(user_data.current_question)
+            correct_answer = question.answer if question else "unknown"
+            await send_message(
+                context.bot,
                 chat_id=chat_id, 
-                text=f"⏰ Time's up, {user.first_name}! Moving to next turn."
+                text=f"⏰ Time's up, {user.first_name}! The correct answer was: {correct_answer}",
+                priority=PRIORITY_HIGH
             )
-            
-            # Clear waiting state for this user
-            user_data = get_user_data(chat_id, game_state["current_question_player"])
-            user_data["waiting_for_paragraph"] = False
         
-        game_state["current_question_player"] = None
-        game_state["current_turn_index"] += 1
-        save_game_state()
+        game_state.current_question_player = None
+        game_state.current_turn_index += 1
+        save_game_state(chat_id)
         await next_turn(context, chat_id)
-    except asyncio.CancelledError:
-        pass
-
-async def handle_mcq_timeout(context: ContextTypes.DEFAULT_TYPE, chat_id: int, message_id: int, original_text: str):
-    """Handle MCQ timeout"""
-    game_state = get_game_state(chat_id)
-    try:
-        await show_timer(context, chat_id, message_id, 30, original_text)
-        await asyncio.sleep(1)
-        
-        if game_state["waiting_for_mcq_answer"]:
-            game_state["waiting_for_mcq_answer"] = False
-            
-            # Find the user who was supposed to answer using current_question_player
-            if game_state["current_question_player"]:
-                user = await context.bot.get_chat(game_state["current_question_player"])
-                user_data = get_user_data(chat_id, game_state["current_question_player"])
-                correct_answer = user_data.get("current_answer", "")
-                await context.bot.send_message(
-                    chat_id=chat_id, 
-                    text=f"⏰ Time's up, {user.first_name}! The correct answer was: {correct_answer}"
-                )
-            
-            game_state["current_question_player"] = None
-            game_state["current_turn_index"] += 1
-            save_game_state()
-            await next_turn(context, chat_id)
-    except asyncio.CancelledError:
-        pass
 
 async def check_mcq_answer(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
@@ -894,144 +3258,118 @@ async def check_mcq_answer(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     user = update.effective_user
     user_id = user.id
-    correct_answer = user_data.get("current_answer", "").strip().lower()
-    options_map = user_data.get("options_map", {})
-    user_response = update.message.text.strip()
-
-    # Normalize user response - remove whitespace and convert to lowercase
-    normalized_response = user_response.replace(" ", "").lower()
-    
-    # Check if user typed a letter (a, b, c, d)
-    if normalized_response in options_map:
-        interpreted_response = options_map[normalized_response]
-    else:
-        # User typed the actual answer, normalize it
-        interpreted_response = normalized_response
+    question = game_bank(game_state).get(user_data.current_question)
+    if question is None:
+        return
 
-    if interpreted_response == correct_answer:
-        game_state["player_scores"][user_id] += 1
-        await context.bot.send_message(chat_id=chat_id, text=f"✅ {user.first_name}, that's correct!")
+    # A letter (a, b, c, d) or the answer typed out
+    if question.is_correct(update.message.text):
+        add_score(game_state, user_id)
+        await send_message(context.bot, chat_id=chat_id, text=f"✅ {user.first_name}, that's correct!", priority=PRIORITY_HIGH)
     else:
-        await context.bot.send_message(chat_id=chat_id, text=f"❌ {user.first_name}, that's incorrect. The correct answer was: {correct_answer}")
-
-async def show_timer(context: ContextTypes.DEFAULT_TYPE, chat_id: int, message_id: int, duration: int, original_text: str):
-    for remaining in range(duration, 0, -10):
-        await context.bot.edit_message_text(
-            chat_id=chat_id,
-            message_id=message_id,
-            text=f"{original_text}\n\n⏳ {remaining} seconds left..."
-        )
-        await asyncio.sleep(10)
-    await context.bot.edit_message_text(
-        chat_id=chat_id,
-        message_id=message_id,
-        text=f"{original_text}\n\n⏰ Time's up!"
-    )
+        await send_message(context.bot, chat_id=chat_id, text=f"❌ {user.first_name}, that's incorrect. The correct answer was: {question.answer}", priority=PRIORITY_HIGH)
 
 async def show_leaderboard(context: ContextTypes.DEFAULT_TYPE, chat_id: int, is_final=False):
     """Show current leaderboard"""
     game_state = get_game_state(chat_id)
     
-    leaderboard = sorted(game_state["player_scores"].items(), key=lambda x: x[1], reverse=True)
     title = "🏆 Final Leaderboard:" if is_final else "📊 Current Leaderboard:"
-    result = [title]
-    for i, (uid, score) in enumerate(leaderboard):
-        name = (await context.bot.get_chat(uid)).first_name
-        result.append(f"{i+1}. {name} — {score} point(s)")
-    await context.bot.send_message(chat_id=chat_id, text="\n".join(result))
+    result = [title] + await render_score_lines(context.bot, game_state, "leaderboard")
+    await send_message(context.bot, chat_id=chat_id, text="\n".join(result))
 
 async def end_quiz(context: ContextTypes.DEFAULT_TYPE, chat_id: int):
     game_state = get_game_state(chat_id)
-    game_state["in_progress"] = False
+    game_state.in_progress = False
+    if game_state.review_queue:
+        # Results wait for the last reviews; resolving them calls us again
+        await show_leaderboard(context, chat_id)
+        await send_message(
+            context.bot,
+            chat_id=chat_id,
+            text=f"🏁 That was the last turn! Final results once the admins review "
+                 f"{len(game_state.review_queue)} more answer(s)."
+        )
+        save_game_state(chat_id)
+        return
     await show_leaderboard(context, chat_id, is_final=True)
     
     # Check for tie
     tied_players = detect_tie(chat_id)
     if tied_players:
-        tied_names = []
-        for uid in tied_players:
-            try:
-                user = await context.bot.get_chat(uid)
-                tied_names.append(user.first_name)
-            except:
-                tied_names.append(f"User {uid}")
+        tied_names = await display_names(context.bot, tied_players)
         
-        await context.bot.send_message(
+        await send_message(
+            context.bot,
             chat_id=chat_id,
             text=f"🤝 **TIE DETECTED!**\n\nTied players: {', '.join(tied_names)}\n\nAdmin can use /tiebreaker to start tiebreaker rounds."
         )
     
-    save_game_state()
+    save_game_state(chat_id)
 
 async def approve(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not update.message or not update.effective_user:
         return
     
     if not is_admin(update.effective_user.id):
-        await update.message.reply_text("Only admins can approve answers.")
+        await reply(update, context, "Only admins can approve answers.")
         return
     
     chat_id = update.effective_chat.id
     game_state = get_game_state(chat_id)
     
     # Handle tiebreaker paragraph approval
-    if game_state["tiebreaker_state"]["in_progress"] and game_state["tiebreaker_state"]["current_phase"] == "paragraph":
+    if game_state.tiebreaker_state.in_progress and game_state.tiebreaker_state.current_phase == "paragraph":
         # Extract player name from command if provided (e.g., "/approve John")
         command_parts = update.message.text.split()
         if len(command_parts) > 1:
             winner_name = " ".join(command_parts[1:])
             # Find player by name
             winner_id = None
-            for uid in game_state["tiebreaker_state"]["tied_players"]:
-                try:
-                    user = await context.bot.get_chat(uid)
-                    if user.first_name.lower() == winner_name.lower():
-                        winner_id = uid
-                        break
-                except:
-                    continue
+            tied_players = game_state.tiebreaker_state.tied_players
+            for uid, user in zip(tied_players, await get_users(context.bot, tied_players)):
+                if user and user.first_name.lower() == winner_name.lower():
+                    winner_id = uid
+                    break
             
             if winner_id:
-                game_state["tiebreaker_state"]["in_progress"] = False
-                user = await context.bot.get_chat(winner_id)
-                await context.bot.send_message(
+                game_state.tiebreaker_state.in_progress = False
+                user = await get_user(context.bot, winner_id)
+                await send_message(
+                    context.bot,
                     chat_id=chat_id,
-                    text=f"🏆 **TIEBREAKER WINNER!**\n\n{user.first_name} wins the quiz!"
+                    text=f"🏆 **TIEBREAKER WINNER!**\n\n{user.first_name} wins the quiz!",
+                    priority=PRIORITY_HIGH
                 )
-                save_game_state()
+                save_game_state(chat_id)
                 return
             else:
-                await update.message.reply_text(f"Player '{winner_name}' not found in tied players.")
+                await reply(update, context, f"Player '{winner_name}' not found in tied players.")
                 return
         else:
-            await update.message.reply_text("Please specify the winner: /approve [player_name]")
+            await reply(update, context, "Please specify the winner: /approve [player_name]")
             return
     
     # Handle regular paragraph approval
-    if not game_state["review_state"]["awaiting_admin_review"]:
-        await update.message.reply_text("No answer is currently awaiting review.")
+    if not game_state.review_state.awaiting_admin_review:
+        await resolve_queued_reviews(update, context, approved=True)
         return
         
-    user_id = game_state["review_state"]["responding_user_id"]
+    user_id = game_state.review_state.responding_user_id
     if not user_id:
-        await update.message.reply_text("Error: No user found for this review.")
+        await reply(update, context, "Error: No user found for this review.")
         return
         
-    game_state["player_scores"][user_id] += 1
-    user = await context.bot.get_chat(user_id)
-    await context.bot.send_message(chat_id=chat_id, text=f"✅ {user.first_name}'s answer has been approved.")
+    add_score(game_state, user_id)
+    user = await get_user(context.bot, user_id)
+    await send_message(context.bot, chat_id=chat_id, text=f"✅ {user.first_name}'s answer has been approved.", priority=PRIORITY_HIGH)
     
     # Clear review state
-    game_state["review_state"] = {
-        "awaiting_admin_review": False,
-        "responding_user_id": None,
-        "paragraph_answer": None
-    }
+    game_state.review_state = ReviewState()
     
     # Move to next turn
-    game_state["current_question_player"] = None
-    game_state["current_turn_index"] += 1
-    save_game_state()
+    game_state.current_question_player = None
+    game_state.current_turn_index += 1
+    save_game_state(chat_id)
     await next_turn(context, chat_id)
 
 async def reject(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -1039,143 +3377,341 @@ async def reject(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     
     if not is_admin(update.effective_user.id):
-        await update.message.reply_text("Only admins can reject answers.")
+        await reply(update, context, "Only admins can reject answers.")
         return
     
     chat_id = update.effective_chat.id
     game_state = get_game_state(chat_id)
     
-    if not game_state["review_state"]["awaiting_admin_review"]:
-        await update.message.reply_text("No answer is currently awaiting review.")
+    if not game_state.review_state.awaiting_admin_review:
+        await resolve_queued_reviews(update, context, approved=False)
         return
         
-    user_id = game_state["review_state"]["responding_user_id"]
+    user_id = game_state.review_state.responding_user_id
     if not user_id:
-        await update.message.reply_text("Error: No user found for this review.")
+        await reply(update, context, "Error: No user found for this review.")
         return
         
-    user = await context.bot.get_chat(user_id)
-    await context.bot.send_message(chat_id=chat_id, text=f"❌ {user.first_name}'s answer has been rejected.")
+    user = await get_user(context.bot, user_id)
+    await send_message(context.bot, chat_id=chat_id, text=f"❌ {user.first_name}'s answer has been rejected.", priority=PRIORITY_HIGH)
     
     # Clear review state
-    game_state["review_state"] = {
-        "awaiting_admin_review": False,
-        "responding_user_id": None,
-        "paragraph_answer": None
-    }
+    game_state.review_state = ReviewState()
     
     # Move to next turn
-    game_state["current_question_player"] = None
-    game_state["current_turn_index"] += 1
-    save_game_state()
+    game_state.current_question_player = None
+    game_state.current_turn_index += 1
+    save_game_state(chat_id)
     await next_turn(context, chat_id)
 
+async def resolve_queued_reviews(update: Update, context: ContextTypes.DEFAULT_TYPE, approved: bool):
+    """/approve or /reject queued answers: by id (/approve 3 5 7), all, or the only one"""
+    chat_id = update.effective_chat.id
+    game_state = get_game_state(chat_id)
+    queue = game_state.review_queue
+    if not queue:
+        await reply(update, context, "No answer is currently awaiting review.")
+        return
+
+    command = "/approve" if approved else "/reject"
+    args = [arg.lstrip("#").lower() for arg in context.args]
+    if not args and len(queue) > 1:
+        names = await display_names(context.bot, [review.user_id for review in queue.values()])
+        lines = [f"{len(queue)} answers are awaiting review:"]
+        lines += [f"#{review_id} {name}: \"{review.answer[:80]}\"" for (review_id, review), name in zip(queue.items(), names)]
+        lines.append(f"Use {command} with their numbers, e.g. {command} {' '.join(map(str, list(queue)[:3]))}, or {command} all.")
+        await reply(update, context, "\n".join(lines))
+        return
+
+    if not args or args == ["all"]:
+        review_ids, unknown = list(queue), []
+    else:
+        review_ids = list(dict.fromkeys(int(arg) for arg in args if arg.isdecimal() and int(arg) in queue))
+        unknown = [arg for arg in args if not (arg.isdecimal() and int(arg) in queue)]
+    if not review_ids:
+        await reply(update, context, f"Not in the review queue: {', '.join(unknown)}")
+        return
+
+    resolved = [(review_id, queue.pop(review_id)) for review_id in review_ids]
+    for _, review in resolved:
+        if approved and review.user_id in game_state.player_scores:
+            add_score(game_state, review.user_id)
+    game_state.score_version += 1  # the queued answers leave the board either way
+    names = await display_names(context.bot, [review.user_id for _, review in resolved])
+    verdict = "✅ Approved" if approved else "❌ Rejected"
+    text = f"{verdict}: " + ", ".join(f"#{review_id} {name}" for (review_id, _), name in zip(resolved, names))
+    if unknown:
+        text += f"\nNot in the review queue: {', '.join(unknown)}"
+    save_game_state(chat_id)
+    await send_message(context.bot, chat_id=chat_id, text=text, priority=PRIORITY_HIGH)
+
+    if not queue and not game_state.in_progress and not game_state.tiebreaker_state.in_progress:
+        # The last turn was played while these were queued
+        await end_quiz(context, chat_id)
+
 async def remove_player(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """/remove <first_name|@username> — admin only"""
     if not update.message or not update.effective_user:
         return
     if not is_admin(update.effective_user.id):
-        await update.message.reply_text("Only admins can remove players.")
+        await reply(update, context, "Only admins can remove players.")
         return
 
     chat_id = update.effective_chat.id
     game_state = get_game_state(chat_id)
-    if not game_state["active_players"]:
-        await update.message.reply_text("No players in the game.")
+    if not game_state.active_players:
+        await reply(update, context, "No players in the game.")
         return
 
     # Extract the name/username to remove
     if not context.args:
-        await update.message.reply_text("Usage: /remove <first_name|@username>")
+        await reply(update, context, "Usage: /remove <first_name|@username>")
         return
     target = " ".join(context.args).lstrip("@").lower()
 
     # Find matching user
     victim_id = None
-    victim_index = None
-    for i, uid in enumerate(game_state["active_players"]):
-        try:
-            user = await context.bot.get_chat(uid)
-            # compare first name OR username
-            if user.first_name.lower() == target or (user.username and user.username.lower() == target):
-                victim_id = uid
-                victim_index = i
-                break
-        except Exception:
-            continue
-
-    if victim_id is None:
-        await update.message.reply_text(f"Player '{target}' not found.")
+    players = list(game_state.active_players)
+    for uid, user in zip(players, await get_users(context.bot, players)):
+        # compare first name OR username
+        if user and (user.first_name.lower() == target or (user.username and user.username.lower() == target)):
+            victim_id = uid
+            break
+
+    if victim_id is None or victim_id not in game_state.active_players:
+        await reply(update, context, f"Player '{target}' not found.")
         return
+    victim_index = game_state.active_players.index(victim_id)
 
     # Check if this player was currently answering a question
-    was_current_player = (game_state["current_question_player"] == victim_id)
-    was_awaiting_review = (game_state["review_state"]["awaiting_admin_review"] and 
-                          game_state["review_state"]["responding_user_id"] == victim_id)
+    was_current_player = (game_state.current_question_player == victim_id)
+    was_awaiting_review = (game_state.review_state.awaiting_admin_review and 
+                          game_state.review_state.responding_user_id == victim_id)
 
     # ---- actual removal ----
-    game_state["active_players"].remove(victim_id)
-    game_state["player_scores"].pop(victim_id, None)
-    game_state["user_data"].pop(victim_id, None)
+    game_state.active_players.remove(victim_id)
+    game_state.player_scores.pop(victim_id, None)
+    game_state.score_version += 1
+    game_state.user_data.pop(victim_id, None)
+    if game_state.open_round is not None:
+        game_state.open_round.answered.discard(victim_id)
+        game_state.open_round.correct = [(uid, points) for uid, points in game_state.open_round.correct if uid != victim_id]
+    had_queued_reviews = bool(game_state.review_queue)
+    for review_id in [review_id for review_id, review in game_state.review_queue.items() if review.user_id == victim_id]:
+        del game_state.review_queue[review_id]
 
     # If the removed player was the current question player, clear it
-    if game_state["current_question_player"] == victim_id:
-        game_state["current_question_player"] = None
-        game_state["waiting_for_mcq_answer"] = False
+    if game_state.current_question_player == victim_id:
+        game_state.current_question_player = None
+        game_state.waiting_for_mcq_answer = False
         # Cancel any active timers
-        if game_state["mcq_timer_task"] and not game_state["mcq_timer_task"].done():
-            game_state["mcq_timer_task"].cancel()
+        if game_state.mcq_timer and not game_state.mcq_timer.done():
+            game_state.mcq_timer.cancel()
 
     # Clear review state if this player was awaiting review
     if was_awaiting_review:
-        game_state["review_state"] = {
-            "awaiting_admin_review": False,
-            "responding_user_id": None,
-            "paragraph_answer": None
-        }
+        game_state.review_state = ReviewState()
 
     # Adjust current_turn_index if necessary
-    if victim_index < game_state["current_turn_index"]:
-        game_state["current_turn_index"] -= 1
-    elif victim_index == game_state["current_turn_index"]:
+    if victim_index < game_state.current_turn_index:
+        game_state.current_turn_index -= 1
+    elif victim_index == game_state.current_turn_index:
         # If we removed the player whose turn it currently is, don't increment
         pass
     
     # Ensure current_turn_index doesn't go out of bounds
-    if game_state["current_turn_index"] >= len(game_state["active_players"]) and game_state["active_players"]:
-        game_state["current_turn_index"] = 0
+    if game_state.current_turn_index >= len(game_state.active_players) and game_state.active_players:
+        game_state.current_turn_index = 0
     
-    save_game_state()
+    save_game_state(chat_id)
 
-    user = await context.bot.get_chat(victim_id)
-    await context.bot.send_message(
+    user = await get_user(context.bot, victim_id)
+    await send_message(
+        context.bot,
         chat_id=chat_id,
         text=f"🚫 {user.first_name} has been removed from the quiz."
     )
+    if was_current_player:
+        await drop_answer_buttons(context.bot, game_state.mcq_timer)
 
+    # If the game ended while their answers were queued, those were the last reviews
+    if (had_queued_reviews and not game_state.review_queue and
+            not game_state.in_progress and not game_state.tiebreaker_state.in_progress):
+        await end_quiz(context, chat_id)
+    # Open rounds have no turns; the question closes on its timer, or now if
+    # the removed player was the last one still to answer
+    elif game_state.open_round is not None:
+        open_round = game_state.open_round
+        if (game_state.in_progress and open_round.question_id is not None and game_state.player_scores and
+                len(open_round.answered) >= len(game_state.player_scores)):
+            await close_open_round(context, chat_id)
     # If the removed player was currently answering or awaiting review, move to next turn
-    if (game_state["in_progress"] and (was_current_player or was_awaiting_review)):
-        game_state["current_turn_index"] += 1
+    elif (game_state.in_progress and (was_current_player or was_awaiting_review)):
+        game_state.current_turn_index += 1
         await next_turn(context, chat_id)
     # If game in progress and no one is currently answering a question, move to next turn
-    elif (game_state["in_progress"] and 
-          not game_state["waiting_for_mcq_answer"] and 
-          not game_state["current_question_player"] and
-          not any(user_data.get("waiting_for_paragraph") for user_data in game_state["user_data"].values()) and
-          not game_state["review_state"]["awaiting_admin_review"]):
+    elif (game_state.in_progress and 
+          not game_state.waiting_for_mcq_answer and 
+          not game_state.current_question_player and
+          not any(user_data.waiting_for_paragraph for user_data in game_state.user_data.values()) and
+          not game_state.review_state.awaiting_admin_review):
         await next_turn(context, chat_id)
 
+async def on_startup(app):
+    """Load banks and state, then start background tasks, once the bot's event loop is running"""
+    global chat_evictor_task, bank_watcher_task, metrics_server
+    await bootstrap()
+    started = time.perf_counter()
+    resumed = resume_timers(app)
+    startup_timings["question timers"] = time.perf_counter() - started
+    if resumed:
+        print(f"Resumed {resumed} question timers in {startup_timings['question timers'] * 1000:.0f} ms")
+    start_state_flusher()
+    chat_evictor_task = asyncio.create_task(chat_evictor())
+    if BANK_RELOAD_INTERVAL > 0:
+        bank_watcher_task = asyncio.create_task(bank_watcher())
+    if metrics is not None:
+        metrics_server = await asyncio.start_server(serve_metrics, METRICS_LISTEN, METRICS_PORT)
+        print(f"Serving metrics on http://{METRICS_LISTEN}:{METRICS_PORT}/metrics")
+
+async def on_shutdown(app):
+    """Write out any state the flusher has not persisted yet"""
+    if metrics_server is not None:
+        metrics_server.close()
+    if outbound_queue is not None:
+        await outbound_queue.drain()
+    await stop_state_flusher()
+
+def application_builder():
+    builder = ApplicationBuilder().token(BOT_TOKEN).request(InstrumentedRequest(connection_pool_size=HTTP_POOL_SIZE))
+    if TELEGRAM_API_URL:
+        builder = builder.base_url(f"{TELEGRAM_API_URL}/bot").base_file_url(f"{TELEGRAM_API_URL}/file/bot")
+    return builder
+
+def update_handler(handler):
+    """Wrap a handler in every layer an update goes through: metrics, profiling and its chat's lock"""
+    return instrumented(profiled(per_chat(handler)))
+
+def build_application(updater=True):
+    """The bot application with every handler registered"""
+    builder = (
+        application_builder()
+        .concurrent_updates(
+            ChatUpdateProcessor(CONCURRENT_UPDATES, CONCURRENT_UPDATES * UPDATES_WAITING_FACTOR)
+            if CONCURRENT_UPDATES > 1 else False
+        )
+        .post_init(on_startup)
+        .post_shutdown(on_shutdown)
+    )
+    if not updater:
+        builder = builder.updater(None)  # updates are fed in by serve_shard()
+    app = builder.build()
+    commands = (
+        ("start", start),
+        ("join", join),
+        ("begin", begin),
+        ("stop", stop),
+        ("skip", skip),
+        ("status", status),
+        ("memory", memory),
+        ("bank", select_bank),
+        ("profile", profile_updates),
+        ("tiebreaker", tiebreaker),
+        ("approve", approve),
+        ("reject", reject),
+        ("remove", remove_player),
+    )
+    for command, handler in commands:
+        app.add_handler(CommandHandler(command, update_handler(handler)))
+    app.add_handler(MessageHandler(filters.TEXT & (~filters.COMMAND), update_handler(handle_message)))
+    app.add_handler(CallbackQueryHandler(update_handler(handle_answer_button), pattern=ANSWER_BUTTON_PATTERN))
+    return app
+
+def shard_for(chat_id):
+    return chat_id % SHARDS
+
+def shard_path(path, shard):
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard{shard}{ext}"
+
+async def route_update(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Front process: pass an update to the shard that owns its chat"""
+    chat = update.effective_chat
+    shard_queues[shard_for(chat.id) if chat else 0].put(update.to_dict())
+
+def run_shard(shard, updates):
+    """Worker process entry point: handle the chats of one shard"""
+    global STATE_FILE, STATE_JOURNAL_FILE, STATE_DB_FILE, METRICS_PORT
+    # The front process tells us when to stop, after the last routed update
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    STATE_FILE = shard_path(STATE_FILE, shard)
+    STATE_JOURNAL_FILE = shard_path(STATE_JOURNAL_FILE, shard)
+    STATE_DB_FILE = shard_path(STATE_DB_FILE, shard)
+    if METRICS_PORT:
+        METRICS_PORT += shard
+    if outbound_queue is not None:
+        # Telegram's global limit is per bot, so the shards split it
+        rate = OUTBOUND_GLOBAL_RATE / SHARDS
+        outbound_queue.global_bucket = TokenBucket(rate, rate)
+    asyncio.run(serve_shard(shard, updates))
+
+async def serve_shard(shard, updates):
+    app = build_application(updater=False)
+    loop = asyncio.get_running_loop()
+    async with app:
+        await on_startup(app)
+        await app.start()
+        print(f"Shard {shard}/{SHARDS} ready")
+        while (data := await loop.run_in_executor(None, updates.get)) is not None:
+            await app.update_queue.put(Update.de_json(data, app.bot))
+        await app.stop()
+        await on_shutdown(app)
+
+def start_shards():
+    for shard in range(SHARDS):
+        updates = multiprocessing.Queue()
+        process = multiprocessing.Process(target=run_shard, args=(shard, updates), name=f"quiz-shard-{shard}")
+        process.start()
+        shard_queues.append(updates)
+        shard_processes.append(process)
+
+async def stop_shards(app):
+    """Front process shutdown: let every shard finish its queue and save its state"""
+    for updates in shard_queues:
+        updates.put(None)
+    await asyncio.get_running_loop().run_in_executor(
+        None, lambda: [process.join() for process in shard_processes]
+    )
+
+def build_router():
+    """Front process for SHARDS > 1: receives every update and routes it by chat"""
+    app = application_builder().post_shutdown(stop_shards).build()
+    app.add_handler(TypeHandler(Update, route_update))
+    return app
+
 if __name__ == "__main__":
-    app = ApplicationBuilder().token(BOT_TOKEN).build()
-    app.add_handler(CommandHandler("start", start))
-    app.add_handler(CommandHandler("join", join))
-    app.add_handler(CommandHandler("begin", begin))
-    app.add_handler(CommandHandler("stop", stop))
-    app.add_handler(CommandHandler("skip", skip))
-    app.add_handler(CommandHandler("status", status))
-    app.add_handler(CommandHandler("tiebreaker", tiebreaker))
-    app.add_handler(CommandHandler("approve", approve))
-    app.add_handler(CommandHandler("reject", reject))
-    app.add_handler(CommandHandler("remove", remove_player))
-    app.add_handler(MessageHandler(filters.TEXT & (~filters.COMMAND), handle_message))
-    app.run_polling()
\ No newline at end of file
+    if sys.argv[1:2] == ["convert-bank"]:
+        if len(sys.argv) != 4:
+            sys.exit(f"Usage: {sys.argv[0]} convert-bank BANK.json BANK.jsonl")
+        count = convert_bank(sys.argv[2], sys.argv[3])
+        print(f"Wrote {count} questions to {sys.argv[3]} (index: {sys.argv[3]}.idx)")
+        sys.exit()
+
+    if SHARDS > 1:
+        start_shards()
+        app = build_router()
+    else:
+        app = build_application()
+    if WEBHOOK_URL:
+        # Needs python-telegram-bot[webhooks]
+        app.run_webhook(
+            listen=WEBHOOK_LISTEN,
+            port=WEBHOOK_PORT,
+            url_path=WEBHOOK_PATH,
+            webhook_url=f"{WEBHOOK_URL}/{WEBHOOK_PATH}",
+            secret_token=WEBHOOK_SECRET,
+            max_connections=min(max(CONCURRENT_UPDATES, 40), 100),
+        )
+    else:
+        app.run_polling()
@@ -0,0 +1,47 @@
+import asyncio
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# The bot reads its configuration at import time
+os.environ.setdefault("ADMIN_ID", "1")
+os.environ["QUESTION_BANKS"] = os.path.join(ROOT, "tkh_quiz2.json")
+os.environ["BANK_RELOAD_INTERVAL"] = "0"
+os.environ["STATE_FLUSH_INTERVAL"] = "0"
+
+import pytest  # noqa: E402
+
+import telegram_quiz_bot as bot  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def banks():
+    asyncio.run(bot.load_banks())
+    return bot.question_banks
+
+
+@pytest.fixture
+def state_files(tmp_path, monkeypatch):
+    """Point every state backend at tmp_path and start with no chats loaded"""
+    monkeypatch.setattr(bot, "STATE_FILE", str(tmp_path / "game_states.pkl"))
+    monkeypatch.setattr(bot, "STATE_JOURNAL_FILE", str(tmp_path / "game_states.journal"))
+    monkeypatch.setattr(bot, "STATE_DB_FILE", str(tmp_path / "game_states.db"))
+    monkeypatch.setattr(bot, "state_db", None)
+    monkeypatch.setattr(bot, "journal_records", 0)
+    reset_chats()
+    yield tmp_path
+    if bot.state_db is not None:
+        bot.state_db.close()
+    reset_chats()
+
+
+def reset_chats():
+    bot.game_states.clear()
+    bot.cold_states.clear()
+    bot.chat_last_used.clear()
+    bot.dirty_chats.clear()
+    bot.chats_being_written.clear()
+    bot.journal_index.clear()
+    bot.chat_locks.clear()
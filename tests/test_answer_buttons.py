@@ -0,0 +1,99 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import telegram_quiz_bot as bot
+
+CHAT = -100
+QUESTION_MESSAGE = 500
+
+
+class FakeBot:
+    """Records every edit as (message_id, text, reply_markup)"""
+
+    def __init__(self):
+        self.edits = []
+        self.message_ids = 0
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.message_ids += 1
+        return SimpleNamespace(message_id=self.message_ids)
+
+    async def edit_message_text(self, chat_id, message_id, text, reply_markup=None, **kwargs):
+        self.edits.append((message_id, text, reply_markup))
+        return True
+
+    async def get_chat(self, user_id):
+        return SimpleNamespace(id=user_id, first_name=f"P{user_id}", username=None)
+
+
+@pytest.fixture
+def buttons(state_files, monkeypatch):
+    monkeypatch.setattr(bot, "INLINE_ANSWERS", True)
+    return state_files
+
+
+def mcq():
+    return next(question for question in bot.current_bank(None).questions if question.type == "mcq")
+
+
+def text_update(user_id, text):
+    return SimpleNamespace(
+        message=SimpleNamespace(message_id=QUESTION_MESSAGE + 1, text=text),
+        effective_user=SimpleNamespace(id=user_id, first_name=f"P{user_id}", username=None),
+        effective_chat=SimpleNamespace(id=CHAT, type="group"),
+        callback_query=None,
+    )
+
+
+def question_timer(fake, question, text=None):
+    return bot.timer_scheduler.schedule(fake, CHAT, QUESTION_MESSAGE, text or question.prompt, 30,
+                                        lambda handle: None, bot.answer_keyboard(question))
+
+
+def test_typed_answer_removes_the_buttons(buttons):
+    async def scenario():
+        fake, question = FakeBot(), mcq()
+        state = bot.get_game_state(CHAT)
+        state.active_players = [10, 11]
+        state.player_scores = {10: 0, 11: 0}
+        state.in_progress = True
+        state.available_questions = bot.QuestionRanges.full(len(bot.current_bank(None).pool))
+        state.waiting_for_mcq_answer = True
+        state.current_question_player = 10
+        bot.get_user_data(CHAT, 10).current_question = question.id
+        state.mcq_timer = question_timer(fake, question)
+        await bot.handle_message(text_update(10, "a"), SimpleNamespace(bot=fake))
+        assert fake.edits == [(QUESTION_MESSAGE, question.prompt, None)]
+
+    asyncio.run(scenario())
+
+
+def test_speed_round_win_removes_the_buttons(buttons):
+    async def scenario():
+        fake, question = FakeBot(), mcq()
+        tiebreaker = bot.get_game_state(CHAT).tiebreaker_state
+        tiebreaker.in_progress = True
+        tiebreaker.waiting_for_speed_answer = True
+        tiebreaker.speed_round_question = question.id
+        tiebreaker.speed_timer = question_timer(fake, question, text=f"⚡ **SPEED ROUND**\n{question.text}")
+        await bot.win_speed_round(SimpleNamespace(bot=fake), CHAT, SimpleNamespace(first_name="P10"))
+        assert fake.edits == [(QUESTION_MESSAGE, question.prompt, None)]
+        # Settled once: nothing more to take off
+        await bot.drop_answer_buttons(fake, tiebreaker.speed_timer)
+        assert len(fake.edits) == 1
+
+    asyncio.run(scenario())
+
+
+def test_timed_out_question_is_left_alone(buttons):
+    async def scenario():
+        fake, question = FakeBot(), mcq()
+        timer = question_timer(fake, question)
+        timer.cancel()
+        timer.fired = True  # its "Time's up!" edit went out first
+        await bot.drop_answer_buttons(fake, timer)
+        assert fake.edits == []
+
+    asyncio.run(scenario())
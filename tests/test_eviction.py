@@ -0,0 +1,59 @@
+import pytest
+
+import telegram_quiz_bot as bot
+
+
+@pytest.fixture
+def evict_now(state_files, monkeypatch):
+    monkeypatch.setattr(bot, "MIN_RESIDENT_SECONDS", 0)
+    monkeypatch.setattr(bot, "IDLE_CHAT_TTL", 0)
+    return state_files
+
+
+def saved_chat(chat_id, score, in_progress=False):
+    state = bot.get_game_state(chat_id)
+    state.player_scores[10] = score
+    state.in_progress = in_progress
+    bot.save_game_state(chat_id)
+    return state
+
+
+def test_journal_evicts_to_disk_and_reads_back(evict_now, monkeypatch):
+    monkeypatch.setattr(bot, "STATE_BACKEND", "journal")
+    saved_chat(1, 3)
+    saved_chat(2, 5)
+    assert bot.evict_idle_chats() == 2
+    assert not bot.game_states and not bot.cold_states
+    assert bot.has_saved_state(1)
+    assert bot.get_game_state(1).player_scores == {10: 3}
+
+
+def test_journal_compaction_keeps_evicted_chats(evict_now, monkeypatch):
+    monkeypatch.setattr(bot, "STATE_BACKEND", "journal")
+    saved_chat(1, 3)
+    bot.evict_idle_chats()
+    saved_chat(2, 5)
+    bot.save_game_state()  # full save: compacts, copying chat 1 from the old journal
+    bot.game_states.clear()
+    assert bot.get_game_state(1).player_scores == {10: 3}
+    assert bot.get_game_state(2).player_scores == {10: 5}
+
+
+def test_pickle_parks_evicted_chats_as_bytes(evict_now, monkeypatch):
+    monkeypatch.setattr(bot, "STATE_BACKEND", "pickle")
+    saved_chat(1, 3)
+    bot.evict_idle_chats()
+    assert list(bot.cold_states) == [1]
+    assert bot.get_game_state(1).player_scores == {10: 3}
+    assert not bot.cold_states
+
+
+def test_running_games_and_unwritten_chats_stay(evict_now, monkeypatch):
+    monkeypatch.setattr(bot, "STATE_BACKEND", "journal")
+    saved_chat(1, 3, in_progress=True)
+    saved_chat(2, 5)
+    bot.chats_being_written.add(2)
+    assert bot.evict_idle_chats() == 0
+    bot.chats_being_written.clear()
+    assert bot.evict_idle_chats() == 1
+    assert list(bot.game_states) == [1]
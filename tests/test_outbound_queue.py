@@ -0,0 +1,96 @@
+import asyncio
+
+from telegram.error import RetryAfter
+
+import telegram_quiz_bot as bot
+
+
+class FakeBot:
+    """Records sends; the first call for each text in retry_once raises RetryAfter"""
+
+    def __init__(self, retry_once=()):
+        self.started = []  # dispatch order
+        self.sent = []
+        self.retry_once = set(retry_once)
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.started.append(text)
+        await asyncio.sleep(0.01)
+        if text in self.retry_once:
+            self.retry_once.discard(text)
+            raise RetryAfter(0.05)
+        self.sent.append((chat_id, text))
+        return text
+
+    async def edit_message_text(self, chat_id, message_id, text, reply_markup=None):
+        self.started.append(text)
+        self.sent.append((chat_id, text))
+        return True
+
+
+def queue():
+    return bot.OutboundQueue(global_rate=1000, chat_per_minute=6000)
+
+
+def test_a_chats_messages_stay_in_order_across_retry_after():
+    async def run():
+        q, fake = queue(), FakeBot(retry_once={"x2"})
+        sends = [q.call(fake.send_message, {"chat_id": 1, "text": f"x{i}"}, 1) for i in range(1, 5)]
+        await asyncio.gather(*sends)
+        return fake.sent, q.retried
+    sent, retried = asyncio.run(run())
+    assert sent == [(1, "x1"), (1, "x2"), (1, "x3"), (1, "x4")]
+    assert retried == 1
+
+
+def test_higher_priority_goes_first():
+    async def run():
+        q, fake = queue(), FakeBot()
+        q.global_bucket.tokens = 0  # hold everything until the queue is full
+        calls = [
+            q.call(fake.send_message, {"chat_id": 1, "text": "normal"}, 1),
+            q.call(fake.send_message, {"chat_id": 2, "text": "high"}, 2, bot.PRIORITY_HIGH),
+        ]
+        q.edit_countdown(fake, 3, 7, "countdown")
+        await asyncio.gather(*calls)
+        await q.drain()
+        return fake.started
+    assert asyncio.run(run()) == ["high", "normal", "countdown"]
+
+
+def test_queued_countdown_edits_are_merged():
+    async def run():
+        q, fake = queue(), FakeBot()
+        q.global_bucket.tokens = 0
+        for remaining in (30, 20, 10):
+            q.edit_countdown(fake, 1, 7, f"{remaining} seconds left")
+        await q.drain()
+        return fake.sent, q.merged
+    sent, merged = asyncio.run(run())
+    assert sent == [(1, "10 seconds left")]
+    assert merged == 2
+
+
+def test_dropped_countdown_is_not_sent():
+    async def run():
+        q, fake = queue(), FakeBot()
+        q.global_bucket.tokens = 0
+        q.edit_countdown(fake, 1, 7, "20 seconds left")
+        q.drop_countdown(1, 7)
+        await q.call(fake.edit_message_text, {"chat_id": 1, "message_id": 7, "text": "verdict"}, 1, bot.PRIORITY_HIGH)
+        await q.drain()
+        return fake.sent
+    assert asyncio.run(run()) == [(1, "verdict")]
+
+
+def test_failures_reach_the_caller_and_are_counted():
+    async def fail(**kwargs):
+        raise ValueError("nope")
+
+    async def run():
+        q = queue()
+        try:
+            await q.call(fail, {}, 1)
+        except ValueError:
+            return q.failed
+    assert asyncio.run(run()) == 1
@@ -0,0 +1,66 @@
+import json
+import os
+
+import pytest
+
+import telegram_quiz_bot as bot
+from conftest import ROOT
+
+JSON_BANK = os.path.join(ROOT, "tkh_quiz2.json")
+
+
+@pytest.fixture
+def packed(tmp_path):
+    path = str(tmp_path / "bank.jsonl")
+    bot.convert_bank(JSON_BANK, path)
+    return path
+
+
+def load(path):
+    return bot.load_bank(path, os.path.getmtime(path))
+
+
+def test_packed_bank_matches_the_json_bank(packed):
+    expected = bot.load_bank(JSON_BANK, 0)
+    bank = load(packed)
+    assert len(bank.questions) == len(expected.questions)
+    assert [bank.questions[i] for i in range(len(bank.questions))] == list(expected.questions)
+    assert list(bank.pool) == list(expected.pool)
+    assert all(bank.pool[number] == expected.pool[number] for number in expected.pool)
+    assert tuple(bank.tiebreaker_mcq) == tuple(expected.tiebreaker_mcq)
+    assert tuple(bank.tiebreaker_paragraph) == tuple(expected.tiebreaker_paragraph)
+
+
+def test_pool_only_accepts_canonical_numbers(packed):
+    bank = load(packed)
+    assert "1" in bank.pool
+    assert "01" not in bank.pool and "0" not in bank.pool and "x" not in bank.pool
+    assert str(len(bank.pool) + 1) not in bank.pool
+
+
+def test_loaded_bank_survives_the_file_being_rewritten_in_place(packed):
+    bank = load(packed)
+    question = bank.questions[30]
+    bank.questions.cache.clear()
+    with open(packed, "w", encoding="utf-8") as f:
+        f.write('{"type": "mcq", "question": "short", "options": ["a"], "answer": "a"}\n')
+    assert bank.questions[30] == question
+
+
+def test_stale_index_is_rebuilt(packed):
+    mtime = os.path.getmtime(packed)
+    with open(JSON_BANK, encoding="utf-8") as f:
+        questions = json.load(f)[:5]
+    with open(packed, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(q) + "\n" for q in questions)
+    os.utime(packed, (mtime, mtime))  # same mtime, so the index looks current
+    bank = load(packed)
+    assert len(bank.questions) == 5
+    assert bank.questions[4].text == questions[4]["question"]
+
+
+def test_empty_bank_loads(tmp_path):
+    path = str(tmp_path / "empty.jsonl")
+    open(path, "w").close()
+    bank = load(path)
+    assert len(bank.questions) == 0 and len(bank.pool) == 0
@@ -0,0 +1,62 @@
+import random
+
+import telegram_quiz_bot as bot
+
+
+def runs(ranges):
+    return list(zip(ranges.starts, ranges.ends))
+
+
+def test_removing_splits_and_trims_runs():
+    ranges = bot.QuestionRanges.full(10)
+    assert ranges.remove(5)
+    assert runs(ranges) == [(1, 4), (6, 10)]
+    assert ranges.remove(1) and ranges.remove(10)
+    assert runs(ranges) == [(2, 4), (6, 9)]
+    assert not ranges.remove(5)
+    assert not ranges.remove(11)
+    assert len(ranges) == 7
+    assert 2 in ranges and 5 not in ranges
+    assert ranges.first() == 2
+
+
+def test_matches_a_set_under_random_removals():
+    rng = random.Random(7)
+    ranges, expected = bot.QuestionRanges.full(200), set(range(1, 201))
+    for number in rng.sample(range(0, 205), 180):
+        assert ranges.remove(number) == (number in expected)
+        expected.discard(number)
+        assert len(ranges) == len(expected)
+    assert [n for n in range(0, 205) if n in ranges] == sorted(expected)
+    assert ranges.first() == min(expected)
+
+
+def test_emptied_set_has_no_first():
+    ranges = bot.QuestionRanges.full(2)
+    ranges.remove(2)
+    ranges.remove(1)
+    assert len(ranges) == 0 and ranges.first() is None and runs(ranges) == []
+    assert bot.QuestionRanges.full(0).first() is None
+
+
+def test_from_answered_skips_non_numbers():
+    ranges = bot.QuestionRanges.from_answered(6, ["2", 3, "tiebreaker", "9"])
+    assert runs(ranges) == [(1, 1), (4, 6)]
+
+
+def test_render_cuts_long_lists_with_a_remainder():
+    ranges = bot.QuestionRanges.full(40)
+    ranges.remove(3)
+    assert ranges.render() == "1-2, 4-40"
+    for number in range(2, 41, 2):
+        ranges.remove(number)
+    rendered = ranges.render(max_chars=12)
+    assert rendered == "1, 5, 7, 9, … (15 more)"
+
+
+def test_tuple_round_trip():
+    ranges = bot.QuestionRanges.full(50)
+    for number in (7, 8, 30):
+        ranges.remove(number)
+    decoded = bot.QuestionRanges.from_tuple(ranges.to_tuple())
+    assert (decoded.total, runs(decoded), len(decoded)) == (50, runs(ranges), 47)
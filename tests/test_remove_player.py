@@ -0,0 +1,76 @@
+import asyncio
+from types import SimpleNamespace
+
+import telegram_quiz_bot as bot
+
+CHAT = -100
+PLAYERS = (10, 11, 12)
+
+
+class FakeBot:
+    """Records the texts sent and edited; every user is called P<id>"""
+
+    def __init__(self):
+        self.sent = []
+        self.message_ids = 0
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.sent.append(text)
+        self.message_ids += 1
+        return SimpleNamespace(message_id=self.message_ids)
+
+    async def edit_message_text(self, chat_id, message_id, text, **kwargs):
+        return True
+
+    async def get_chat(self, user_id):
+        return SimpleNamespace(id=user_id, first_name=f"P{user_id}", username=None)
+
+
+def open_round_game():
+    state = bot.get_game_state(CHAT)
+    state.active_players = list(PLAYERS)
+    state.player_scores = dict.fromkeys(PLAYERS, 0)
+    state.in_progress = True
+    state.available_questions = bot.QuestionRanges.full(len(bot.current_bank(None).pool))
+    state.open_round = bot.OpenRound()
+    return state
+
+
+def removal(user_id, fake):
+    update = SimpleNamespace(
+        message=SimpleNamespace(message_id=1),
+        effective_user=SimpleNamespace(id=bot.ADMIN_ID),
+        effective_chat=SimpleNamespace(id=CHAT, type="group"),
+    )
+    return bot.remove_player(update, SimpleNamespace(bot=fake, args=[f"P{user_id}"]))
+
+
+def test_removed_player_leaves_the_open_question(state_files):
+    async def scenario():
+        fake = FakeBot()
+        state = open_round_game()
+        await bot.next_open_question(SimpleNamespace(bot=fake), CHAT)
+        question = bot.game_bank(state).get(state.open_round.question_id)
+        await bot.record_open_answer(SimpleNamespace(bot=fake), CHAT, 10, question.answer)
+        await removal(10, fake)
+        assert state.open_round.answered == set()
+        assert state.open_round.correct == []
+        state.open_round.timer.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_removing_the_last_holdout_closes_the_open_question(state_files):
+    async def scenario():
+        fake = FakeBot()
+        state = open_round_game()
+        await bot.next_open_question(SimpleNamespace(bot=fake), CHAT)
+        first = state.open_round.question_id
+        await bot.record_open_answer(SimpleNamespace(bot=fake), CHAT, 10, "nonsense")
+        await bot.record_open_answer(SimpleNamespace(bot=fake), CHAT, 11, "nonsense")
+        await removal(12, fake)
+        assert state.open_round.question_id != first
+        assert any(text.endswith("0 correct, 2 wrong, 0 no answer") for text in fake.sent)
+        state.open_round.timer.cancel()
+
+    asyncio.run(scenario())
@@ -0,0 +1,118 @@
+import marshal
+import time
+
+import pytest
+
+import telegram_quiz_bot as bot
+
+PLAYERS = [10, 11]
+SCORES = {10: 3, 11: 1}
+
+
+def mcq():
+    return next(question for question in bot.current_bank().questions if question.type == "mcq")
+
+
+def encode(version, fields):
+    """A payload as the given format version wrote it; versions before 6 had no flags byte"""
+    flags = b"\0" if version >= 6 else b""
+    return bot.STATE_MAGIC + bytes([version]) + flags + marshal.dumps(tuple(fields), 4)
+
+
+def legacy_fields(version, question_id):
+    """GameState fields in the layout of format versions 2 to 8"""
+    fields = [
+        bot.pack_ids(PLAYERS),
+        bot.pack_ids(SCORES.keys()),
+        bot.pack_ids(SCORES.values()),
+        # Answered question numbers until version 4, then the available runs
+        ["1", "2"] if version < 4 else bot.QuestionRanges(20, [3], [20]).to_tuple(),
+        1,
+        True,
+        True,
+        True,
+        10,
+        (False, bot.pack_ids([]), None, None, False, None) + ((None,) if version >= 6 else ()),
+        (False, None, None),
+        {10: (False, question_id) + ((None,) if version >= 6 else ())},
+    ]
+    if version >= 3:
+        fields.append(0b101)
+    if version >= 5:
+        fields.append("science")
+    if version >= 6:
+        fields.append((time.time() + 30, 30, 77, "prompt"))
+    if version >= 7:
+        fields += [{4: (11, question_id, "an answer")}, 5]
+    if version >= 8:
+        fields.append(None)
+    return fields
+
+
+def test_version_1_resolves_stored_questions_to_ids(state_files):
+    question = mcq()
+    fields = legacy_fields(2, None)
+    fields[9] = (True, bot.pack_ids(PLAYERS), "speed", {"question": question.text}, True, None)
+    # Sessions held the MCQ's answer string and options instead of its id
+    fields[11] = {10: (False, question.answer, dict(zip("abcd", question.options)))}
+    state = bot.GameState.from_bytes(encode(1, fields))
+    assert state.tiebreaker_state.speed_round_question == question.id
+    assert state.user_data[10].current_question == question.id
+    assert state.available_questions.first() == 3
+    assert len(state.available_questions) == len(bot.current_bank().pool) - 2
+
+
+@pytest.mark.parametrize("version", range(2, 9))
+def test_older_versions_decode_with_defaults_for_newer_fields(state_files, version):
+    question = mcq()
+    state = bot.GameState.from_bytes(encode(version, legacy_fields(version, question.id)))
+    assert state.active_players == PLAYERS
+    assert state.player_scores == SCORES
+    assert state.available_questions.first() == 3
+    assert (state.current_turn_index, state.in_progress, state.current_question_player) == (1, True, 10)
+    assert state.user_data[10].current_question == question.id
+    assert state.used_tiebreaker_mcq == (0b101 if version >= 3 else 0)
+    assert state.bank_name == ("science" if version >= 5 else None)
+    # Games saved before version 9 are taken to run on the chat's current pick
+    assert state.game_bank_name == state.bank_name
+    assert (state.mcq_timer is not None) == (version >= 6)
+    if version >= 7:
+        assert state.review_queue == {4: bot.QueuedReview(11, question.id, "an answer")}
+        assert state.next_review_id == 5
+    else:
+        assert state.review_queue == {} and state.next_review_id == 1
+    assert state.open_round is None
+
+
+def test_current_version_round_trips(state_files):
+    question = mcq()
+    state = bot.GameState(
+        active_players=list(PLAYERS),
+        player_scores=dict(SCORES),
+        available_questions=bot.QuestionRanges(20, [3, 9], [5, 20]),
+        in_progress=True,
+        used_tiebreaker_mcq=0b11,
+        bank_name="science",
+        game_bank_name="history",
+        review_queue={2: bot.QueuedReview(10, question.id, "text")},
+        next_review_id=3,
+        open_round=bot.OpenRound(question.id, {10}, [(10, 4)]),
+    )
+    state.mcq_timer = bot.TimerHandle.dormant((time.time() + 30, 30, 77, "prompt"))
+    data = state.to_bytes()
+    assert data[len(bot.STATE_MAGIC)] == bot.STATE_FORMAT_VERSION
+    assert data[len(bot.STATE_MAGIC) + 1] == bot.STATE_HAS_TIMERS
+    decoded = bot.GameState.from_bytes(data)
+    assert decoded.available_questions.to_tuple() == state.available_questions.to_tuple()
+    assert (decoded.bank_name, decoded.game_bank_name) == ("science", "history")
+    assert decoded.review_queue == state.review_queue
+    assert (decoded.open_round.question_id, decoded.open_round.answered, decoded.open_round.correct) == (
+        question.id, {10}, [(10, 4)])
+    assert decoded.mcq_timer.to_tuple() == state.mcq_timer.to_tuple()
+
+
+def test_unknown_versions_are_rejected(state_files):
+    with pytest.raises(ValueError):
+        bot.GameState.from_bytes(encode(bot.STATE_FORMAT_VERSION + 1, ()))
+    with pytest.raises(ValueError):
+        bot.GameState.from_bytes(b"not a state")
@@ -0,0 +1,88 @@
+import os
+import pickle
+
+import pytest
+
+import telegram_quiz_bot as bot
+from conftest import reset_chats
+
+
+@pytest.fixture
+def journal(state_files, monkeypatch):
+    monkeypatch.setattr(bot, "STATE_BACKEND", "journal")
+    monkeypatch.setattr(bot, "JOURNAL_COMPACT_EVERY", 4)
+    return state_files
+
+
+def set_score(chat_id, score):
+    state = bot.get_game_state(chat_id)
+    state.player_scores[10] = score
+    bot.save_game_state(chat_id)
+
+
+def reload_chats():
+    reset_chats()
+    bot.hydrate_game_states(bot.read_game_states())
+
+
+def journal_chat_ids():
+    ids = []
+    with open(bot.STATE_JOURNAL_FILE, "rb") as f:
+        while True:
+            try:
+                ids.append(pickle.load(f)[0])
+            except EOFError:
+                return ids
+
+
+def test_replay_restores_the_newest_state_of_each_chat(journal):
+    for score in range(3):
+        set_score(1, score)
+    set_score(2, 7)
+    reload_chats()
+    assert bot.get_game_state(1).player_scores == {10: 2}
+    assert bot.get_game_state(2).player_scores == {10: 7}
+
+
+def test_compaction_leaves_one_record_per_chat(journal):
+    for score in range(5):
+        set_score(1, score)
+        set_score(2, score * 10)
+    assert len(journal_chat_ids()) < 10  # compacted at the 4th and 8th save
+    assert not os.path.exists(bot.STATE_FILE)
+    reload_chats()
+    assert bot.get_game_state(1).player_scores == {10: 4}
+    assert bot.get_game_state(2).player_scores == {10: 40}
+
+
+def test_compaction_is_a_single_atomic_file(journal):
+    """The newest state of every chat is in the compacted journal itself"""
+    for score in range(4):
+        set_score(1, score)
+    assert bot.journal_records == 0
+    assert journal_chat_ids() == ["1"]
+    with open(bot.STATE_JOURNAL_FILE, "rb") as f:
+        assert bot.decode_state(pickle.load(f)[1]).player_scores == {10: 3}
+
+
+def test_pickle_snapshot_is_folded_into_the_journal(journal):
+    with open(bot.STATE_FILE, "wb") as f:
+        pickle.dump({"1": bot.GameState(player_scores={10: 1}).to_bytes(),
+                     "2": bot.GameState(player_scores={10: 2}).to_bytes()}, f)
+    bot.append_journal_file([(1, bot.GameState(player_scores={10: 5}).to_bytes())])
+    reload_chats()
+    assert not os.path.exists(bot.STATE_FILE)
+    assert sorted(journal_chat_ids()) == ["1", "2"]
+    reload_chats()
+    assert bot.get_game_state(1).player_scores == {10: 5}
+    assert bot.get_game_state(2).player_scores == {10: 2}
+
+
+def test_torn_record_is_compacted_away(journal):
+    set_score(1, 3)
+    with open(bot.STATE_JOURNAL_FILE, "ab") as f:
+        f.write(pickle.dumps(("2", b"GS" + bytes(50)))[:20])
+    reload_chats()
+    set_score(1, 4)
+    reload_chats()
+    assert bot.get_game_state(1).player_scores == {10: 4}
@@ -0,0 +1,161 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import telegram_quiz_bot as bot
+
+CHAT = -100
+MARKUP = object()
+
+
+class FakeBot:
+    """Records countdown edits as (text, reply_markup)"""
+
+    def __init__(self):
+        self.edits = []
+
+    async def edit_message_text(self, chat_id, message_id, text, reply_markup=None):
+        self.edits.append((text, reply_markup))
+
+
+async def settle(scheduler):
+    """Let the edit and expiry tasks run_due() spawned finish"""
+    while scheduler.running:
+        await asyncio.gather(*list(scheduler.running))
+
+
+def test_countdown_keeps_buttons_until_times_up_then_expires_once(state_files):
+    async def scenario():
+        scheduler, fake, expired = bot.TimerScheduler(), FakeBot(), []
+
+        async def on_expire(handle):
+            expired.append(handle)
+
+        loop = asyncio.get_running_loop()
+        handle = scheduler.schedule(fake, CHAT, 1, "Q", 20, on_expire, MARKUP)
+        scheduler.run_due(loop.time() + 25)
+        await settle(scheduler)
+        assert fake.edits == [
+            ("Q\n\n⏳ 20 seconds left...", MARKUP),
+            ("Q\n\n⏳ 10 seconds left...", MARKUP),
+            ("Q\n\n⏰ Time's up!", None),
+        ]
+        assert expired == [handle] and handle.done()
+        assert scheduler.pending == 0
+        scheduler.task.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_timer_never_edits_or_expires(state_files):
+    async def scenario():
+        scheduler, fake, expired = bot.TimerScheduler(), FakeBot(), []
+
+        async def on_expire(handle):
+            expired.append(handle)
+
+        loop = asyncio.get_running_loop()
+        handle = scheduler.schedule(fake, CHAT, 1, "Q", 20, on_expire, MARKUP)
+        handle.cancel()
+        handle.cancel()
+        scheduler.run_due(loop.time() + 25)
+        await settle(scheduler)
+        assert fake.edits == [] and expired == []
+        assert (scheduler.pending, scheduler.stale, scheduler.heap) == (0, 0, [])
+        scheduler.task.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_answer_after_the_deadline_fired_drops_the_expiry(state_files):
+    async def scenario():
+        scheduler, fake, expired = bot.TimerScheduler(), FakeBot(), []
+
+        async def on_expire(handle):
+            expired.append(handle)
+
+        loop = asyncio.get_running_loop()
+        handle = scheduler.schedule(fake, CHAT, 1, "Q", 20, on_expire)
+        # The expiry is queued behind the chat's lock while an answer is handled
+        async with bot.chat_lock(CHAT):
+            scheduler.run_due(loop.time() + 25)
+            await asyncio.sleep(0)
+            assert handle.fired
+            handle.cancel()
+        await settle(scheduler)
+        assert expired == []
+        scheduler.task.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_mostly_cancelled_heap_is_rebuilt(state_files):
+    async def scenario():
+        scheduler = bot.TimerScheduler()
+
+        async def on_expire(handle):
+            pass
+
+        handles = [scheduler.schedule(FakeBot(), CHAT, i, "Q", 30, on_expire) for i in range(100)]
+        for handle in handles[:90]:
+            handle.cancel()
+        assert scheduler.pending == 10
+        assert len(scheduler.heap) < 100
+        assert len(scheduler.heap) == scheduler.pending + scheduler.stale
+        scheduler.task.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_resumed_timer_past_its_deadline_still_says_times_up(state_files):
+    async def scenario():
+        scheduler, fake, expired = bot.TimerScheduler(), FakeBot(), []
+
+        async def on_expire(handle):
+            expired.append(handle)
+
+        handle = bot.TimerHandle.dormant((time.time() - 5, 20, 1, "Q"))
+        handle.markup = MARKUP
+        scheduler.resume(handle, fake, CHAT, on_expire)
+        scheduler.run_due(asyncio.get_running_loop().time())
+        await settle(scheduler)
+        assert fake.edits == [("Q\n\n⏰ Time's up!", None)]
+        assert expired == [handle]
+        scheduler.task.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_resumed_timer_skips_the_edits_it_missed(state_files):
+    async def scenario():
+        scheduler, fake = bot.TimerScheduler(), FakeBot()
+
+        async def on_expire(handle):
+            pass
+
+        handle = bot.TimerHandle.dormant((time.time() + 15, 20, 1, "Q"))
+        handle.markup = MARKUP
+        scheduler.resume(handle, fake, CHAT, on_expire)
+        now = asyncio.get_running_loop().time()
+        assert 4 < scheduler.heap[0][0] - now <= 5
+        scheduler.run_due(now + 6)
+        await settle(scheduler)
+        assert fake.edits == [("Q\n\n⏳ 10 seconds left...", MARKUP)]
+        handle.cancel()
+        scheduler.task.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_resume_timers_drops_timers_of_answered_questions(state_files):
+    async def scenario():
+        waiting, answered = bot.get_game_state(1), bot.get_game_state(2)
+        for state in (waiting, answered):
+            state.mcq_timer = bot.TimerHandle.dormant((time.time() + 15, 20, 1, "Q"))
+        waiting.waiting_for_mcq_answer = True
+        assert bot.resume_timers(SimpleNamespace(bot=FakeBot())) == 1
+        assert waiting.mcq_timer.scheduler is bot.timer_scheduler
+        assert answered.mcq_timer is None
+        waiting.mcq_timer.cancel()
+
+    asyncio.run(scenario())
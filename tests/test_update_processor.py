@@ -0,0 +1,82 @@
+import asyncio
+import datetime
+
+from telegram import Chat, Message, Update, User
+
+import telegram_quiz_bot as bot
+
+
+def make_update(update_id, chat_id, user_id, text):
+    message = Message(
+        message_id=update_id,
+        date=datetime.datetime.now(datetime.timezone.utc),
+        chat=Chat(chat_id, Chat.GROUP),
+        from_user=User(user_id, "player", False),
+        text=text,
+    )
+    return Update(update_id, message=message)
+
+
+def test_busy_chat_does_not_hold_running_slots(state_files):
+    async def scenario():
+        processor = bot.ChatUpdateProcessor(2, 100)
+        release = asyncio.Event()
+        done = []
+
+        async def handle(name, wait=False):
+            if wait:
+                await release.wait()
+            done.append(name)
+
+        busy = [
+            asyncio.create_task(processor.process_update(make_update(i, 1, 10, "/status"), handle(i, wait=True)))
+            for i in range(5)
+        ]
+        await asyncio.sleep(0)
+        await asyncio.wait_for(processor.process_update(make_update(9, 2, 10, "/status"), handle("other")), 1)
+        assert done == ["other"]
+        release.set()
+        await asyncio.gather(*busy)
+        assert done == ["other", 0, 1, 2, 3, 4]
+
+    asyncio.run(scenario())
+
+
+def test_chatter_is_decided_under_the_chat_lock(state_files):
+    async def scenario():
+        processor = bot.ChatUpdateProcessor(4, 100)
+        bot.get_game_state(1)
+        handled = []
+
+        async def join():
+            await asyncio.sleep(0)
+            bot.game_states[1].player_scores[20] = 0
+            handled.append("join")
+
+        async def answer(name):
+            handled.append(name)
+
+        joining = asyncio.create_task(processor.process_update(make_update(1, 1, 20, "/join"), join()))
+        await asyncio.sleep(0)
+        # Queued behind /join while the sender was not a player yet
+        await processor.process_update(make_update(2, 1, 20, "Paris"), answer("player"))
+        await processor.process_update(make_update(3, 1, 30, "hello"), answer("chatter"))
+        await joining
+        assert handled == ["join", "player"]
+
+    asyncio.run(scenario())
+
+
+def test_per_chat_handler_reuses_the_held_lock(state_files):
+    async def scenario():
+        processor = bot.ChatUpdateProcessor(1, 100)
+        seen = []
+
+        async def handler(update, context):
+            seen.append(bot.chat_lock(update.effective_chat.id).locked())
+
+        update = make_update(1, 1, 10, "/status")
+        await asyncio.wait_for(processor.process_update(update, bot.per_chat(handler)(update, None)), 1)
+        assert seen == [True]
+
+    asyncio.run(scenario())